@@ -20,9 +20,11 @@ except ImportError as e:
         f"Failed to import logging configuration: {e}. Using basic logging.")
     # Depending on severity, you might want to exit here.
 
-# Now import other components
+# Now import other components. Only lightweight modules are imported here:
+# PipelineService (settings, SQLAlchemy, ...) is imported in main() after the
+# arguments are parsed, and builds each mode's downloaders, parsers and DB
+# engine on first use, so --help and quick cron runs start fast.
 try:
-    from src.phase1_extraction.services.pipeline_service import PipelineService
     from src.core.exceptions import FinlensError, DatabaseQueryError
 except ImportError as e:
     logging.critical(
@@ -43,14 +45,16 @@ def parse_arguments():
     # --- Mode Selection ---
     parser.add_argument(
         "--mode",
-        choices=['bulk', 'incremental', 'backfill', 'download_docs'],
+        choices=['bulk', 'incremental', 'backfill', 'download_docs', 'daemon'],
         required=True,
         help=
         ("Pipeline execution mode: "
          "'bulk' (download/extract/ingest submissions.zip; for first time setup), "
          "'incremental' (process daily indices for updates), "
          "'backfill' (process quarterly indices for history), "
-         "'download_docs' (download specific filing documents)."))
+         "'download_docs' (download specific filing documents), "
+         "'daemon' (long-running: poll the latest filings feed, download and parse new filings, "
+         "run incremental/backfill jobs on a schedule)."))
 
     # --- Options for 'bulk' mode ---
     parser.add_argument("--skip-download",
@@ -144,7 +148,16 @@ def parse_arguments():
         "--no-skip-existing",
         action='store_true',
         help=
-        "[Download Mode] Force download even if local file exists (default skips existing)."
+        "[Download Mode] Re-download every matching filing, ignoring recorded download status and local files (default: only pending/failed filings, skipping files already on disk)."
+    )
+    # --- Options for 'daemon' mode ---
+    parser.add_argument(
+        "--max-polls",
+        type=int,
+        default=None,
+        metavar='N',
+        help=
+        "[Daemon Mode] Stop after N polls of the latest filings feed (default: run until SIGINT/SIGTERM)."
     )
     parser.add_argument(
         "--bulk-chunk-size",
@@ -156,6 +169,16 @@ def parse_arguments():
             "ingestion to manage memory. Overrides setting/env var if provided."
         ))
 
+    parser.add_argument(
+        "--bulk-write-batch-size",
+        type=int,
+        default=None,
+        metavar='N',
+        help=(
+            "[Bulk Mode] Number of parsed JSON files per database write batch "
+            "(written by a background writer while parsing continues). "
+            "Overrides setting/env var if provided."))
+
     return parser.parse_args()
 
 
@@ -193,6 +216,12 @@ def main():
     try:
         # Initialize the pipeline service AFTER parsing args
         # This loads settings initially from .env and defaults
+        try:
+            from src.phase1_extraction.services.pipeline_service import PipelineService
+        except ImportError as e:
+            raise RuntimeError(
+                f"Failed to import core pipeline components: {e}. Ensure src directory is in PYTHONPATH or use 'python -m main'."
+            ) from e
         pipeline = PipelineService()
 
         # --- Apply Command-Line Overrides to Settings ---
@@ -210,7 +239,18 @@ def main():
                     "Ignoring invalid command-line --bulk-chunk-size (must be > 0). Using value from settings."
                 )
 
-        if args.mode == 'download_docs' and args.download_threads is not None:
+        if args.mode == 'bulk' and args.bulk_write_batch_size is not None:
+            if args.bulk_write_batch_size > 0:
+                logger.info(
+                    f"Overriding bulk write batch size from settings with command-line value: {args.bulk_write_batch_size}"
+                )
+                pipeline.settings.pipeline.bulk_write_batch_size = args.bulk_write_batch_size
+            else:
+                logger.warning(
+                    "Ignoring invalid command-line --bulk-write-batch-size (must be > 0). Using value from settings."
+                )
+
+        if args.mode in ('download_docs', 'daemon') and args.download_threads is not None:
             if args.download_threads > 0:
                 logger.info(
                     f"Overriding download threads from settings with command-line value: {args.download_threads}"
@@ -284,37 +324,36 @@ def main():
                 logger.info(
                     f"Querying database for filings matching criteria...")
                 try:
-                    # Use the dedicated repository method which includes SIC filtering
-                    filings_to_process = pipeline.filing_repo.find_filings_for_download(
+                    # Stream matching filings (SIC filtering included) straight
+                    # into the downloader instead of materializing the full list
+                    filings_to_process = pipeline.filing_repo.iter_filings_for_download(
                         form_types=list(target_forms_set),
                         start_date=start_date,
                         end_date=end_date,
-                        limit=args.limit)
+                        limit=args.limit,
+                        # Index range scan over download_status instead of
+                        # probing every filing over HTTP and on disk
+                        pending_only=(not args.no_skip_existing))
 
                     # 3. Call the download service method
-                    if filings_to_process:
-                        # Pass the CLI arg value directly to the method,
-                        # the method will use the setting if None is passed
-                        success_count, failure_count = pipeline.download_filing_documents(
-                            filings_to_process=filings_to_process,
-                            target_forms=
-                            target_forms_set,  # Pass effective target forms
-                            num_threads=args.
-                            download_threads,  # Pass CLI value (or None)
-                            max_downloads=args.max_downloads,
-                            skip_existing=(not args.no_skip_existing))
-
-                        if failure_count > 0:
-                            # Consider run partially failed if any download fails
-                            logger.warning(
-                                f"Document download completed with {failure_count} failures."
-                            )
-                            # Keep exit_code = 0 unless a critical error occurred? Or set to 1? Let's set to 1 on failure.
-                            exit_code = 1
-                    else:
-                        logger.info(
-                            "No filings found matching the specified criteria for download."
+                    # Pass the CLI arg value directly to the method,
+                    # the method will use the setting if None is passed
+                    success_count, failure_count = pipeline.download_filing_documents(
+                        filings_to_process=filings_to_process,
+                        target_forms=
+                        target_forms_set,  # Pass effective target forms
+                        num_threads=args.
+                        download_threads,  # Pass CLI value (or None)
+                        max_downloads=args.max_downloads,
+                        skip_existing=(not args.no_skip_existing))
+
+                    if failure_count > 0:
+                        # Consider run partially failed if any download fails
+                        logger.warning(
+                            f"Document download completed with {failure_count} failures."
                         )
+                        # Keep exit_code = 0 unless a critical error occurred? Or set to 1? Let's set to 1 on failure.
+                        exit_code = 1
 
                 except DatabaseQueryError as e:
                     logger.error(
@@ -327,6 +366,12 @@ def main():
                         exc_info=True)
                     exit_code = 1
 
+        elif args.mode == 'daemon':
+            logger.info("Running Daemon...")
+            from src.phase1_extraction.services.daemon_service import DaemonService
+            success = DaemonService(pipeline).run(max_polls=args.max_polls)
+            if not success: exit_code = 1
+
         else:
             logger.error(f"Unknown mode: {args.mode}")
             exit_code = 1
@@ -14,11 +14,44 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 # --- Database Settings ---
 class DatabaseSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra='ignore')
-    host: str = Field(..., alias="DB_HOST")
+    # mysql (default), sqlite, postgresql or duckdb (experimental, untested);
+    # see src/database/dialects.py
+    backend: str = Field("mysql", alias="DB_BACKEND")
+    # Server connection (mysql/postgresql; required by those backends)
+    host: Optional[str] = Field(None, alias="DB_HOST")
     port: int = Field(3306, alias="DB_PORT")
-    user: str = Field(..., alias="DB_USER")
-    password: str = Field(..., alias="DB_PASSWORD")
-    name: str = Field(..., alias="DB_NAME")
+    user: Optional[str] = Field(None, alias="DB_USER")
+    password: Optional[str] = Field(None, alias="DB_PASSWORD")
+    name: str = Field("finlens", alias="DB_NAME")
+    # Database file for sqlite/duckdb (default: data/<DB_NAME>.sqlite / .duckdb)
+    path: Optional[Path] = Field(None, alias="DB_PATH")
+    # Bulk writes are split into executemany batches of this many rows,
+    # spread over up to write_workers pooled connections (keep <= pool size)
+    write_batch_size: int = Field(2000, alias="DB_WRITE_BATCH_SIZE")
+    write_workers: int = Field(4, alias="DB_WRITE_WORKERS")
+    write_max_retries: int = Field(3, alias="DB_WRITE_MAX_RETRIES")
+    # Bulk writes of at least this many rows go through a staging table
+    # (LOAD DATA LOCAL INFILE on MySQL) and one INSERT ... SELECT; 0 disables
+    bulk_load_threshold: int = Field(50000, alias="DB_BULK_LOAD_THRESHOLD")
+    # Skip company upserts whose content_hash matches the cached DB value
+    company_change_detection: bool = Field(True,
+                                           alias="DB_COMPANY_CHANGE_DETECTION")
+    # In-process index of known accession numbers used to pre-filter filing
+    # inserts; persisted to disk (default: <data>/cache/accession_index_<db>.bin)
+    accession_index_enabled: bool = Field(True, alias="DB_ACCESSION_INDEX")
+    accession_index_path: Optional[Path] = Field(
+        None, alias="DB_ACCESSION_INDEX_PATH")
+    # Use the integer-keyed compact tables (see src/database/compact.py);
+    # migrate existing data first with `python -m src.database.migrate_compact`
+    compact_schema: bool = Field(False, alias="DB_COMPACT_SCHEMA")
+    # Rows fetched per keyset page by streaming queries (iter_filings_for_download)
+    read_page_size: int = Field(5000, alias="DB_READ_PAGE_SIZE")
+    # In-process LRU cache for repository lookups (get_by_cik, get_existing_ciks,
+    # get_by_accession_number); entries are invalidated by this process's writes
+    # and expire after the TTL (writes from other processes show up within it)
+    cache_enabled: bool = Field(True, alias="DB_CACHE_ENABLED")
+    cache_capacity: int = Field(100000, alias="DB_CACHE_CAPACITY")
+    cache_ttl_seconds: float = Field(300.0, alias="DB_CACHE_TTL_SECONDS")
 
 
 # --- SEC API Settings ---
@@ -66,7 +99,49 @@ class PipelineSettings(BaseSettings):
     backfill_target_forms: Optional[Set[str]] = Field(
         None, alias="BACKFILL_TARGET_FORMS")
     document_subdir: str = Field("filing_documents", alias="DOC_SUBDIR")
+    # Fetch each filing's complete submission (<accession>.txt) in one request
+    # and split it into its documents, keeping only SUBMISSION_DOC_TYPES
+    # (e.g. "10-K,EX-21"; base types match sub-numbered exhibits; empty = all)
+    download_full_submission: bool = Field(False, alias="DOWNLOAD_FULL_SUBMISSION")
+    submission_document_types: Optional[Set[str]] = Field(
+        None, alias="SUBMISSION_DOC_TYPES")
     bulk_ingest_file_chunk_size: int = Field(100000, alias="BULK_CHUNK_SIZE")
+    # Parsed files per DB write batch, and how many batches may wait for the writer
+    bulk_write_batch_size: int = Field(5000, alias="BULK_WRITE_BATCH_SIZE")
+    bulk_write_queue_size: int = Field(4, alias="BULK_WRITE_QUEUE_SIZE")
+    # 'auto' picks msgspec > orjson > json depending on what is installed
+    json_decoder_backend: str = Field("auto", alias="JSON_DECODER_BACKEND")
+    # --mode daemon: polls the EDGAR latest-filings Atom feed every
+    # DAEMON_POLL_SECONDS (DAEMON_FEED_URL replaces the SEC feed, e.g. with a
+    # file:// stub) and reads up to DAEMON_FEED_MAX_PAGES pages per poll
+    daemon_poll_seconds: float = Field(60.0, alias="DAEMON_POLL_SECONDS")
+    daemon_feed_url: Optional[str] = Field(None, alias="DAEMON_FEED_URL")
+    daemon_feed_page_size: int = Field(100, alias="DAEMON_FEED_PAGE_SIZE")
+    daemon_feed_max_pages: int = Field(10, alias="DAEMON_FEED_MAX_PAGES")
+    # Hours between the daemon's incremental / backfill jobs (0 disables)
+    daemon_incremental_hours: float = Field(6.0, alias="DAEMON_INCREMENTAL_HOURS")
+    daemon_backfill_hours: float = Field(24.0, alias="DAEMON_BACKFILL_HOURS")
+    # Run phase-2 parsing on documents the daemon downloads
+    daemon_parse_documents: bool = Field(True, alias="DAEMON_PARSE_DOCUMENTS")
+    # Phase-2 parsing processes
+    processing_workers: int = Field(1, alias="PROCESSING_WORKERS")
+    # Phase-2 isolation: a filing running past the timeout or the RSS ceiling
+    # is killed and quarantined (0 disables a limit; with both disabled and one
+    # worker, filings are parsed in the calling process). Workers are replaced
+    # after PROCESSING_MAX_TASKS_PER_WORKER filings (0 = never)
+    processing_timeout_seconds: float = Field(900.0,
+                                              alias="PROCESSING_TIMEOUT_SECONDS")
+    processing_max_rss_mb: int = Field(4096, alias="PROCESSING_MAX_RSS_MB")
+    processing_max_tasks_per_worker: int = Field(
+        50, alias="PROCESSING_MAX_TASKS_PER_WORKER")
+    # Parse a cached pre-cleaned copy of each filing (ix:header, hidden
+    # elements, scripts and unused attributes stripped; inline XBRL facts
+    # saved to a JSON sidecar) instead of the original HTML
+    ixbrl_preclean: bool = Field(True, alias="IXBRL_PRECLEAN")
+    # Reuse sec-parser's elements for HTML it has already parsed (keyed by
+    # content hash and sec-parser version), so re-runs only redo the stages
+    # downstream of it
+    sec_parser_cache: bool = Field(True, alias="SEC_PARSER_CACHE")
 
     @model_validator(mode='before')
     @classmethod
@@ -90,6 +165,7 @@ class PipelineSettings(BaseSettings):
 
     @field_validator('target_primary_doc_forms',
                      'backfill_target_forms',
+                     'submission_document_types',
                      mode='before')
     @classmethod
     def parse_form_set(cls, v: Any) -> Optional[Set[str]]:
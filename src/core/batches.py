@@ -0,0 +1,162 @@
+# src/core/batches.py
+import sys
+from array import array
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+# Column names as used by the Filing model / repository mappings
+FILING_COLUMNS = ('cik', 'form_type', 'filing_date', 'accession_number',
+                  'primary_document_filename')
+
+
+class FilingBatch:
+    """
+    Compact columnar container for filing records.
+
+    Parsers append into parallel columns instead of building one dict per
+    filing: form types are interned (a few hundred distinct values across
+    millions of rows) and filing dates are stored as date ordinals in an
+    int array. Pickling a batch (e.g. back from a worker process) therefore
+    sends one shared string per distinct CIK/form type and 4 bytes per date.
+
+    For code that still expects dicts, iterating a batch yields one mapping
+    per filing (see iter_mappings()).
+    """
+    __slots__ = ('ciks', 'form_types', 'filing_dates', 'accession_numbers',
+                 'primary_documents')
+
+    def __init__(self):
+        self.ciks: List[str] = []
+        self.form_types: List[str] = []
+        self.filing_dates: array = array('i')  # date.toordinal() values
+        self.accession_numbers: List[str] = []
+        self.primary_documents: List[Optional[str]] = []
+
+    # --- Building ---
+    def append(self, cik: str, form_type: str, filing_date: Union[date, int],
+               accession_number: str,
+               primary_document_filename: Optional[str]) -> None:
+        """Adds one filing. filing_date may be a date or a date ordinal."""
+        self.ciks.append(cik)
+        self.form_types.append(sys.intern(form_type))
+        self.filing_dates.append(filing_date if isinstance(filing_date, int)
+                                 else filing_date.toordinal())
+        self.accession_numbers.append(accession_number)
+        self.primary_documents.append(primary_document_filename)
+
+    def extend(self, other: 'FilingBatch') -> None:
+        """Appends all rows of another batch."""
+        self.ciks.extend(other.ciks)
+        self.form_types.extend(other.form_types)
+        self.filing_dates.extend(other.filing_dates)
+        self.accession_numbers.extend(other.accession_numbers)
+        self.primary_documents.extend(other.primary_documents)
+
+    @classmethod
+    def from_mappings(cls, mappings: Iterable[Dict[str, Any]]) -> 'FilingBatch':
+        """Builds a batch from filing dicts (the legacy parser output format)."""
+        batch = cls()
+        for m in mappings:
+            batch.append(m['cik'], m['form_type'], m['filing_date'],
+                         m['accession_number'],
+                         m.get('primary_document_filename'))
+        return batch
+
+    # --- Selection ---
+    def take(self, indices: Iterable[int]) -> 'FilingBatch':
+        """Returns a new batch holding the rows at the given indices (in that order)."""
+        out = FilingBatch()
+        for i in indices:
+            out.ciks.append(self.ciks[i])
+            out.form_types.append(self.form_types[i])
+            out.filing_dates.append(self.filing_dates[i])
+            out.accession_numbers.append(self.accession_numbers[i])
+            out.primary_documents.append(self.primary_documents[i])
+        return out
+
+    def slice(self, start: int, stop: int) -> 'FilingBatch':
+        """Returns rows [start:stop) as a new batch (cheap column slices)."""
+        out = FilingBatch()
+        out.ciks = self.ciks[start:stop]
+        out.form_types = self.form_types[start:stop]
+        out.filing_dates = self.filing_dates[start:stop]
+        out.accession_numbers = self.accession_numbers[start:stop]
+        out.primary_documents = self.primary_documents[start:stop]
+        return out
+
+    def dedupe(self) -> 'FilingBatch':
+        """
+        Removes duplicate accession numbers (and rows without one).
+        Like assigning into a dict keyed by accession number, the last
+        occurrence wins.
+        """
+        last_index = {
+            acc: i
+            for i, acc in enumerate(self.accession_numbers) if acc
+        }
+        if len(last_index) == len(self.accession_numbers):
+            return self
+        return self.take(last_index.values())
+
+    def filter_forms(self, form_types: Set[str]) -> 'FilingBatch':
+        """Returns only the rows whose form type is in form_types."""
+        return self.take(i for i, form in enumerate(self.form_types)
+                         if form in form_types)
+
+    def unique_ciks(self) -> Set[str]:
+        return set(self.ciks)
+
+    # --- Dict compatibility ---
+    def mapping_at(self, i: int) -> Dict[str, Any]:
+        return {
+            'cik': self.ciks[i],
+            'form_type': self.form_types[i],
+            'filing_date': date.fromordinal(self.filing_dates[i]),
+            'accession_number': self.accession_numbers[i],
+            'primary_document_filename': self.primary_documents[i],
+        }
+
+    def iter_mappings(self) -> Iterator[Dict[str, Any]]:
+        """Yields one Filing-model mapping (with a datetime.date) per row."""
+        for i in range(len(self.accession_numbers)):
+            yield self.mapping_at(i)
+
+    def to_mappings(self) -> List[Dict[str, Any]]:
+        return list(self.iter_mappings())
+
+    def iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Yields one tuple per row, in FILING_COLUMNS order (dates as datetime.date)."""
+        fromordinal = date.fromordinal
+        for cik, form, ordinal, acc, doc in zip(self.ciks, self.form_types,
+                                                self.filing_dates,
+                                                self.accession_numbers,
+                                                self.primary_documents):
+            yield cik, form, fromordinal(ordinal), acc, doc
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_mappings()
+
+    def __len__(self) -> int:
+        return len(self.accession_numbers)
+
+    def __getstate__(self):
+        return (self.ciks, self.form_types, self.filing_dates,
+                self.accession_numbers, self.primary_documents)
+
+    def __setstate__(self, state):
+        (self.ciks, form_types, self.filing_dates, self.accession_numbers,
+         self.primary_documents) = state
+        # Re-intern after unpickling so batches from different workers share strings
+        self.form_types = [sys.intern(f) for f in form_types]
+
+    def __repr__(self) -> str:
+        return f"<FilingBatch(rows={len(self)})>"
+
+
+def as_mappings(
+        rows: Union[FilingBatch, Sequence[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Adapter for repositories: accepts a batch or a sequence of dicts."""
+    if isinstance(rows, FilingBatch):
+        return rows.to_mappings()
+    return rows if isinstance(rows, list) else list(rows)
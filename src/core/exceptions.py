@@ -34,6 +34,12 @@ class DatabaseIntegrityError(DatabaseError):
     pass
 
 
+class BulkLoadUnavailableError(DatabaseError):
+    """The staging-table bulk load path can't be used (e.g., LOAD DATA LOCAL disabled)."""
+    # Callers fall back to the regular batched INSERT path
+    pass
+
+
 # --- Network/Download Errors ---
 class NetworkError(FinlensError):
     """Error related to network operations (e.g., downloading from SEC)."""
@@ -98,6 +104,16 @@ class HTMLParsingError(ParsingError):
     pass
 
 
+class AtomParsingError(ParsingError):
+    """Error parsing the EDGAR latest-filings Atom feed."""
+    pass
+
+
+class SGMLParsingError(ParsingError):
+    """Error splitting an EDGAR full-submission (SGML) text file."""
+    pass
+
+
 # --- File System Errors ---
 class FileSystemError(FinlensError):
     """Error related to file system operations."""
@@ -0,0 +1,40 @@
+# src/core/identifiers.py
+
+from typing import Optional
+
+
+def accession_to_int(accession_number: str) -> Optional[int]:
+    """
+    Encodes an accession number ('0000320193-24-000012' or its 18-digit
+    no-dash form) as an int. 18 decimal digits always fit a signed int64.
+
+    Returns:
+        The integer, or None if the input isn't a well-formed accession number.
+    """
+    if not accession_number:
+        return None
+    digits = accession_number.replace('-', '')
+    if len(digits) != 18 or not digits.isdigit():
+        return None
+    return int(digits)
+
+
+def int_to_accession(value: int) -> str:
+    """Decodes accession_to_int() output back to the dashed 10-2-6 form."""
+    digits = f"{value:018d}"
+    return f"{digits[:10]}-{digits[10:12]}-{digits[12:]}"
+
+
+def cik_to_int(cik: str) -> Optional[int]:
+    """Encodes a CIK ('0000320193' or '320193') as an int; None if not numeric."""
+    if cik is None:
+        return None
+    cik = str(cik).strip()
+    if not cik.isdigit() or len(cik) > 10:
+        return None
+    return int(cik)
+
+
+def int_to_cik(value: int) -> str:
+    """Decodes a CIK int to the zero-padded 10-digit form used by SEC submission files."""
+    return f"{value:010d}"
@@ -0,0 +1,121 @@
+# src/database/accession_index.py
+
+import logging
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# File layout: magic, format version, id watermark, source row count, count,
+# then `count` int64s
+_MAGIC = b"FLACCIDX"
+_HEADER = struct.Struct("<8sIqqq")
+_FORMAT_VERSION = 2
+
+# Pending additions are merged into the sorted array once they reach this size
+_MERGE_THRESHOLD = 200000
+
+
+class AccessionIndex:
+    """
+    In-process set of accession numbers known to exist in the filings table.
+
+    Accession numbers are stored as int64 (see src.core.identifiers) in a
+    sorted array searched with bisect, plus a small set of recent additions
+    that is periodically merged into the array. About 8 bytes per filing.
+
+    `watermark` is the highest filings.id reflected in the index, so a loaded
+    snapshot can be caught up with `WHERE id > watermark` instead of a full
+    scan. `rows` counts the filings rows (id <= watermark) it was built from;
+    with the watermark row itself it lets the repository check a snapshot
+    against the database before trusting it (a recreated, restored or
+    pruned table invalidates it). The structure only answers "definitely
+    exists"; an unknown accession is simply sent to the database as before.
+    """
+
+    def __init__(self):
+        self._sorted: array = array('q')
+        self._pending: Set[int] = set()
+        self.watermark: int = 0
+        self.rows: int = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __contains__(self, value: int) -> bool:
+        return value in self._pending or self._in_sorted(value)
+
+    def _in_sorted(self, value: int) -> bool:
+        position = bisect_left(self._sorted, value)
+        return position < len(self._sorted) and self._sorted[position] == value
+
+    def add_many(self, values: Iterable[int], watermark: Optional[int] = None,
+                 rows: int = 0) -> None:
+        """
+        Adds encoded accession numbers and optionally advances the id
+        watermark; rows is the number of table rows they were read from.
+        """
+        with self._lock:
+            self._pending.update(values)
+            self.rows += rows
+            if watermark is not None and watermark > self.watermark:
+                self.watermark = watermark
+            if len(self._pending) >= _MERGE_THRESHOLD:
+                self._merge_pending()
+
+    def _merge_pending(self) -> None:
+        new_values = [v for v in self._pending if not self._in_sorted(v)]
+        if new_values:
+            merged = array('q', self._sorted)
+            merged.extend(new_values)
+            # Swap in the merged array before clearing pending, so concurrent
+            # lookups never miss a value
+            self._sorted = array('q', sorted(merged))
+        self._pending.clear()
+
+    # --- Persistence ---
+    def save(self, path: Path) -> None:
+        """Writes the index atomically (temp file + rename)."""
+        with self._lock:
+            self._merge_pending()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, self.watermark,
+                                     self.rows, len(self._sorted)))
+                self._sorted.tofile(f)
+            os.replace(tmp_path, path)
+        logger.info(
+            f"Saved accession index ({len(self._sorted)} entries, "
+            f"watermark id {self.watermark}) to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["AccessionIndex"]:
+        """Loads a saved index, or returns None if missing/unreadable."""
+        if not path.is_file():
+            return None
+        try:
+            with open(path, "rb") as f:
+                magic, version, watermark, rows, count = _HEADER.unpack(
+                    f.read(_HEADER.size))
+                if magic != _MAGIC or version != _FORMAT_VERSION:
+                    logger.warning(
+                        f"Ignoring accession index {path}: unknown format.")
+                    return None
+                index = cls()
+                index._sorted.fromfile(f, count)
+                index.watermark = watermark
+                index.rows = rows
+        except (OSError, EOFError, struct.error) as e:
+            logger.warning(f"Ignoring unreadable accession index {path}: {e}")
+            return None
+        logger.info(
+            f"Loaded accession index ({count} entries, watermark id {watermark}) from {path}"
+        )
+        return index
@@ -0,0 +1,209 @@
+# src/database/compact.py
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import (Column, Integer, SmallInteger, BigInteger, String,
+                        Date, DateTime, ForeignKey, Index, Boolean, select)
+from sqlalchemy.orm import declarative_base, Session
+
+from src.core.identifiers import (accession_to_int, int_to_accession,
+                                  cik_to_int, int_to_cik)
+from src.database.models import Company, Filing, DOWNLOAD_PENDING
+
+logger = logging.getLogger(__name__)
+
+# Separate metadata: these tables are only created when DB_COMPACT_SCHEMA is on
+# (or by the migration tool, see src/database/migrate_compact.py)
+CompactBase = declarative_base()
+
+
+# --- Compact models (integer keys) ---
+class FormType(CompactBase):
+    """Dimension table of form type codes ('10-K', '8-K', ...)."""
+    __tablename__ = 'form_types'
+    # SQLite only auto-increments INTEGER primary keys
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"),
+                primary_key=True,
+                autoincrement=True)
+    code = Column(String(20), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<FormType(id={self.id}, code='{self.code}')>"
+
+
+class CompactCompany(CompactBase):
+    """Company with an INT CIK key; otherwise the same columns as Company."""
+    __tablename__ = 'compact_companies'
+    cik = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False, index=True)
+    sic = Column(String(4), nullable=True, index=True)
+    entity_type = Column(String(50), nullable=True, index=True)
+    sic_description = Column(String(255), nullable=True)
+    insider_trade_owner = Column(Boolean, nullable=True)
+    insider_trade_issuer = Column(Boolean, nullable=True)
+    business_street1 = Column(String(255), nullable=True)
+    business_street2 = Column(String(255), nullable=True)
+    business_city = Column(String(100), nullable=True)
+    business_state_or_country = Column(String(10), nullable=True, index=True)
+    business_state_or_country_desc = Column(String(50), nullable=True)
+    business_zip = Column(String(20), nullable=True)
+    phone = Column(String(25), nullable=True)
+    content_hash = Column(BigInteger, nullable=True)
+
+    def __repr__(self):
+        return f"<CompactCompany(cik={self.cik}, name='{self.name}')>"
+
+
+class CompactFiling(CompactBase):
+    """
+    Filing with integer keys: INT CIK, SMALLINT form type id and the
+    accession number as a BIGINT (one unique index instead of unique + idx).
+    """
+    __tablename__ = 'compact_filings'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cik = Column(Integer,
+                 ForeignKey('compact_companies.cik', ondelete="CASCADE"),
+                 nullable=False)
+    form_type_id = Column(SmallInteger,
+                          ForeignKey('form_types.id'),
+                          nullable=False)
+    filing_date = Column(Date, nullable=False)
+    accession = Column(BigInteger, nullable=False, unique=True)
+    primary_document_filename = Column(String(255), nullable=True)
+    download_status = Column(String(16),
+                             nullable=False,
+                             default=DOWNLOAD_PENDING,
+                             server_default=DOWNLOAD_PENDING)
+    local_path = Column(String(512), nullable=True)
+    downloaded_at = Column(DateTime, nullable=True)
+    byte_size = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index('idx_cform_date', 'form_type_id', 'filing_date'),
+        Index('idx_ccik', 'cik'),
+        Index('idx_cdownload_status', 'download_status', 'form_type_id',
+              'filing_date'),
+    )
+
+    def __repr__(self):
+        return (f"<CompactFiling(id={self.id}, cik={self.cik}, "
+                f"accession={self.accession})>")
+
+
+# Column order used when writing compact filing rows
+COMPACT_FILING_COLUMNS = ('cik', 'form_type_id', 'filing_date', 'accession',
+                          'primary_document_filename')
+
+
+# --- Edge translation ---
+class FormTypeRegistry:
+    """Thread-safe, process-wide cache of form type code <-> id."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._codes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def ids_for(self,
+                session: Session,
+                codes: Iterable[str],
+                create: bool = True) -> Dict[str, int]:
+        """
+        Returns {code: id} for the given codes, inserting unknown codes into
+        form_types when create=True (otherwise unknown codes are left out).
+
+        Codes are looked up before anything is inserted: an ignored duplicate
+        still consumes an AUTO_INCREMENT value (MySQL) or sequence value
+        (PostgreSQL), and the SMALLINT id would run out if every process
+        re-inserted the codes it hasn't cached yet.
+        """
+        wanted = set(codes)
+        with self._lock:
+            missing = self._load(session, wanted - self._ids.keys())
+            if missing and create:
+                session.execute(
+                    _insert_ignore(FormType.__table__,
+                                   session.get_bind().dialect.name),
+                    [{'code': c} for c in missing])
+                self._load(session, missing)
+            return {c: self._ids[c] for c in wanted if c in self._ids}
+
+    def _load(self, session: Session, codes: set) -> set:
+        """Caches the ids of the codes present in form_types; returns the others."""
+        if not codes:
+            return codes
+        for form_id, code in session.execute(
+                select(FormType.id, FormType.code).where(FormType.code.in_(codes))):
+            self._ids[code] = form_id
+            self._codes[form_id] = code
+        return codes - self._ids.keys()
+
+    def code_for(self, session: Session, form_type_id: int) -> Optional[str]:
+        with self._lock:
+            if form_type_id not in self._codes:
+                code = session.execute(
+                    select(FormType.code).where(
+                        FormType.id == form_type_id)).scalar_one_or_none()
+                if code is None:
+                    return None
+                self._codes[form_type_id] = code
+                self._ids[code] = form_type_id
+            return self._codes[form_type_id]
+
+
+form_type_registry = FormTypeRegistry()
+
+
+def _insert_ignore(table, dialect_name: str):
+    """INSERT that skips rows conflicting with a unique key, for the given dialect."""
+    # Imported here: dialects imports settings, which compact doesn't otherwise need
+    from src.database.dialects import get_backend
+    return get_backend(dialect_name).insert_ignore(table)
+
+
+def company_mapping_to_compact(mapping: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Company mapping (string CIK) -> compact mapping; None if the CIK isn't numeric."""
+    cik = cik_to_int(mapping.get('cik'))
+    if cik is None:
+        return None
+    return {**mapping, 'cik': cik}
+
+
+def compact_to_company(row: CompactCompany) -> Company:
+    """Builds a detached Company (string CIK) from a compact row."""
+    values = {
+        col.name: getattr(row, col.name)
+        for col in CompactCompany.__table__.columns
+    }
+    values['cik'] = int_to_cik(row.cik)
+    return Company(**values)
+
+
+def compact_to_filing(row: CompactFiling, form_type: Optional[str]) -> Filing:
+    """Builds a detached Filing (string keys) from a compact row."""
+    return Filing(id=row.id,
+                  cik=int_to_cik(row.cik),
+                  form_type=form_type,
+                  filing_date=row.filing_date,
+                  accession_number=int_to_accession(row.accession),
+                  primary_document_filename=row.primary_document_filename,
+                  download_status=row.download_status,
+                  local_path=row.local_path,
+                  downloaded_at=row.downloaded_at,
+                  byte_size=row.byte_size)
+
+
+def filing_row_to_compact(row, form_type_ids: Dict[str, int]) -> Optional[tuple]:
+    """
+    (cik, form_type, filing_date, accession_number, primary_document_filename)
+    -> a COMPACT_FILING_COLUMNS tuple; None if a key can't be encoded.
+    """
+    cik, form_type, filing_date, accession_number, primary_document = row
+    cik_int = cik_to_int(cik)
+    accession = accession_to_int(accession_number)
+    form_type_id = form_type_ids.get(form_type)
+    if cik_int is None or accession is None or form_type_id is None:
+        return None
+    return cik_int, form_type_id, filing_date, accession, primary_document
@@ -0,0 +1,357 @@
+# src/database/dialects.py
+
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import event, func, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from src.config.settings import DatabaseSettings
+from src.core.exceptions import ConfigurationError, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# Optional DuckDB support (pip install duckdb-engine)
+try:
+    import duckdb_engine  # noqa: F401  (registers the 'duckdb' SQLAlchemy dialect)
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Named lock serializing schema migrations between processes (server backends)
+MIGRATION_LOCK_NAME = "finlens_schema_migration"
+MIGRATION_LOCK_KEY = 0x46494E4C454E53  # pg_advisory_lock takes a BIGINT key
+MIGRATION_LOCK_TIMEOUT = 600  # Seconds
+
+
+class DatabaseBackend:
+    """
+    Dialect-specific pieces used by session setup and the repositories:
+    connection URL and engine options, per-connection setup, and the
+    "insert ignoring duplicates" / "upsert" statements for executemany writes.
+
+    Instances are stateless; look them up with get_backend(name), where name
+    is DB_BACKEND or an engine's dialect.name.
+    """
+    name = ""
+    # Upper bound on parallel write connections (DB_WRITE_WORKERS is capped by it)
+    max_write_workers: Optional[int] = None
+    # CAST target for integer conversions in raw SQL
+    integer_cast_type = "BIGINT"
+
+    # --- Connection ---
+    def url(self, db_settings: DatabaseSettings) -> str:
+        raise NotImplementedError
+
+    def engine_kwargs(self, db_settings: DatabaseSettings) -> Dict[str, Any]:
+        return {}
+
+    def create_database(self, db_settings: DatabaseSettings) -> None:
+        """Makes sure the database exists before connecting (no-op by default)."""
+
+    def configure_engine(self, engine: Engine) -> None:
+        """Hook for per-connection setup on a new engine (no-op by default)."""
+
+    @contextmanager
+    def migration_lock(self, engine: Engine) -> Iterator[None]:
+        """
+        Held while migrations run, so processes starting at the same time
+        apply them one after the other (no-op by default: embedded databases).
+        """
+        yield
+
+    # --- Statements ---
+    def insert_ignore(self, table):
+        """INSERT that silently skips rows conflicting with a unique key."""
+        raise NotImplementedError
+
+    def upsert(self, table, key_columns: Sequence[str],
+               update_columns: Sequence[str]):
+        """
+        INSERT that overwrites update_columns of rows conflicting on key_columns.
+        Falls back to insert_ignore() when there is nothing to update.
+        """
+        raise NotImplementedError
+
+    def insert_ignore_sql(self, target: str, select_sql: str) -> str:
+        """Raw 'INSERT <target> SELECT ...' skipping duplicate keys."""
+        return f"INSERT OR IGNORE INTO {target} {select_sql}"
+
+
+class _ServerBackend(DatabaseBackend):
+    """Client/server databases (DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME)."""
+
+    def _check_settings(self, db_settings: DatabaseSettings) -> None:
+        missing = [
+            alias for alias, value in (("DB_HOST", db_settings.host),
+                                       ("DB_USER", db_settings.user),
+                                       ("DB_PASSWORD", db_settings.password))
+            if value is None
+        ]
+        if missing:
+            raise ConfigurationError(
+                f"DB_BACKEND={self.name} requires {', '.join(missing)}")
+
+
+class MySQLBackend(_ServerBackend):
+    name = "mysql"
+    integer_cast_type = "SIGNED"
+
+    def server_url(self, db_settings: DatabaseSettings) -> str:
+        self._check_settings(db_settings)
+        return (f"mysql+mysqlconnector://{db_settings.user}:{db_settings.password}@"
+                f"{db_settings.host}:{db_settings.port}/?charset=utf8mb4")
+
+    def url(self, db_settings: DatabaseSettings) -> str:
+        self._check_settings(db_settings)
+        return (f"mysql+mysqlconnector://{db_settings.user}:{db_settings.password}@"
+                f"{db_settings.host}:{db_settings.port}/{db_settings.name}?charset=utf8mb4")
+
+    def engine_kwargs(self, db_settings: DatabaseSettings) -> Dict[str, Any]:
+        return dict(
+            pool_recycle=3600,  # Recycle connections after 1 hour
+            pool_size=10,  # Default pool size
+            max_overflow=20,  # Allow 20 extra connections under load
+            pool_pre_ping=True,  # Check connection validity before use
+            # Needed by the staged bulk load path (LOAD DATA LOCAL INFILE)
+            connect_args={
+                "allow_local_infile": db_settings.bulk_load_threshold > 0
+            })
+
+    def create_database(self, db_settings: DatabaseSettings) -> None:
+        # Imported here: session.py imports this module
+        from src.database.session import create_database_if_not_exists
+        create_database_if_not_exists(db_settings)
+
+    @contextmanager
+    def migration_lock(self, engine: Engine) -> Iterator[None]:
+        # GET_LOCK belongs to the session, so DDL on other connections isn't blocked
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT}).scalar()
+            if acquired != 1:
+                raise DatabaseError(
+                    f"Timed out waiting for lock '{MIGRATION_LOCK_NAME}' "
+                    f"(another process is migrating the schema)")
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"),
+                                   {"name": MIGRATION_LOCK_NAME})
+
+    def insert_ignore(self, table):
+        return mysql_insert(table).prefix_with("IGNORE", dialect="mysql")
+
+    def upsert(self, table, key_columns, update_columns):
+        if not update_columns:
+            return self.insert_ignore(table)
+        return mysql_insert(table).on_duplicate_key_update(
+            **{name: func.values(table.c[name]) for name in update_columns})
+
+    def insert_ignore_sql(self, target: str, select_sql: str) -> str:
+        return f"INSERT IGNORE INTO {target} {select_sql}"
+
+
+class _FileBackend(DatabaseBackend):
+    """Embedded databases stored in a single file (DB_PATH)."""
+    file_suffix = ".db"
+
+    def database_path(self, db_settings: DatabaseSettings) -> Path:
+        if db_settings.path is not None:
+            return db_settings.path
+        return Path("data") / f"{db_settings.name}{self.file_suffix}"
+
+    def create_database(self, db_settings: DatabaseSettings) -> None:
+        self.database_path(db_settings).parent.mkdir(parents=True, exist_ok=True)
+
+
+class SQLiteBackend(_FileBackend):
+    """
+    SQLite in WAL mode: readers don't block the (single) writer, and
+    synchronous=NORMAL is durable across application crashes.
+    """
+    name = "sqlite"
+    file_suffix = ".sqlite"
+    # SQLite serializes writers; parallel write connections only contend for the lock
+    max_write_workers = 1
+
+    def url(self, db_settings: DatabaseSettings) -> str:
+        return f"sqlite:///{self.database_path(db_settings)}"
+
+    def engine_kwargs(self, db_settings: DatabaseSettings) -> Dict[str, Any]:
+        # Wait for the write lock instead of failing with "database is locked"
+        return dict(connect_args={"timeout": 60, "check_same_thread": False})
+
+    def configure_engine(self, engine: Engine) -> None:
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+            finally:
+                cursor.close()
+
+    def insert_ignore(self, table):
+        return sqlite_insert(table).on_conflict_do_nothing()
+
+    def upsert(self, table, key_columns, update_columns):
+        if not update_columns:
+            return self.insert_ignore(table)
+        stmt = sqlite_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={name: stmt.excluded[name] for name in update_columns})
+
+
+class PostgreSQLBackend(_ServerBackend):
+    name = "postgresql"
+
+    def url(self, db_settings: DatabaseSettings) -> str:
+        self._check_settings(db_settings)
+        return (f"postgresql+psycopg2://{db_settings.user}:{db_settings.password}@"
+                f"{db_settings.host}:{db_settings.port}/{db_settings.name}")
+
+    def engine_kwargs(self, db_settings: DatabaseSettings) -> Dict[str, Any]:
+        return dict(pool_size=10, max_overflow=20, pool_pre_ping=True)
+
+    @contextmanager
+    def migration_lock(self, engine: Engine) -> Iterator[None]:
+        # Session-level advisory lock; released explicitly (or on disconnect)
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            connection.execute(text(f"SET lock_timeout = '{MIGRATION_LOCK_TIMEOUT}s'"))
+            connection.execute(text("SELECT pg_advisory_lock(:key)"),
+                               {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"),
+                                   {"key": MIGRATION_LOCK_KEY})
+
+    def insert_ignore(self, table):
+        return postgresql_insert(table).on_conflict_do_nothing()
+
+    def upsert(self, table, key_columns, update_columns):
+        if not update_columns:
+            return self.insert_ignore(table)
+        stmt = postgresql_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={name: stmt.excluded[name] for name in update_columns})
+
+    def insert_ignore_sql(self, target: str, select_sql: str) -> str:
+        return f"INSERT INTO {target} {select_sql} ON CONFLICT DO NOTHING"
+
+
+class DuckDBBackend(_FileBackend, PostgreSQLBackend):
+    """
+    Experimental: DuckDB through duckdb-engine (a PostgreSQL-derived
+    SQLAlchemy dialect, so the ON CONFLICT statements are shared). Single
+    process, one writer. Not covered by the test suite.
+    """
+    name = "duckdb"
+    file_suffix = ".duckdb"
+    max_write_workers = 1
+
+    def url(self, db_settings: DatabaseSettings) -> str:
+        if not DUCKDB_AVAILABLE:
+            raise ConfigurationError(
+                "DB_BACKEND=duckdb requires the duckdb-engine package")
+        logger.warning("DB_BACKEND=duckdb is experimental")
+        return f"duckdb:///{self.database_path(db_settings)}"
+
+    def engine_kwargs(self, db_settings: DatabaseSettings) -> Dict[str, Any]:
+        return {}
+
+    @contextmanager
+    def migration_lock(self, engine: Engine) -> Iterator[None]:
+        # Single process: nothing to serialize against
+        yield
+
+    def configure_engine(self, engine: Engine) -> None:
+        # Only this engine's dialect instance (and its connections) change;
+        # the shared model metadata is left alone
+        engine.dialect.ddl_compiler = _duckdb_ddl_compiler(engine.dialect.ddl_compiler)
+
+        @event.listens_for(engine, "connect")
+        def _create_key_sequences(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name in _key_sequence_names():
+                    cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {name}")
+            finally:
+                cursor.close()
+
+    def insert_ignore_sql(self, target: str, select_sql: str) -> str:
+        return f"INSERT OR IGNORE INTO {target} {select_sql}"
+
+
+def _key_sequence_name(column) -> str:
+    return f"{column.table.name}_{column.name}_seq"
+
+
+def _generates_key(column) -> bool:
+    return (column is column.table.autoincrement_column
+            and column.default is None and column.server_default is None)
+
+
+def _key_sequence_names() -> List[str]:
+    """Sequences backing the autoincrement integer keys of the FinLens models."""
+    # Imported here: the models don't depend on the backend layer
+    from src.database.compact import CompactBase
+    from src.database.models import Base
+    return [_key_sequence_name(column)
+            for metadata in (Base.metadata, CompactBase.metadata)
+            for table in metadata.tables.values()
+            for column in table.columns if _generates_key(column)]
+
+
+def _duckdb_ddl_compiler(base_compiler):
+    """
+    DDL compiler for DuckDB engines. DuckDB rejects ON DELETE CASCADE in
+    foreign keys (nothing here relies on cascades: rows are never deleted)
+    and has no SERIAL/AUTO_INCREMENT, so autoincrement integer keys default
+    to nextval() of a sequence created on connect.
+    """
+
+    class _DuckDBDDLCompiler(base_compiler):
+
+        def define_constraint_cascades(self, constraint):
+            return ""
+
+        def get_column_specification(self, column, **kwargs):
+            if not _generates_key(column):
+                return super().get_column_specification(column, **kwargs)
+            type_sql = self.dialect.type_compiler_instance.process(
+                column.type, type_expression=column)
+            return (f"{self.preparer.format_column(column)} {type_sql} "
+                    f"DEFAULT nextval('{_key_sequence_name(column)}') NOT NULL")
+
+    return _DuckDBDDLCompiler
+
+
+_BACKENDS: Dict[str, DatabaseBackend] = {
+    backend.name: backend
+    for backend in (MySQLBackend(), SQLiteBackend(), PostgreSQLBackend(),
+                    DuckDBBackend())
+}
+
+
+def get_backend(name: str) -> DatabaseBackend:
+    """Returns the backend for DB_BACKEND / an engine's dialect.name."""
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ConfigurationError(
+            f"Unsupported database backend '{name}' "
+            f"(expected one of: {', '.join(sorted(_BACKENDS))})")
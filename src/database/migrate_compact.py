@@ -0,0 +1,156 @@
+# src/database/migrate_compact.py
+"""
+Copies companies/filings into the compact integer-keyed tables
+(compact_companies, compact_filings, form_types).
+
+Usage:
+    python -m src.database.migrate_compact [--batch-size N] [--verify-only]
+
+The copy is set-based SQL run in id-range batches and is idempotent
+(insert-ignore per backend), so it can be re-run or resumed. Filing ids are
+kept. The original tables are left untouched; set DB_COMPACT_SCHEMA=true
+once the verification counts match.
+"""
+
+import argparse
+import logging
+import sys
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+
+from src.database.compact import CompactBase, CompactCompany, CompactFiling
+from src.database.dialects import get_backend
+from src.database.models import Company, Filing
+
+logger = logging.getLogger(__name__)
+
+# Companies columns copied as-is (everything but the key)
+_COMPANY_VALUE_COLUMNS = [
+    col.name for col in Company.__table__.columns if col.name != 'cik'
+]
+
+
+def _insert_ignore(engine: Engine, target: str, select_sql: str):
+    return text(get_backend(engine.dialect.name).insert_ignore_sql(target, select_sql))
+
+
+def _as_integer(engine: Engine, expression: str) -> str:
+    return f"CAST({expression} AS {get_backend(engine.dialect.name).integer_cast_type})"
+
+
+def migrate_form_types(engine: Engine) -> int:
+    """Fills form_types with every distinct filings.form_type."""
+    with engine.begin() as conn:
+        result = conn.execute(
+            _insert_ignore(engine, "form_types (code)",
+                           "SELECT DISTINCT form_type FROM filings"))
+    logger.info(f"form_types: {result.rowcount} new codes.")
+    return result.rowcount
+
+
+def migrate_companies(engine: Engine) -> int:
+    """Copies companies into compact_companies (CIK cast to an integer)."""
+    columns = ", ".join(_COMPANY_VALUE_COLUMNS)
+    with engine.begin() as conn:
+        result = conn.execute(
+            _insert_ignore(
+                engine, f"compact_companies (cik, {columns})",
+                f"SELECT {_as_integer(engine, 'cik')}, {columns} FROM companies "
+                f"WHERE cik <> ''"))
+    logger.info(f"compact_companies: {result.rowcount} rows copied.")
+    return result.rowcount
+
+
+def migrate_filings(engine: Engine, batch_size: int) -> int:
+    """Copies filings into compact_filings in id-range batches, keeping ids."""
+    with engine.connect() as conn:
+        min_id, max_id = conn.execute(select(func.min(Filing.id),
+                                             func.max(Filing.id))).one()
+    if min_id is None:
+        logger.info("compact_filings: source table is empty.")
+        return 0
+
+    copied = 0
+    accession_digits = "REPLACE(f.accession_number, '-', '')"
+    insert_sql = _insert_ignore(
+        engine,
+        "compact_filings (id, cik, form_type_id, filing_date, accession, "
+        "primary_document_filename, download_status, local_path, downloaded_at, byte_size)",
+        f"SELECT f.id, {_as_integer(engine, 'f.cik')}, ft.id, f.filing_date, "
+        f"{_as_integer(engine, accession_digits)}, "
+        f"f.primary_document_filename, "
+        f"f.download_status, f.local_path, f.downloaded_at, f.byte_size "
+        f"FROM filings f JOIN form_types ft ON ft.code = f.form_type "
+        f"WHERE f.id BETWEEN :low AND :high")
+    for low in range(min_id, max_id + 1, batch_size):
+        high = low + batch_size - 1
+        with engine.begin() as conn:
+            copied += conn.execute(insert_sql, {
+                "low": low,
+                "high": high
+            }).rowcount
+        logger.info(f"compact_filings: ids up to {min(high, max_id)} done "
+                    f"({copied} rows copied so far).")
+    return copied
+
+
+def verify(engine: Engine) -> bool:
+    """Compares row counts between the original and compact tables."""
+    with engine.connect() as conn:
+        counts = {
+            name: conn.execute(select(func.count()).select_from(table)).scalar()
+            for name, table in (("companies", Company.__table__),
+                                ("compact_companies", CompactCompany.__table__),
+                                ("filings", Filing.__table__),
+                                ("compact_filings", CompactFiling.__table__))
+        }
+    for name, count in counts.items():
+        logger.info(f"{name}: {count} rows")
+    ok = (counts["companies"] == counts["compact_companies"]
+          and counts["filings"] == counts["compact_filings"])
+    if not ok:
+        # Typically filings whose CIK has no company row (dropped by the integer FK)
+        logger.warning("Row counts differ between original and compact tables.")
+    return ok
+
+
+def run_migration(engine: Engine, batch_size: int = 200000) -> bool:
+    """Creates the compact tables and copies all data. Returns verify()'s result."""
+    CompactBase.metadata.create_all(bind=engine)
+    migrate_form_types(engine)
+    migrate_companies(engine)
+    migrate_filings(engine, batch_size)
+    return verify(engine)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Migrate FinLens data to the compact integer-keyed schema.")
+    parser.add_argument("--batch-size",
+                        type=int,
+                        default=200000,
+                        help="Filing ids copied per transaction.")
+    parser.add_argument("--verify-only",
+                        action="store_true",
+                        help="Only compare row counts.")
+    args = parser.parse_args(argv)
+
+    from src.config.logging_config import setup_logging
+    from src.config.settings import get_settings
+    from src.database.session import initialize_database
+    setup_logging()
+
+    engine, _ = initialize_database(get_settings().database)
+    try:
+        ok = verify(engine) if args.verify_only else run_migration(
+            engine, args.batch_size)
+    finally:
+        engine.dispose()
+    if ok:
+        logger.info("Compact schema is in sync. Set DB_COMPACT_SCHEMA=true to use it.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# src/database/migrations.py
+"""
+Versioned, idempotent schema migrations.
+
+The schema_version table holds one row per component ('core' for the
+standard tables, 'compact' for the optional DB_COMPACT_SCHEMA tables) with
+the number of the last migration applied. On startup, is_schema_current()
+reads that table (one tiny SELECT) and initialize_database skips all DDL,
+reflection and CREATE DATABASE when nothing is pending.
+
+Every migration step checks the live schema before changing it, so steps can
+be re-run on databases created before versioning existed (version 0). On
+MySQL and PostgreSQL, upgrade() holds a named lock (GET_LOCK /
+pg_advisory_lock) and re-reads schema_version once it has it, so processes
+starting at the same time migrate one after the other; the check-then-ALTER
+steps alone would race (DDL commits implicitly on MySQL). SQLite and DuckDB
+migrations aren't serialized: let one process migrate before starting others.
+
+To change the schema, append a step to CORE_MIGRATIONS / COMPACT_MIGRATIONS.
+Never edit or renumber an applied step.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import (BigInteger, Column, DateTime, Integer, MetaData, String,
+                        Table, inspect, select, text)
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeEngine
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database import models
+from src.database.dialects import get_backend
+
+logger = logging.getLogger(__name__)
+
+CORE = "core"
+COMPACT = "compact"
+
+# Kept out of the model metadata so the fast check never depends on create_all()
+_version_metadata = MetaData()
+schema_version = Table(
+    'schema_version',
+    _version_metadata,
+    Column('component', String(32), primary_key=True),
+    Column('version', Integer, nullable=False),
+    Column('updated_at', DateTime, nullable=True),
+)
+
+# (version, description, step)
+Migration = Tuple[int, str, Callable[[Engine], None]]
+
+
+# --- Idempotent DDL helpers ---
+def _column_ddl(dialect, column_type: TypeEngine, nullable: bool = True,
+                default: Optional[str] = None) -> str:
+    """Column definition for ADD COLUMN, with the type spelled for this dialect."""
+    ddl = column_type.compile(dialect=dialect)
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    return ddl + (" NULL" if nullable else " NOT NULL")
+
+
+def _add_column(engine: Engine, table_name: str, column_name: str,
+                column_type: TypeEngine, nullable: bool = True,
+                default: Optional[str] = None) -> None:
+    """
+    ALTER TABLE ... ADD COLUMN unless the column (or the table) is missing/present.
+    default is a SQL literal (e.g. "'pending'").
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return
+    if column_name in {c['name'] for c in inspector.get_columns(table_name)}:
+        return
+    ddl = _column_ddl(engine.dialect, column_type, nullable, default)
+    logger.info(f"Adding column {table_name}.{column_name} ({ddl})...")
+    with engine.begin() as connection:
+        connection.execute(
+            text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}"))
+
+
+def _add_index(engine: Engine, table_name: str, index_name: str,
+               column_list: str) -> None:
+    """CREATE INDEX unless it already exists (or the table is missing)."""
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        return
+    if index_name in {i['name'] for i in inspector.get_indexes(table_name)}:
+        return
+    logger.info(f"Creating index {index_name} on {table_name} ({column_list})...")
+    with engine.begin() as connection:
+        connection.execute(
+            text(f"CREATE INDEX {index_name} ON {table_name} ({column_list})"))
+
+
+# --- Core tables ---
+def _create_core_tables(engine: Engine) -> None:
+    models.Base.metadata.create_all(bind=engine)
+
+
+def _filings_download_tracking(engine: Engine) -> None:
+    _add_column(engine, "filings", "download_status", String(16),
+                nullable=False, default="'pending'")
+    _add_column(engine, "filings", "local_path", String(512))
+    _add_column(engine, "filings", "downloaded_at", DateTime())
+    _add_column(engine, "filings", "byte_size", BigInteger())
+    _add_index(engine, "filings", "idx_download_status",
+               "download_status, form_type, filing_date")
+
+
+CORE_MIGRATIONS: List[Migration] = [
+    (1, "Create base tables", _create_core_tables),
+    (2, "companies.content_hash",
+     lambda engine: _add_column(engine, "companies", "content_hash", BigInteger())),
+    (3, "filings download tracking columns and index", _filings_download_tracking),
+]
+
+
+# --- Compact tables (DB_COMPACT_SCHEMA) ---
+def _create_compact_tables(engine: Engine) -> None:
+    from src.database.compact import CompactBase
+    CompactBase.metadata.create_all(bind=engine)
+
+
+def _compact_filings_download_tracking(engine: Engine) -> None:
+    _add_column(engine, "compact_filings", "download_status", String(16),
+                nullable=False, default="'pending'")
+    _add_column(engine, "compact_filings", "local_path", String(512))
+    _add_column(engine, "compact_filings", "downloaded_at", DateTime())
+    _add_column(engine, "compact_filings", "byte_size", BigInteger())
+    _add_index(engine, "compact_filings", "idx_cdownload_status",
+               "download_status, form_type_id, filing_date")
+
+
+COMPACT_MIGRATIONS: List[Migration] = [
+    (1, "Create compact tables", _create_compact_tables),
+    (2, "compact_filings download tracking columns and index",
+     _compact_filings_download_tracking),
+]
+
+_MIGRATIONS: Dict[str, List[Migration]] = {
+    CORE: CORE_MIGRATIONS,
+    COMPACT: COMPACT_MIGRATIONS,
+}
+
+
+def required_versions(compact_schema: bool) -> Dict[str, int]:
+    """Latest migration number of each component this configuration needs."""
+    components = [CORE, COMPACT] if compact_schema else [CORE]
+    return {c: _MIGRATIONS[c][-1][0] for c in components}
+
+
+# --- Version bookkeeping ---
+def current_versions(engine: Engine) -> Dict[str, int]:
+    """
+    Reads {component: version} from schema_version.
+
+    Raises:
+        SQLAlchemyError: If the table (or the database) doesn't exist yet.
+    """
+    with engine.connect() as connection:
+        return {
+            component: version
+            for component, version in connection.execute(
+                select(schema_version.c.component, schema_version.c.version))
+        }
+
+
+def is_schema_current(engine: Engine, compact_schema: bool = False) -> bool:
+    """Fast startup check: True if no migration is pending (any error counts as 'not current')."""
+    try:
+        versions = current_versions(engine)
+    except SQLAlchemyError as e:
+        logger.debug(f"Schema version check failed ({e.__class__.__name__}); "
+                     f"migrations will run.")
+        return False
+    return all(
+        versions.get(component, 0) >= required
+        for component, required in required_versions(compact_schema).items())
+
+
+def _record_version(engine: Engine, component: str, version: int) -> None:
+    backend = get_backend(engine.dialect.name)
+    with engine.begin() as connection:
+        connection.execute(
+            backend.upsert(schema_version, ('component', ),
+                           ('version', 'updated_at')), {
+                               'component': component,
+                               'version': version,
+                               'updated_at': datetime.now()
+                           })
+
+
+def upgrade(engine: Engine, compact_schema: bool = False) -> Dict[str, int]:
+    """
+    Applies pending migrations for the needed components, recording each
+    step's version as it completes.
+
+    Returns:
+        {component: version} after the upgrade.
+
+    Raises:
+        SQLAlchemyError: If a step fails (earlier steps stay recorded).
+        DatabaseError: If another process holds the migration lock too long.
+    """
+    with get_backend(engine.dialect.name).migration_lock(engine):
+        _version_metadata.create_all(bind=engine)
+        # Read under the lock: another process may have just migrated
+        versions = current_versions(engine)
+        for component in required_versions(compact_schema):
+            current = versions.get(component, 0)
+            for version, description, step in _MIGRATIONS[component]:
+                if version <= current:
+                    continue
+                logger.info(f"Applying {component} migration {version}: {description}")
+                step(engine)
+                _record_version(engine, component, version)
+                current = version
+            versions[component] = current
+    return versions
@@ -3,7 +3,7 @@ import logging
 import sys
 # from dotenv import load_dotenv # Removed - Handled by settings.py
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Index, Boolean
 # from sqlalchemy.dialects.mysql import TEXT # Only needed if you use TEXT type
 
 # Basic Logging Setup (Can potentially be centralized later)
@@ -19,6 +19,14 @@ if not logger.handlers:
 # Base class for declarative models
 Base = declarative_base()
 
+# Filing.download_status values
+DOWNLOAD_PENDING = 'pending'  # Not downloaded yet (default)
+DOWNLOAD_DONE = 'downloaded'  # Primary document saved to local_path
+DOWNLOAD_FAILED = 'failed'  # Transient error; retried on the next run
+DOWNLOAD_SKIPPED = 'skipped'  # No primary document / likely ABS; not retried
+# Statuses selected by the pending-work query
+DOWNLOAD_TODO_STATUSES = (DOWNLOAD_PENDING, DOWNLOAD_FAILED)
+
 
 # Define Database Models (Company, Filing - unchanged model definitions)
 class Company(Base):
@@ -49,6 +57,10 @@ class Company(Base):
                    nullable=True)  # Slightly longer for international etc.
     # ----------------------------
 
+    # Signed 64-bit hash of the mapped fields above (see CompanyRepository);
+    # lets bulk_upsert skip rows whose content hasn't changed
+    content_hash = Column(BigInteger, nullable=True)
+
     filings = relationship(
         "Filing", back_populates="company")  # Use back_populates for clarity
 
@@ -66,6 +78,14 @@ class Filing(Base):
     filing_date = Column(Date, nullable=False)
     accession_number = Column(String(30), unique=True, nullable=False)
     primary_document_filename = Column(String(255), nullable=True)
+    # Document download tracking (see FilingRepository.mark_download_results)
+    download_status = Column(String(16),
+                             nullable=False,
+                             default=DOWNLOAD_PENDING,
+                             server_default=DOWNLOAD_PENDING)
+    local_path = Column(String(512), nullable=True)
+    downloaded_at = Column(DateTime, nullable=True)
+    byte_size = Column(BigInteger, nullable=True)
 
     company = relationship(
         "Company", back_populates="filings")  # Define relationship back
@@ -75,6 +95,9 @@ class Filing(Base):
         Index('idx_cik', 'cik'),
         Index('idx_accession',
               'accession_number'),  # Added index for accession number lookups
+        # Pending-work range scans: status -> form type -> date
+        Index('idx_download_status', 'download_status', 'form_type',
+              'filing_date'),
     )
 
     def __repr__(self):
@@ -0,0 +1,348 @@
+# src/database/partitioning.py
+"""
+Optional year-partitioned layout for the filings table (MySQL only).
+
+Usage:
+    python -m src.database.partitioning status
+    python -m src.database.partitioning convert [--table compact_filings]
+    python -m src.database.partitioning add-years --through 2030
+    python -m src.database.partitioning archive 1995
+    python -m src.database.partitioning restore 1995
+
+convert rebuilds the table as RANGE COLUMNS(filing_date) with one partition
+per filing year (p1994, p1995, ...) plus a catch-all pmax. MySQL requires every
+unique key to contain the partitioning column, and partitioned InnoDB tables
+can't have foreign keys, so it also:
+  - replaces PRIMARY KEY (id) with PRIMARY KEY (id, filing_date),
+  - replaces the UNIQUE accession key with UNIQUE (accession, filing_date),
+  - drops the foreign keys (CIK integrity is kept by the ingest path, which
+    upserts companies before their filings).
+An accession number always carries the same filing date, so INSERT IGNORE
+still skips re-ingested filings; the accession index pre-filter dedupes on
+the accession number alone.
+
+Queries with a filing_date range (iter_filings_for_download, iter_filings,
+mark_download_results when the date is known) only touch the partitions of
+that range. Inserts for the current year go to one small partition, and old
+years can be moved out with archive (ALTER TABLE ... EXCHANGE PARTITION into
+a plain <table>_archive_<year> table, a metadata-only swap) and back with
+restore. The conversion copies the table once, so run it in a quiet window.
+
+Archived filings are no longer in the table, so its unique key can't stop
+them from being inserted again. The accession index therefore also loads
+the accession numbers of every <table>_archive_<year> table (see
+archived_years()); with DB_ACCESSION_INDEX off, a backfill of an archived
+year re-inserts its filings. restore then merges the archive back with
+INSERT IGNORE ... SELECT (a row copy) instead of the metadata-only swap,
+keeping the rows already in the partition.
+"""
+
+import argparse
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from src.core.exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# Partition holding everything past the last yearly partition
+MAX_PARTITION = "pmax"
+# Filings start in 1993/1994 (EDGAR); earlier dates land in the first partition
+DEFAULT_FIRST_YEAR = 1994
+
+
+@dataclass(frozen=True)
+class _PartitionedTable:
+    name: str
+    # Column with the (single-column) UNIQUE key to widen with filing_date
+    unique_column: str
+
+
+_TABLES: Dict[str, _PartitionedTable] = {
+    "filings": _PartitionedTable("filings", "accession_number"),
+    "compact_filings": _PartitionedTable("compact_filings", "accession"),
+}
+
+
+def _get_table(table_name: str) -> _PartitionedTable:
+    try:
+        return _TABLES[table_name]
+    except KeyError:
+        raise ConfigurationError(
+            f"Table '{table_name}' can't be partitioned "
+            f"(expected one of: {', '.join(sorted(_TABLES))})")
+
+
+def _check_mysql(engine: Engine) -> None:
+    if engine.dialect.name != "mysql":
+        raise ConfigurationError(
+            f"Filing partitioning is only supported on MySQL "
+            f"(DB_BACKEND={engine.dialect.name})")
+
+
+def partition_name(year: int) -> str:
+    return f"p{year}"
+
+
+def _year_partition_sql(year: int) -> str:
+    return (f"PARTITION {partition_name(year)} "
+            f"VALUES LESS THAN ('{year + 1}-01-01')")
+
+
+def _max_partition_sql() -> str:
+    return f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)"
+
+
+def partition_clause(first_year: int, last_year: int) -> str:
+    """PARTITION BY clause with yearly partitions first_year..last_year plus pmax."""
+    partitions = [
+        _year_partition_sql(year) for year in range(first_year, last_year + 1)
+    ]
+    partitions.append(_max_partition_sql())
+    return ("PARTITION BY RANGE COLUMNS(filing_date) (\n    " +
+            ",\n    ".join(partitions) + "\n)")
+
+
+# --- Inspection ---
+def get_partitions(engine: Engine,
+                   table_name: str = "filings") -> List[Tuple[str, Optional[str], int]]:
+    """
+    Returns [(partition name, upper bound expression, approximate row count)]
+    in partition order; empty if the table isn't partitioned.
+    """
+    _check_mysql(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS "
+                 "FROM information_schema.PARTITIONS "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+                 "ORDER BY PARTITION_ORDINAL_POSITION"), {
+                     "table": table_name
+                 }).all()
+    return [(name, bound, count or 0) for name, bound, count in rows
+            if name is not None]
+
+
+def is_partitioned(engine: Engine, table_name: str = "filings") -> bool:
+    return bool(get_partitions(engine, table_name))
+
+
+def _partition_years(engine: Engine, table_name: str) -> List[int]:
+    return sorted(
+        int(name[1:]) for name, _, _ in get_partitions(engine, table_name)
+        if name != MAX_PARTITION)
+
+
+# --- Conversion ---
+def convert(engine: Engine,
+            table_name: str = "filings",
+            through_year: Optional[int] = None) -> None:
+    """
+    Rebuilds table_name partitioned by filing year (see module docstring).
+    Yearly partitions run from the oldest filing year (at most
+    DEFAULT_FIRST_YEAR) through through_year (default: next year).
+    Does nothing if the table is already partitioned.
+    """
+    _check_mysql(engine)
+    table = _get_table(table_name)
+    if is_partitioned(engine, table.name):
+        logger.info(f"{table.name} is already partitioned.")
+        return
+
+    inspector = inspect(engine)
+    with engine.connect() as conn:
+        min_date = conn.execute(
+            text(f"SELECT MIN(filing_date) FROM {table.name}")).scalar()
+    first_year = min(min_date.year, DEFAULT_FIRST_YEAR) if min_date else DEFAULT_FIRST_YEAR
+    last_year = through_year or date.today().year + 1
+
+    statements = [
+        f"ALTER TABLE {table.name} DROP FOREIGN KEY {fk['name']}"
+        for fk in inspector.get_foreign_keys(table.name) if fk.get('name')
+    ]
+    key_changes = ["DROP PRIMARY KEY", "ADD PRIMARY KEY (id, filing_date)"]
+    for index in inspector.get_indexes(table.name):
+        if index.get('unique') and index['column_names'] == [table.unique_column]:
+            key_changes.append(f"DROP INDEX {index['name']}")
+    key_changes.append(f"ADD UNIQUE KEY uq_{table.unique_column}_date "
+                       f"({table.unique_column}, filing_date)")
+    statements.append(f"ALTER TABLE {table.name} " + ", ".join(key_changes))
+    statements.append(f"ALTER TABLE {table.name} " +
+                      partition_clause(first_year, last_year))
+
+    for statement in statements:
+        logger.info(f"Executing: {statement}")
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+    logger.info(f"{table.name} partitioned by year ({first_year}-{last_year} + {MAX_PARTITION}).")
+
+
+def add_years(engine: Engine,
+              table_name: str = "filings",
+              through_year: Optional[int] = None) -> List[int]:
+    """
+    Splits yearly partitions off pmax up to through_year (default: next year).
+    Cheap while pmax is empty, so run it ahead of each new year (e.g. from cron).
+
+    Returns:
+        The years added.
+    """
+    table = _get_table(table_name)
+    years = _partition_years(engine, table.name)
+    if not years:
+        raise ConfigurationError(f"{table.name} isn't partitioned; run convert first")
+    through_year = through_year or date.today().year + 1
+    new_years = list(range(years[-1] + 1, through_year + 1))
+    if new_years:
+        partitions = [_year_partition_sql(year) for year in new_years]
+        partitions.append(_max_partition_sql())
+        statement = (f"ALTER TABLE {table.name} REORGANIZE PARTITION {MAX_PARTITION} "
+                     f"INTO ({', '.join(partitions)})")
+        logger.info(f"Executing: {statement}")
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+    return new_years
+
+
+# --- Archiving ---
+def archive_table_name(table_name: str, year: int) -> str:
+    return f"{table_name}_archive_{year}"
+
+
+def archived_years(engine: Engine, table_name: str = "filings") -> List[int]:
+    """Years of table_name moved out by archive_year() (any dialect; usually none)."""
+    pattern = re.compile(rf"{re.escape(table_name)}_archive_(\d{{4}})")
+    return sorted(
+        int(match.group(1))
+        for match in map(pattern.fullmatch, inspect(engine).get_table_names())
+        if match)
+
+
+def archive_year(engine: Engine, year: int, table_name: str = "filings") -> str:
+    """
+    Moves the rows of one year out of table_name into an unpartitioned
+    <table>_archive_<year> table (EXCHANGE PARTITION swaps the data files, no
+    row copy). The emptied partition stays in place for restore_year().
+    The accession index keeps treating the archived filings as known (see
+    the module docstring).
+
+    Returns:
+        The archive table name.
+    """
+    table = _get_table(table_name)
+    if year not in _partition_years(engine, table.name):
+        raise ConfigurationError(f"{table.name} has no partition for {year}")
+    archive = archive_table_name(table.name, year)
+    if inspect(engine).has_table(archive):
+        raise ConfigurationError(f"Archive table {archive} already exists")
+    statements = [
+        f"CREATE TABLE {archive} LIKE {table.name}",
+        f"ALTER TABLE {archive} REMOVE PARTITIONING",
+        f"ALTER TABLE {table.name} EXCHANGE PARTITION {partition_name(year)} "
+        f"WITH TABLE {archive}",
+    ]
+    for statement in statements:
+        logger.info(f"Executing: {statement}")
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+    return archive
+
+
+def restore_year(engine: Engine, year: int, table_name: str = "filings") -> None:
+    """
+    Moves an archived year back (the inverse of archive_year()) and drops
+    the archive table. If rows were inserted into the year's partition in
+    the meantime, the archive is merged with INSERT IGNORE ... SELECT (rows
+    already in the table win) instead of swapped back.
+    """
+    table = _get_table(table_name)
+    archive = archive_table_name(table.name, year)
+    partition = partition_name(year)
+    if not inspect(engine).has_table(archive):
+        raise ConfigurationError(f"Archive table {archive} doesn't exist")
+    with engine.connect() as conn:
+        in_partition = conn.execute(
+            text(f"SELECT COUNT(*) FROM {table.name} PARTITION ({partition})")).scalar()
+    if in_partition:
+        logger.warning(
+            f"Partition {partition} of {table.name} has {in_partition} rows; "
+            f"merging {archive} row by row instead of swapping it back.")
+        columns = ", ".join(c['name'] for c in inspect(engine).get_columns(table.name))
+        statements = [
+            f"INSERT IGNORE INTO {table.name} ({columns}) "
+            f"SELECT {columns} FROM {archive}",
+        ]
+    else:
+        # EXCHANGE validates that every archived row belongs in the partition
+        statements = [
+            f"ALTER TABLE {table.name} EXCHANGE PARTITION {partition} WITH TABLE {archive}",
+        ]
+    statements.append(f"DROP TABLE {archive}")
+    for statement in statements:
+        logger.info(f"Executing: {statement}")
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Manage the year-partitioned filings layout (MySQL).")
+    parser.add_argument("--table",
+                        choices=sorted(_TABLES),
+                        default="filings",
+                        help="Table to operate on.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="List partitions and row estimates.")
+    for name, help_text in (("convert", "Partition the table by filing year."),
+                            ("add-years", "Split new yearly partitions off pmax.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--through",
+                             type=int,
+                             default=None,
+                             help="Last yearly partition (default: next year).")
+    for name, help_text in (("archive", "Move a year into <table>_archive_<year>."),
+                            ("restore", "Move an archived year back.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("year", type=int)
+    args = parser.parse_args(argv)
+
+    from src.config.logging_config import setup_logging
+    from src.config.settings import get_settings
+    from src.database.session import initialize_database
+    setup_logging()
+
+    engine, _ = initialize_database(get_settings().database)
+    try:
+        if args.command == "convert":
+            convert(engine, args.table, args.through)
+        elif args.command == "add-years":
+            added = add_years(engine, args.table, args.through)
+            logger.info(f"Added partitions for: {added or 'nothing (up to date)'}")
+        elif args.command == "archive":
+            archive = archive_year(engine, args.year, args.table)
+            logger.info(f"Archived {args.year} into {archive}.")
+        elif args.command == "restore":
+            restore_year(engine, args.year, args.table)
+            logger.info(f"Restored {args.year} into {args.table}.")
+        for name, bound, rows in get_partitions(engine, args.table):
+            logger.info(f"{args.table} {name:>6} < {bound}: ~{rows} rows")
+        archived = archived_years(engine, args.table)
+        if archived:
+            logger.info(f"{args.table} archived years: {archived}")
+    except ConfigurationError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,32 @@
 # src/database/repositories/base.py
 
 import logging
+import time
+import zlib
+import concurrent.futures
 from abc import ABC  # Abstract Base Class
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from sqlalchemy.orm import scoped_session, Session
-from typing import Callable  # To type hint the session_factory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple  # To type hint the session_factory
+
+from src.database import staging
+from src.database.cache import LRUCache
+from src.database.dialects import DatabaseBackend, get_backend
+from src.database.session import get_session
+from src.core.exceptions import BulkLoadUnavailableError, DatabaseError
+from src.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
 # Type alias for the session factory callable
 SessionFactory = Callable[[], Session]
 
+# Builds the statement for one group of rows, given the (sorted) keys the rows share
+StatementBuilder = Callable[[Tuple[str, ...]], Any]
+
+# Base delay (seconds) for the exponential backoff between batch retries
+_RETRY_BACKOFF_SECONDS = 0.5
+
 
 class AbstractRepository(ABC):
     """
@@ -33,6 +50,185 @@ class AbstractRepository(ABC):
         self.session_factory = session_factory
         logger.info(f"{self.__class__.__name__} initialized.")
 
+    @property
+    def backend(self) -> DatabaseBackend:
+        """Dialect layer for the bound engine (MySQL if it can't be determined)."""
+        try:
+            dialect_name = self.session_factory.get_bind().dialect.name
+        except Exception:
+            dialect_name = "mysql"  # Unbound/unknown session factory
+        return get_backend(dialect_name)
+
+    @staticmethod
+    def _new_cache() -> Optional[LRUCache]:
+        """Creates a lookup cache per the DB_CACHE_* settings (None when disabled)."""
+        db_settings = get_settings().database
+        if not db_settings.cache_enabled or db_settings.cache_capacity <= 0:
+            return None
+        return LRUCache(db_settings.cache_capacity,
+                        db_settings.cache_ttl_seconds)
+
+    # --- Batched bulk writes ---
+    def _execute_batched_write(self, build_statement: StatementBuilder,
+                               rows: Sequence[Dict], shard_key: str,
+                               description: str) -> int:
+        """
+        Executes a bulk write as many executemany() batches instead of one
+        giant multi-row statement, and spreads the batches over several pooled
+        connections.
+
+        Rows are grouped by their key set (executemany needs identical
+        parameters), then sharded by crc32(row[shard_key]) so the same key
+        always lands on the same connection (no cross-connection lock waits on
+        one key). Each shard runs on its own thread with its own session; each
+        batch is its own transaction and is retried with backoff on
+        OperationalError (deadlocks, lost connections).
+
+        Note that batches commit independently: if one batch finally fails,
+        batches already written stay committed. The statements used here are
+        idempotent (INSERT IGNORE / upsert), so re-running the input is safe.
+
+        Args:
+            build_statement: Callable returning the statement for a key set.
+            rows: Row mappings to write.
+            shard_key: Mapping key used to assign rows to connections.
+            description: Short label for log messages (e.g. "company upsert").
+
+        Returns:
+            The sum of the driver-reported rowcounts over all batches.
+
+        Raises:
+            DatabaseError: If any batch still fails after its retries.
+        """
+        if not rows:
+            return 0
+        db_settings = get_settings().database
+        batch_size = max(1, db_settings.write_batch_size)
+        num_batches_estimate = -(-len(rows) // batch_size)  # Ceiling division
+        write_workers = db_settings.write_workers
+        if self.backend.max_write_workers is not None:
+            # e.g. SQLite: one writer at a time, extra connections only contend
+            write_workers = min(write_workers, self.backend.max_write_workers)
+        num_shards = max(1, min(write_workers, num_batches_estimate))
+
+        # Group by key set, then distribute each group across the shards
+        groups: Dict[Tuple[str, ...], List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        shards: List[List[Tuple[Any, List[Dict]]]] = [[] for _ in range(num_shards)]
+        for keys, group_rows in groups.items():
+            statement = build_statement(keys)  # Built once, reused by every batch
+            shard_rows: List[List[Dict]] = [[] for _ in range(num_shards)]
+            for row in group_rows:
+                shard_index = zlib.crc32(str(row[shard_key]).encode()) % num_shards
+                shard_rows[shard_index].append(row)
+            for shard_index, rows_in_shard in enumerate(shard_rows):
+                for start in range(0, len(rows_in_shard), batch_size):
+                    shards[shard_index].append(
+                        (statement, rows_in_shard[start:start + batch_size]))
+
+        total_batches = sum(len(shard) for shard in shards)
+        logger.info(
+            f"Executing {description} for {len(rows)} rows in {total_batches} "
+            f"batches of up to {batch_size} over {num_shards} connection(s)...")
+
+        def _run_shard(shard: List[Tuple[Any, List[Dict]]]) -> int:
+            return sum(
+                self._execute_batch_with_retry(statement, batch, description,
+                                               db_settings.write_max_retries)
+                for statement, batch in shard)
+
+        if num_shards == 1:
+            return _run_shard(shards[0])
+
+        total_rowcount = 0
+        first_error: Optional[Exception] = None
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_shards,
+                thread_name_prefix=f"{self.__class__.__name__}-writer") as executor:
+            futures = [executor.submit(_run_shard, shard) for shard in shards if shard]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    total_rowcount += future.result()
+                except Exception as e:
+                    # Let the other shards finish; report the first failure afterwards
+                    first_error = first_error or e
+        if first_error is not None:
+            if isinstance(first_error, DatabaseError):
+                raise first_error
+            raise DatabaseError(f"{description} failed: {first_error}")
+        return total_rowcount
+
+    # --- Staged bulk loads (very large writes) ---
+    def _should_use_staged_write(self, row_count: int) -> bool:
+        """True if row_count reaches DB_BULK_LOAD_THRESHOLD and the dialect supports staging."""
+        threshold = get_settings().database.bulk_load_threshold
+        if threshold <= 0 or row_count < threshold:
+            return False
+        try:
+            dialect_name = self.session_factory.get_bind().dialect.name
+        except Exception:
+            return False  # Unbound/unknown session factory: use the batched path
+        return staging.is_available(dialect_name)
+
+    def _execute_staged_write(self, table: Any, columns: Sequence[str],
+                              rows: Iterable[Sequence[Any]], mode: str,
+                              key_columns: Sequence[str],
+                              description: str) -> int:
+        """
+        Writes rows through a temporary staging table and one set-based merge
+        (see src.database.staging.staged_merge), in a single transaction.
+
+        Returns:
+            The merge's rowcount.
+
+        Raises:
+            BulkLoadUnavailableError: If the loader was refused; callers should
+                                      fall back to _execute_batched_write.
+            DatabaseError: On any other database failure.
+        """
+        start = time.monotonic()
+        try:
+            with get_session(self.session_factory) as session:
+                rows_staged, rows_affected = staging.staged_merge(
+                    session, table, columns, rows, mode, key_columns)
+        except BulkLoadUnavailableError:
+            raise
+        except SQLAlchemyError as e:
+            logger.error(f"{description} (staged load) failed: {e}", exc_info=True)
+            raise DatabaseError(f"{description} failed: {e}")
+        logger.info(
+            f"{description}: staged {rows_staged} rows and merged in "
+            f"{time.monotonic() - start:.1f}s (rows affected: {rows_affected}).")
+        return rows_affected
+
+    def _execute_batch_with_retry(self, statement: Any, batch: List[Dict],
+                                  description: str, max_retries: int) -> int:
+        """Runs one executemany batch in its own transaction, retrying transient errors."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with get_session(self.session_factory) as session:
+                    result = session.execute(statement, batch)
+                    return result.rowcount
+            except OperationalError as e:
+                if attempt > max_retries:
+                    logger.error(
+                        f"{description} batch of {len(batch)} rows failed after "
+                        f"{attempt} attempts: {e}")
+                    raise DatabaseError(f"{description} failed: {e}")
+                delay = _RETRY_BACKOFF_SECONDS * (2**(attempt - 1))
+                logger.warning(
+                    f"{description} batch of {len(batch)} rows failed "
+                    f"(attempt {attempt}/{max_retries + 1}): {e.__class__.__name__}. "
+                    f"Retrying in {delay:.1f}s.")
+                time.sleep(delay)
+            except SQLAlchemyError as e:
+                logger.error(f"{description} batch of {len(batch)} rows failed: {e}",
+                             exc_info=True)
+                raise DatabaseError(f"{description} failed: {e}")
+
     # Concrete repository subclasses will implement specific data access methods
     # (e.g., add_company, get_filing_by_accession, bulk_merge_companies)
     # using the self.session_factory, often with the get_session context manager.
@@ -1,23 +1,51 @@
 # src/database/repositories/company.py
 
 import logging
-from typing import List, Dict, Optional, Set, Sequence
-from sqlalchemy import select, inspect, func
+import hashlib
+import threading
+from typing import Any, List, Dict, Optional, Set, Sequence
+from sqlalchemy import select, inspect
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 
 from .base import AbstractRepository, SessionFactory
+from .schemas import company_schema
 from src.database.models import Company
 from src.database.session import get_session
-from src.core.exceptions import DatabaseError, DatabaseQueryError
+from src.core.exceptions import BulkLoadUnavailableError, DatabaseError, DatabaseQueryError
+from src.database.staging import MERGE_UPSERT
+from src.database.cache import MISSING
+from src.core.identifiers import cik_to_int
+from src.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Mapped fields covered by Company.content_hash (everything except the key and the hash)
+COMPANY_HASH_FIELDS = tuple(col.name for col in Company.__table__.columns
+                            if col.name not in ('cik', 'content_hash'))
+
+
+def compute_company_hash(mapping: Dict[str, Any]) -> int:
+    """
+    Returns a signed 64-bit hash (fits a BIGINT) of the mapped company fields.
+    Only keys present in the mapping contribute, so a partial mapping never
+    hashes equal to a full one.
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    for field in COMPANY_HASH_FIELDS:
+        if field in mapping:
+            hasher.update(f"{field}\x1f{mapping[field]!r}\x1e".encode('utf-8'))
+    return int.from_bytes(hasher.digest(), 'big', signed=True)
+
 
 class CompanyRepository(AbstractRepository):
     """
     Provides data access methods for Company entities.
-    Uses MySQL INSERT ... ON DUPLICATE KEY UPDATE for bulk merging/upserting.
+    Uses MySQL INSERT ... ON DUPLICATE KEY UPDATE (or the backend's ON CONFLICT
+    equivalent, see dialects.py) for bulk merging/upserting.
+
+    With DB_COMPACT_SCHEMA the data lives in compact_companies (INT CIK); CIKs
+    are translated at the edges by the schema adapter (see schemas.py), so
+    callers still pass and get string CIKs.
     """
 
     def __init__(self, session_factory: SessionFactory):
@@ -29,18 +57,42 @@ class CompanyRepository(AbstractRepository):
                              that returns a new Session object when called.
         """
         super().__init__(session_factory)  # Initialize the base class
+        # CIK (as int) -> content_hash of the row in the DB; filled by upserts,
+        # complete once a large upsert has loaded every hash
+        self._hash_cache: Dict[int, int] = {}
+        self._hash_cache_complete = False
+        self._hash_cache_lock = threading.Lock()
+        self.compact = get_settings().database.compact_schema
+        self._schema = company_schema(self.compact)
+        self._model = self._schema.model
+        # CIK -> detached Company (or None if absent); see DB_CACHE_* settings
+        self._cache = self._new_cache()
 
     def get_by_cik(self, cik: str) -> Optional[Company]:
-        """Retrieves a single Company by its CIK."""
+        """
+        Retrieves a single Company by its CIK.
+
+        The returned object is detached from its session (safe to read after the
+        call, shared via the lookup cache when enabled); treat it as read-only.
+        """
+        if self._cache is not None:
+            cached = self._cache.get(cik)
+            if cached is not MISSING:
+                return cached
         logger.debug(f"Querying Company by CIK: {cik}")
         with get_session(self.session_factory) as session:
             try:
-                stmt = select(Company).where(Company.cik == cik)
-                result = session.execute(stmt)
-                company = result.scalar_one_or_none()
+                key = self._schema.encode_cik(cik)
+                row = None if key is None else session.execute(
+                    select(self._model).where(
+                        self._model.cik == key)).scalar_one_or_none()
+                # Detached Company with the string CIK
+                company = self._schema.to_company(session, row) if row else None
                 logger.debug(
                     f"Company query result for CIK {cik}: {'Found' if company else 'Not Found'}"
                 )
+                if self._cache is not None:
+                    self._cache.put(cik, company)
                 return company
             except SQLAlchemyError as e:
                 logger.error(
@@ -48,6 +100,42 @@ class CompanyRepository(AbstractRepository):
                     exc_info=True)
                 raise DatabaseQueryError(f"Failed to query company CIK {cik}")
 
+    def get_many_by_cik(self, ciks: Sequence[str]) -> Dict[str, Company]:
+        """
+        Retrieves several companies at once (cache first, then chunked IN queries).
+
+        Returns:
+            {cik: Company} for the CIKs that exist; objects are detached (read-only).
+        """
+        wanted = list(dict.fromkeys(ciks))
+        if self._cache is not None:
+            cached, missing = self._cache.get_many(wanted)
+            companies = {c: company for c, company in cached.items() if company}
+        else:
+            companies, missing = {}, wanted
+        if not missing:
+            return companies
+
+        loaded: Dict[str, Optional[Company]] = dict.fromkeys(missing)
+        batch_size = 10000
+        with get_session(self.session_factory) as session:
+            try:
+                for i in range(0, len(missing), batch_size):
+                    by_key = {self._schema.encode_cik(c): c
+                              for c in missing[i:i + batch_size]}
+                    stmt = select(self._model).where(
+                        self._model.cik.in_([k for k in by_key if k is not None]))
+                    for row in session.execute(stmt).scalars():
+                        loaded[by_key[row.cik]] = self._schema.to_company(session, row)
+            except SQLAlchemyError as e:
+                logger.error(f"Database error querying companies by CIK: {e}",
+                             exc_info=True)
+                raise DatabaseQueryError("Failed to query companies by CIK")
+        if self._cache is not None:
+            self._cache.put_many(loaded)
+        companies.update((c, company) for c, company in loaded.items() if company)
+        return companies
+
     def get_existing_ciks(self, ciks_to_check: Sequence[str]) -> Set[str]:
         """Checks a list of CIKs against the database and returns the set of those that exist."""
         if not ciks_to_check:
@@ -57,17 +145,32 @@ class CompanyRepository(AbstractRepository):
         # Consider making batch_size configurable if needed
         batch_size = 10000
         ciks_list = list(ciks_to_check)
+        if self._cache is not None:
+            # Cached lookups (Company or None) answer existence without a query
+            cached, ciks_list = self._cache.get_many(ciks_list)
+            existing_ciks.update(c for c, company in cached.items() if company)
+            if not ciks_list:
+                return existing_ciks
         with get_session(self.session_factory) as session:
             try:
                 for i in range(0, len(ciks_list), batch_size):
                     batch = ciks_list[i:i + batch_size]
                     if not batch: continue
-                    stmt = select(Company.cik).where(Company.cik.in_(batch))
-                    results = session.execute(stmt)
-                    existing_ciks.update(row.cik for row in results)
+                    # Report the caller's CIK strings for the keys that exist
+                    by_key = {self._schema.encode_cik(c): c for c in batch}
+                    stmt = select(self._model.cik).where(
+                        self._model.cik.in_([k for k in by_key if k is not None]))
+                    existing_ciks.update(by_key[row.cik]
+                                         for row in session.execute(stmt))
                 logger.debug(
                     f"Found {len(existing_ciks)} existing CIKs out of {len(ciks_list)} checked."
                 )
+                if self._cache is not None:
+                    # Remember the misses (a later get_by_cik returns None)
+                    self._cache.put_many({
+                        c: None
+                        for c in ciks_list if c not in existing_ciks
+                    })
                 return existing_ciks
             except SQLAlchemyError as e:
                 logger.error(f"Database error checking CIK existence: {e}",
@@ -77,7 +180,9 @@ class CompanyRepository(AbstractRepository):
     def bulk_upsert(self, company_mappings: List[Dict]) -> int:
         """
         Efficiently inserts new companies OR updates existing ones based on CIK
-        using MySQL's INSERT ... ON DUPLICATE KEY UPDATE.
+        using MySQL's INSERT ... ON DUPLICATE KEY UPDATE. Rows are written in
+        executemany batches of DB_WRITE_BATCH_SIZE over up to DB_WRITE_WORKERS
+        connections, sharded by CIK.
 
         Args:
             company_mappings: A list of dictionaries, where each dictionary represents
@@ -115,68 +220,193 @@ class CompanyRepository(AbstractRepository):
                 "No valid mappings remaining after filtering for CIK.")
             return 0
 
-        company_table = Company.__table__
-        mapper = inspect(Company)
-        # Determine all unique keys present across all valid input dictionaries, excluding 'cik'
-        all_keys = set(key for mapping in valid_mappings for key in mapping
-                       if key != 'cik')
-
-        # Prepare the dictionary for the ON DUPLICATE KEY UPDATE clause
-        update_columns = {}
-        for col in mapper.columns:
-            # Only include columns that are:
-            # 1. Not the primary key ('cik')
-            # 2. Actually present in the input data (in 'all_keys')
-            if not col.primary_key and col.name in all_keys:
-                # Get the actual column object from the table definition
-                column_object = company_table.c[col.name]
-                # Use func.values() to explicitly generate VALUES(column_name) syntax
-                update_columns[col.name] = func.values(column_object)
-
-        if not update_columns:
-            # This case could happen if the input mappings ONLY contain 'cik' after filtering
-            logger.warning(
-                "No columns (other than CIK) found in the input data to use for the "
-                "ON DUPLICATE KEY UPDATE clause. Check input data structure. "
-                "Attempting an INSERT IGNORE operation instead.")
-            # Fallback to INSERT IGNORE if no update columns identified
-            stmt = mysql_insert(company_table).values(valid_mappings)
-            stmt = stmt.prefix_with("IGNORE", dialect="mysql")
+        # Change detection: drop rows whose content matches what the DB already has
+        if get_settings().database.company_change_detection:
+            valid_mappings = self._filter_unchanged(valid_mappings)
+            if not valid_mappings:
+                logger.info(
+                    "Bulk upsert finished. All companies unchanged, nothing written."
+                )
+                return 0
         else:
-            # Construct the standard INSERT ... ON DUPLICATE KEY UPDATE statement
-            stmt = mysql_insert(company_table).values(valid_mappings)
-            stmt = stmt.on_duplicate_key_update(**update_columns)
+            # Keep the stored hashes current even when not skipping
+            valid_mappings = [{
+                **m, 'content_hash': compute_company_hash(m)
+            } for m in valid_mappings]
 
-        affected_rows = 0
-        with get_session(self.session_factory) as session:
+        # Rows as stored: compact mode swaps the string CIK for an int
+        write_mappings = self._schema.encode_mappings(valid_mappings)
+
+        company_table = self._model.__table__
+        mapper = inspect(self._model)
+        updatable_columns = {
+            col.name
+            for col in mapper.columns if not col.primary_key
+        }
+
+        # Very large inputs: staging table + one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE
+        if self._should_use_staged_write(len(valid_mappings)):
             try:
-                logger.info(
-                    f"Executing bulk upsert statement for {len(valid_mappings)} companies..."
-                )
-                result = session.execute(stmt)
-                # rowcount for ON DUPLICATE KEY UPDATE:
-                # 1 for each new row inserted
-                # 2 for each existing row updated (if value changed)
-                # 0 for each existing row not updated (if value didn't change)
-                affected_rows = result.rowcount
-                logger.info(
-                    f"Bulk upsert statement executed. MySQL 'rows affected': {affected_rows}"
-                )
-                # Commit is handled by the get_session context manager
+                affected_rows = self._staged_upsert(company_table, write_mappings)
+                self._invalidate_cached(valid_mappings)
+                self._remember_hashes(valid_mappings)
+                return affected_rows
+            except BulkLoadUnavailableError as e:
+                logger.warning(
+                    f"Staged bulk load unavailable ({e}); using batched upserts.")
+
+        backend = self.backend
+
+        def _build_statement(keys):
+            # Rows sharing this key set are bound as executemany parameters
+            # (no .values()), so the statement is reused across batches.
+            # The update clause only covers the columns actually present in
+            # these rows (never overwrite absent fields with defaults)
+            update_columns = [name for name in keys if name in updatable_columns]
+            if not update_columns:
+                # Rows only contain 'cik': nothing to update, falls back to INSERT IGNORE
+                logger.warning(
+                    "No columns (other than CIK) found in the input data to use for the "
+                    "ON DUPLICATE KEY UPDATE clause. Check input data structure. "
+                    "Attempting an INSERT IGNORE operation instead.")
+            return backend.upsert(company_table, ('cik', ), update_columns)
+
+        try:
+            # rowcount for ON DUPLICATE KEY UPDATE (summed over all batches):
+            # 1 for each new row inserted
+            # 2 for each existing row updated (if value changed)
+            # 0 for each existing row not updated (if value didn't change)
+            affected_rows = self._execute_batched_write(
+                _build_statement,
+                write_mappings,
+                shard_key='cik',
+                description="Company bulk upsert")
+        except DatabaseError:
+            # Some batches may have been written
+            self._invalidate_cached(valid_mappings)
+            raise
+        except Exception as e:
+            self._invalidate_cached(valid_mappings)
+            logger.error(f"Unexpected error during bulk upsert: {e}",
+                         exc_info=True)
+            raise DatabaseError(f"Unexpected error during bulk upsert: {e}")
+
+        self._invalidate_cached(valid_mappings)
+        self._remember_hashes(valid_mappings)
+        logger.info(
+            f"Bulk upsert finished. MySQL affected rows: {affected_rows}.")
+        return affected_rows
+
+    def _invalidate_cached(self, mappings: Sequence[Dict]) -> None:
+        """Drops the written CIKs from the lookup cache."""
+        if self._cache is not None:
+            self._cache.invalidate(m['cik'] for m in mappings)
+
+    # --- Change detection ---
+    def _load_hashes(self, mappings: List[Dict]) -> Dict[int, int]:
+        """
+        Returns the hash cache, covering at least the CIKs of these mappings.
+        Large upserts (a write batch or more, or a staged write) load every
+        hash once per repository; smaller ones only look up their own CIKs,
+        so a run touching a few companies doesn't read the whole table.
+        """
+        if not self._hash_cache_complete and (
+                len(mappings) >= get_settings().database.write_batch_size
+                or self._should_use_staged_write(len(mappings))):
+            self._load_hash_cache()
+        with self._hash_cache_lock:
+            if self._hash_cache_complete:
+                return self._hash_cache
+            missing = [m['cik'] for m in mappings
+                       if m['cik'].isdigit() and int(m['cik']) not in self._hash_cache]
+        if missing:
+            self._load_hash_cache(missing)
+        return self._hash_cache
 
+    def _load_hash_cache(self, ciks: Optional[List[str]] = None) -> None:
+        """Loads CIK -> content_hash for these CIKs, or for all hashed companies (None)."""
+        loaded: Dict[int, int] = {}
+        batch_size = 10000
+        with get_session(self.session_factory) as session:
+            try:
+                stmt = select(self._model.cik, self._model.content_hash).where(
+                    self._model.content_hash.isnot(None))
+                if ciks is None:
+                    batches = [stmt.execution_options(yield_per=50000)]
+                else:
+                    batches = [
+                        stmt.where(self._model.cik.in_([
+                            k for k in map(self._schema.encode_cik, ciks[i:i + batch_size])
+                            if k is not None
+                        ])) for i in range(0, len(ciks), batch_size)
+                    ]
+                for batch_stmt in batches:
+                    for cik, content_hash in session.execute(batch_stmt):
+                        cik_int = cik if isinstance(cik, int) else cik_to_int(cik)
+                        if cik_int is not None:
+                            loaded[cik_int] = content_hash
             except SQLAlchemyError as e:
-                logger.error(
-                    f"Database error during bulk upsert operation: {e}",
-                    exc_info=True)
-                # Rollback is handled by get_session
-                raise DatabaseError(f"Bulk upsert failed: {e}")
-            except Exception as e:
-                logger.error(f"Unexpected error during bulk upsert: {e}",
+                logger.error(f"Database error loading company hashes: {e}",
                              exc_info=True)
-                # Rollback is handled by get_session
-                raise DatabaseError(
-                    f"Unexpected error during bulk upsert: {e}")
+                raise DatabaseQueryError("Failed to load company content hashes")
+        with self._hash_cache_lock:
+            if ciks is None:
+                logger.info(f"Loaded content hashes for {len(loaded)} companies.")
+                self._hash_cache = loaded
+                self._hash_cache_complete = True
+            else:
+                self._hash_cache.update(loaded)
 
+    def _filter_unchanged(self, mappings: List[Dict]) -> List[Dict]:
+        """
+        Adds 'content_hash' to each mapping (copies; inputs aren't mutated) and
+        returns only those that are new or whose hash differs from the cache.
+        """
+        cache = self._load_hashes(mappings)
+        changed = []
+        for mapping in mappings:
+            content_hash = compute_company_hash(mapping)
+            cik = mapping['cik']
+            if cik.isdigit() and cache.get(int(cik)) == content_hash:
+                continue
+            changed.append({**mapping, 'content_hash': content_hash})
+        skipped = len(mappings) - len(changed)
+        if skipped:
+            logger.info(
+                f"Skipping {skipped} unchanged companies; {len(changed)} new or changed."
+            )
+        return changed
+
+    def _remember_hashes(self, written_mappings: List[Dict]) -> None:
+        """Records hashes of successfully written rows in the cache."""
+        with self._hash_cache_lock:
+            for mapping in written_mappings:
+                content_hash = mapping.get('content_hash')
+                cik = mapping['cik']
+                if content_hash is not None and cik.isdigit():
+                    self._hash_cache[int(cik)] = content_hash
+
+    def invalidate_hash_cache(self) -> None:
+        """Forgets cached hashes and lookups (e.g., after companies were modified outside this repository)."""
+        with self._hash_cache_lock:
+            self._hash_cache = {}
+            self._hash_cache_complete = False
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _staged_upsert(self, company_table, valid_mappings: List[Dict]) -> int:
+        """Upserts through the staging-table path, one staged merge per key set."""
+        groups: Dict[tuple, List[Dict]] = {}
+        for mapping in valid_mappings:
+            groups.setdefault(tuple(sorted(mapping)), []).append(mapping)
+        affected_rows = 0
+        for columns, rows in groups.items():
+            affected_rows += self._execute_staged_write(
+                company_table,
+                columns, (tuple(m[c] for c in columns) for m in rows),
+                MERGE_UPSERT,
+                key_columns=('cik', ),
+                description="Company bulk upsert")
         logger.info(
             f"Bulk upsert finished. MySQL affected rows: {affected_rows}.")
         return affected_rows
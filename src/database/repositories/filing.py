@@ -1,26 +1,64 @@
 # src/database/repositories/filing.py
 
 import logging
-from typing import List, Dict, Optional, Sequence, Set
-from sqlalchemy import select, join, or_
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import bindparam, column, func, select, join, table, and_, or_
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.dialects.mysql import insert as mysql_insert  # Import MySQL insert
 
 from .base import AbstractRepository, SessionFactory
-from src.database.models import Filing, Company
+from .schemas import filing_schema
+from src.database.models import Filing, DOWNLOAD_TODO_STATUSES
 from src.database.session import get_session
-from src.core.exceptions import DatabaseError, DatabaseQueryError
+from src.core.batches import FilingBatch
+from src.core.exceptions import BulkLoadUnavailableError, DatabaseError, DatabaseQueryError
+from src.database.staging import MERGE_IGNORE
+from src.database.accession_index import AccessionIndex
+from src.database.partitioning import archive_table_name, archived_years
+from src.database.cache import MISSING
+from src.core.identifiers import accession_to_int
 from src.config.settings import get_settings
 
 from datetime import date
 
 logger = logging.getLogger(__name__)
 
+# Columns available to the bulk read APIs (get_filings_by_accessions, iter_filings, ...)
+FILING_READ_COLUMNS = tuple(col.name for col in Filing.__table__.columns)
+
+# Keys per IN list in chunked reads
+_READ_IN_CHUNK = 5000
+
+
+@lru_cache(maxsize=64)
+def _filing_row_type(names: Tuple[str, ...]):
+    """Named tuple type returned by the bulk read APIs for a column selection."""
+    return namedtuple('FilingRow', names)
+
+
+def _convert_row(row_type, converters, row):
+    """Builds a row_type tuple from a result row, applying converters if given."""
+    if converters is None:
+        return row_type._make(row)
+    return row_type._make([
+        value if convert is None or value is None else convert(value)
+        for convert, value in zip(converters, row)
+    ])
+
 
 class FilingRepository(AbstractRepository):
     """
     Provides data access methods for Filing entities.
-    Uses MySQL INSERT IGNORE for efficient bulk insertion, skipping duplicates.
+    Uses INSERT IGNORE (or the backend's equivalent, see dialects.py) for
+    efficient bulk insertion, skipping duplicates.
+
+    With DB_COMPACT_SCHEMA the data lives in compact_filings (integer CIK,
+    form type id and accession); rows are translated at the edges by the
+    schema adapter (see schemas.py), so callers keep using the string-keyed
+    filing mappings and Filing objects.
     """
 
     def __init__(self, session_factory: SessionFactory):
@@ -32,6 +70,13 @@ class FilingRepository(AbstractRepository):
                              that returns a new Session object when called.
         """
         super().__init__(session_factory)  # Initialize the base class
+        # Known accession numbers, loaded lazily on the first insert
+        self._accession_index: Optional[AccessionIndex] = None
+        self._accession_index_lock = threading.Lock()
+        self.compact = get_settings().database.compact_schema
+        self._schema = filing_schema(self.compact)
+        # Accession number -> detached Filing (or None); see DB_CACHE_* settings
+        self._cache = self._new_cache()
 
     def get_by_accession_number(self,
                                 accession_number: str) -> Optional[Filing]:
@@ -42,22 +87,32 @@ class FilingRepository(AbstractRepository):
             accession_number: The accession number of the filing.
 
         Returns:
-            The Filing object if found, otherwise None.
+            The Filing object if found, otherwise None. It is detached from its
+            session (shared via the lookup cache when enabled); treat it as read-only.
 
         Raises:
             DatabaseQueryError: If the database query fails.
         """
+        if self._cache is not None:
+            cached = self._cache.get(accession_number)
+            if cached is not MISSING:
+                return cached
         logger.debug(
             f"Querying Filing by accession number: {accession_number}")
         with get_session(self.session_factory) as session:
             try:
-                stmt = select(Filing).where(
-                    Filing.accession_number == accession_number)
-                result = session.execute(stmt)
-                filing = result.scalar_one_or_none()
+                schema = self._schema
+                key = schema.encode_accession(accession_number)
+                row = None if key is None else session.execute(
+                    select(schema.model).where(
+                        schema.accession_column == key)).scalar_one_or_none()
+                # Detached Filing with string keys
+                filing = schema.to_filing(session, row) if row else None
                 logger.debug(
                     f"Filing query result for {accession_number}: {'Found' if filing else 'Not Found'}"
                 )
+                if self._cache is not None:
+                    self._cache.put(accession_number, filing)
                 return filing
             except SQLAlchemyError as e:
                 logger.error(
@@ -66,16 +121,64 @@ class FilingRepository(AbstractRepository):
                 raise DatabaseQueryError(
                     f"Failed to query filing {accession_number}")
 
-    def bulk_insert_ignore(self, filing_mappings: List[Dict]) -> int:
+    def get_many_by_accession_numbers(
+            self, accession_numbers: Sequence[str]) -> Dict[str, Filing]:
+        """
+        Retrieves several filings at once (cache first, then chunked IN queries).
+
+        Returns:
+            {accession_number: Filing} for those that exist; objects are detached (read-only).
+
+        Raises:
+            DatabaseQueryError: If the database query fails.
+        """
+        wanted = list(dict.fromkeys(accession_numbers))
+        if self._cache is not None:
+            cached, missing = self._cache.get_many(wanted)
+            filings = {a: filing for a, filing in cached.items() if filing}
+        else:
+            filings, missing = {}, wanted
+        if not missing:
+            return filings
+
+        loaded: Dict[str, Optional[Filing]] = dict.fromkeys(missing)
+        batch_size = 10000
+        with get_session(self.session_factory) as session:
+            try:
+                schema = self._schema
+                for i in range(0, len(missing), batch_size):
+                    by_key = {schema.encode_accession(a): a
+                              for a in missing[i:i + batch_size]}
+                    stmt = select(schema.model).where(
+                        schema.accession_column.in_(
+                            [k for k in by_key if k is not None]))
+                    for row in session.execute(stmt).scalars():
+                        loaded[by_key[getattr(row, schema.accession_name)]] = \
+                            schema.to_filing(session, row)
+            except SQLAlchemyError as e:
+                logger.error(
+                    f"Database error querying filings by accession number: {e}",
+                    exc_info=True)
+                raise DatabaseQueryError(
+                    "Failed to query filings by accession number")
+        if self._cache is not None:
+            self._cache.put_many(loaded)
+        filings.update((a, filing) for a, filing in loaded.items() if filing)
+        return filings
+
+    def bulk_insert_ignore(
+            self, filing_mappings: Union[FilingBatch, List[Dict]]) -> int:
         """
         Efficiently inserts multiple new filings, ignoring any rows that would
         violate unique constraints (like on accession_number) using MySQL's
-        INSERT IGNORE statement.
+        INSERT IGNORE statement. Rows are written in executemany batches of
+        DB_WRITE_BATCH_SIZE over up to DB_WRITE_WORKERS connections.
 
         Args:
-            filing_mappings: A list of dictionaries, where each dictionary
-                             represents a filing's data (must include keys matching
-                             Filing model columns, especially 'accession_number', 'cik').
+            filing_mappings: A FilingBatch (as produced by the parsers) or a list of
+                             dictionaries, where each dictionary represents a filing's
+                             data (must include keys matching Filing model columns,
+                             especially 'accession_number', 'cik').
 
         Returns:
             The number of rows actually inserted (as reported by MySQL).
@@ -93,6 +196,17 @@ class FilingRepository(AbstractRepository):
             f"Starting bulk insert ignore for {len(filing_mappings)} filing mappings."
         )
 
+        # Drop rows whose accession number is already known to be in the DB
+        accession_index = self._get_accession_index()
+        if accession_index is not None:
+            filing_mappings = self._filter_known_accessions(
+                filing_mappings, accession_index)
+            if not filing_mappings:
+                logger.info(
+                    "Bulk insert ignore finished. All filings already present, nothing written."
+                )
+                return 0
+
         # Optional: Add validation to ensure required keys (like accession_number, cik) exist?
         # For now, assume mappings are valid as generated by the parser/pipeline.
         # valid_mappings = [m for m in filing_mappings if 'accession_number' in m and 'cik' in m]
@@ -101,126 +215,657 @@ class FilingRepository(AbstractRepository):
         # if not valid_mappings: return 0
         # Use valid_mappings below if implementing validation.
 
-        filing_table = Filing.__table__
+        try:
+            affected_rows = self._insert_ignore_rows(filing_mappings)
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during bulk insert ignore: {e}",
+                         exc_info=True)
+            raise DatabaseError(
+                f"Unexpected error during bulk insert ignore: {e}")
+        finally:
+            # Also on failure: some batches may have been written
+            self._invalidate_cached(filing_mappings)
+
+        self._refresh_accession_index()
+        logger.info(
+            f"Bulk insert ignore finished. Actual rows inserted: {affected_rows}."
+        )
+        return affected_rows
 
-        # Construct the INSERT IGNORE statement
-        stmt = mysql_insert(filing_table).values(
-            filing_mappings)  # Use original list for now
-        stmt = stmt.prefix_with("IGNORE", dialect="mysql")
+    def _insert_ignore_rows(
+            self, filing_mappings: Union[FilingBatch, List[Dict]]) -> int:
+        """INSERT IGNORE of the filings, as rows of the configured schema."""
+        schema = self._schema
+        rows, row_count = schema.encode_rows(self.session_factory, filing_mappings)
+        if not row_count:
+            return 0
 
-        affected_rows = 0
+        # Very large inputs: staging table + one INSERT IGNORE ... SELECT
+        if self._should_use_staged_write(row_count):
+            try:
+                return self._execute_staged_write(
+                    schema.table,
+                    schema.write_columns,
+                    rows,
+                    MERGE_IGNORE,
+                    key_columns=(schema.accession_name, ),
+                    description="Filing bulk insert ignore")
+            except BulkLoadUnavailableError as e:
+                logger.warning(
+                    f"Staged bulk load unavailable ({e}); using batched inserts.")
+
+        backend = self.backend
+
+        def _build_statement(keys):
+            # No .values(): rows are bound as executemany parameters, so the
+            # driver sends batches of rows instead of one huge SQL string
+            return backend.insert_ignore(schema.table)
+
+        # Sharded by accession number; MySQL rowcount only counts actual
+        # inserts (skipped duplicates are 0), summed over all batches
+        return self._execute_batched_write(
+            _build_statement,
+            schema.encode_mappings(filing_mappings, rows),
+            shard_key=schema.accession_name,
+            description="Filing bulk insert ignore")
+
+    def _invalidate_cached(self, filing_mappings: Union[FilingBatch,
+                                                        List[Dict]]) -> None:
+        """Drops written accession numbers (cached as not found) from the lookup cache."""
+        if self._cache is None:
+            return
+        if isinstance(filing_mappings, FilingBatch):
+            self._cache.invalidate(filing_mappings.accession_numbers)
+        else:
+            self._cache.invalidate(
+                m.get('accession_number') for m in filing_mappings)
+
+    # --- Accession index (pre-insert dedupe) ---
+    def _accession_index_path(self) -> Path:
+        settings = get_settings()
+        if settings.database.accession_index_path:
+            return settings.database.accession_index_path
+        return (settings.pipeline.data_path / "cache" /
+                f"accession_index_{settings.database.name}{self._schema.index_suffix}.bin")
+
+    def _get_accession_index(self) -> Optional[AccessionIndex]:
+        """
+        Returns the accession index, loading the saved snapshot (or starting
+        empty) and catching up from the filings table on first use. A
+        snapshot that doesn't match the table is discarded and rebuilt.
+        Returns None if disabled or if it couldn't be built.
+        """
+        if not get_settings().database.accession_index_enabled:
+            return None
+        with self._accession_index_lock:
+            if self._accession_index is None:
+                path = self._accession_index_path()
+                index = AccessionIndex.load(path)
+                try:
+                    if index is not None and not self._snapshot_matches_database(index):
+                        logger.warning(
+                            f"Accession index {path} doesn't match the filings table "
+                            f"(database recreated, restored or pruned?); rebuilding it.")
+                        index = None
+                    if index is None:
+                        index = AccessionIndex()
+                        self._add_archived_accessions(index)
+                    self._catch_up_accession_index(index)
+                except DatabaseQueryError:
+                    logger.warning(
+                        "Accession index unavailable; inserting without pre-filtering."
+                    )
+                    return None
+                self._accession_index = index
+            return self._accession_index
+
+    def _catch_up_accession_index(self, index: AccessionIndex) -> None:
+        """Adds filings with id above the index watermark (a full scan the first time)."""
+        added = 0
         with get_session(self.session_factory) as session:
             try:
-                logger.info(
-                    f"Executing bulk insert ignore statement for {len(filing_mappings)} potential filings..."
-                )
-                result = session.execute(stmt)
-                # MySQL reports rows affected (only counts actual inserts, ignores skipped rows)
-                affected_rows = result.rowcount
-                logger.info(
-                    f"Bulk insert ignore statement executed. Rows inserted: {affected_rows}"
-                )
-                # Commit happens automatically via get_session context manager
+                model, index_value = self._schema.model, self._schema.index_value
+                stmt = select(model.id, self._schema.accession_column) \
+                       .where(model.id > index.watermark) \
+                       .order_by(model.id) \
+                       .execution_options(yield_per=100000)
+                for partition in session.execute(stmt).partitions():
+                    values = [
+                        v for v in (index_value(row[1]) for row in partition)
+                        if v is not None
+                    ]
+                    index.add_many(values, watermark=partition[-1].id,
+                                   rows=len(partition))
+                    added += len(partition)
+            except SQLAlchemyError as e:
+                logger.error(f"Database error catching up accession index: {e}",
+                             exc_info=True)
+                raise DatabaseQueryError("Failed to load accession numbers")
+        if added:
+            logger.info(
+                f"Accession index caught up with {added} filings "
+                f"({len(index)} known, watermark id {index.watermark}).")
 
+    def _add_archived_accessions(self, index: AccessionIndex) -> None:
+        """
+        Adds the accession numbers of archived years (see
+        partitioning.archive_year), which the table's unique key no longer
+        covers. They don't count as table rows, so archiving or restoring a
+        year later invalidates a saved snapshot and it is rebuilt.
+        """
+        table_name = self._schema.table.name
+        index_value = self._schema.index_value
+        added = 0
+        with get_session(self.session_factory) as session:
+            try:
+                for year in archived_years(session.get_bind(), table_name):
+                    archive = table(archive_table_name(table_name, year),
+                                    column(self._schema.accession_name))
+                    stmt = select(archive.c[self._schema.accession_name]) \
+                           .execution_options(yield_per=100000)
+                    for partition in session.execute(stmt).partitions():
+                        index.add_many(v for v in (index_value(row[0])
+                                                   for row in partition)
+                                       if v is not None)
+                        added += len(partition)
             except SQLAlchemyError as e:
-                logger.error(
-                    f"Database error during bulk insert ignore operation: {e}",
-                    exc_info=True)
-                # Rollback is handled automatically by get_session
-                # This error would be something other than a duplicate key, e.g., connection issue, bad data type
-                raise DatabaseError(f"Bulk insert ignore failed: {e}")
-            except Exception as e:
-                logger.error(
-                    f"Unexpected error during bulk insert ignore: {e}",
-                    exc_info=True)
-                # Rollback handled automatically
-                raise DatabaseError(
-                    f"Unexpected error during bulk insert ignore: {e}")
+                logger.error(f"Database error loading archived accession numbers: {e}",
+                             exc_info=True)
+                raise DatabaseQueryError("Failed to load archived accession numbers")
+        if added:
+            logger.info(f"Accession index: added {added} archived filings.")
 
-        logger.info(
-            f"Bulk insert ignore finished. Actual rows inserted: {affected_rows}."
-        )
-        return affected_rows
+    def _snapshot_matches_database(self, index: AccessionIndex) -> bool:
+        """
+        A loaded snapshot is trusted only if the table still holds exactly
+        the rows it was built from (same count of ids up to the watermark)
+        and the row at the watermark has an accession number it knows.
+        """
+        model, key_column = self._schema.model, self._schema.accession_column
+        with get_session(self.session_factory) as session:
+            try:
+                rows = session.execute(
+                    select(func.count()).select_from(model)
+                    .where(model.id <= index.watermark)).scalar_one()
+                at_watermark = session.execute(
+                    select(key_column).where(model.id == index.watermark)
+                ).scalar_one_or_none() if index.watermark else None
+            except SQLAlchemyError as e:
+                logger.error(f"Database error validating accession index: {e}",
+                             exc_info=True)
+                raise DatabaseQueryError("Failed to validate accession index")
+        if rows != index.rows:
+            return False
+        if not index.watermark:
+            return True
+        if at_watermark is None:
+            return False
+        value = self._schema.index_value(at_watermark)
+        return value is None or value in index
+
+    def _refresh_accession_index(self) -> None:
+        """
+        After an insert, pulls the rows that actually landed (id > watermark).
+        Rows MySQL ignored for other reasons (e.g. a missing company) are
+        therefore never marked as known.
+        """
+        if self._accession_index is None:
+            return
+        try:
+            self._catch_up_accession_index(self._accession_index)
+        except DatabaseQueryError:
+            pass  # Index just stays behind; unknown rows still go to the DB
+
+    @staticmethod
+    def _filter_known_accessions(
+            filing_mappings: Union[FilingBatch, List[Dict]],
+            index: AccessionIndex) -> Union[FilingBatch, List[Dict]]:
+        """Returns only the rows whose accession number isn't in the index."""
+
+        def _is_known(accession_number: Optional[str]) -> bool:
+            value = accession_to_int(accession_number)
+            return value is not None and value in index
+
+        if isinstance(filing_mappings, FilingBatch):
+            keep = [
+                i for i, acc in enumerate(filing_mappings.accession_numbers)
+                if not _is_known(acc)
+            ]
+            filtered = (filing_mappings if len(keep) == len(filing_mappings)
+                        else filing_mappings.take(keep))
+        else:
+            filtered = [
+                m for m in filing_mappings
+                if not _is_known(m.get('accession_number'))
+            ]
+        skipped = len(filing_mappings) - len(filtered)
+        if skipped:
+            logger.info(
+                f"Accession index: skipping {skipped} known filings, "
+                f"{len(filtered)} left to insert.")
+        return filtered
+
+    def save_accession_index(self) -> None:
+        """Persists the accession index (if loaded) so the next run starts warm."""
+        if self._accession_index is None:
+            return
+        try:
+            self._accession_index.save(self._accession_index_path())
+        except OSError as e:
+            logger.warning(f"Could not save accession index: {e}")
 
     def find_filings_for_download(self,
                                   form_types: Sequence[str],
                                   start_date: Optional[date] = None,
                                   end_date: Optional[date] = None,
-                                  limit: Optional[int] = None) -> List[Dict]:
+                                  limit: Optional[int] = None,
+                                  pending_only: bool = False) -> List[Dict]:
         """
         Finds filings matching criteria, excluding those from non-operating companies
         based on SIC codes defined in settings. Returns basic info needed for download prep.
 
+        Materializes iter_filings_for_download(); prefer the iterator for
+        large result sets.
+
         Args:
             form_types: Sequence of upper-case form types to include (e.g., ['10-K', '10-K/A']).
             start_date: Optional start date (inclusive) for filtering by filing_date.
             end_date: Optional end date (inclusive) for filtering by filing_date.
             limit: Optional maximum number of filings to return.
+            pending_only: Only return filings whose document still needs
+                          downloading (download_status pending or failed).
 
         Returns:
-            A list of dictionaries, each containing 'cik' and 'accession_number'
-            for the matching filings.
+            A list of dictionaries, each containing 'cik', 'accession_number'
+            and 'filing_date' for the matching filings.
 
         Raises:
             DatabaseQueryError: If the database query fails.
         """
-        # Fetch excluded SIC codes from settings
-        settings = get_settings(
-        )  # Needs to be called within method scope potentially
+        results_list = list(
+            self.iter_filings_for_download(form_types,
+                                           start_date,
+                                           end_date,
+                                           limit,
+                                           pending_only=pending_only))
+        logger.info(
+            f"Found {len(results_list)} filings matching download criteria after filtering."
+        )
+        return results_list
+
+    def iter_filings_for_download(
+            self,
+            form_types: Sequence[str],
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            limit: Optional[int] = None,
+            page_size: Optional[int] = None,
+            pending_only: bool = False) -> Iterator[Dict]:
+        """
+        Streams the filings find_filings_for_download() would return.
+
+        Rows are read in keyset pages on (filing_date, id): each page is a
+        short query in its own session continuing after the last row seen, so
+        memory stays flat, no connection is held while the caller works, and
+        no OFFSET scan is needed. Ordered oldest first, or most recent first
+        when a limit is given (as find_filings_for_download). Because pages
+        continue from a key rather than an offset, rows whose download_status
+        changes mid-iteration don't shift later pages.
+
+        Args:
+            form_types: Sequence of upper-case form types to include.
+            start_date: Optional start date (inclusive) for filtering by filing_date.
+            end_date: Optional end date (inclusive) for filtering by filing_date.
+            limit: Optional maximum number of filings to yield.
+            page_size: Rows per page. Defaults to DB_READ_PAGE_SIZE.
+            pending_only: Only yield filings with download_status pending or
+                          failed (an idx_download_status range scan).
+
+        Yields:
+            Dictionaries with 'cik', 'accession_number' and 'filing_date'.
+
+        Raises:
+            DatabaseQueryError: If a page query fails.
+        """
+        settings = get_settings()
         excluded_sics = settings.filing_filter.excluded_sic_codes
+        page_size = page_size or settings.database.read_page_size
+        descending = bool(limit)
 
         logger.info(f"Querying filings for download. Types: {form_types}, "
                     f"Excluding SICs: {excluded_sics}, "
-                    f"Start: {start_date}, End: {end_date}, Limit: {limit}")
-
-        # Construct the base query with the JOIN and essential columns
-        stmt = select(
-                 Filing.cik,
-                 Filing.accession_number
-                 # Add Filing.filing_date if needed for ordering before limit
-                 # Filing.filing_date
-               )\
-               .select_from(join(Filing, Company, Filing.cik == Company.cik)) \
-               .where(Filing.form_type.in_(form_types)) \
-               .where(
-                   or_( # Include if SIC is NULL or NOT IN the excluded list
-                       Company.sic == None,
-                       Company.sic.notin_(excluded_sics)
-                   )
-               )
-
-        # Add optional date filters
-        if start_date:
-            stmt = stmt.where(Filing.filing_date >= start_date)
-        if end_date:
-            stmt = stmt.where(Filing.filing_date <= end_date)
-
-        # Add ordering - important if using limit to get specific subset (e.g., latest)
-        # Defaulting to most recent first if limit is applied
-        if limit:
-            stmt = stmt.order_by(Filing.filing_date.desc(), Filing.id.desc())
-            stmt = stmt.limit(limit)
-        else:
-            # Default ordering if no limit (can be adjusted)
-            stmt = stmt.order_by(Filing.filing_date.asc(), Filing.cik.asc(),
-                                 Filing.id.asc())
+                    f"Start: {start_date}, End: {end_date}, Limit: {limit}, "
+                    f"Pending only: {pending_only}")
 
-        results_list = []
+        schema = self._schema
         with get_session(self.session_factory) as session:
             try:
-                results = session.execute(stmt)
-                # Convert results to list of dictionaries using RowMapping._asdict()
-                results_list = [dict(row) for row in results.mappings()]
-                logger.info(
-                    f"Found {len(results_list)} filings matching download criteria after filtering."
-                )
+                form_filter = schema.form_type_filter(session, form_types)
             except SQLAlchemyError as e:
                 logger.error(
                     f"Database error finding filings for download: {e}",
                     exc_info=True)
                 raise DatabaseQueryError(
                     "Failed to query filings for download")
+        if form_filter is None:
+            logger.info("None of the requested form types are known.")
+            return
+        model, company_model = schema.model, schema.company_model
+        key_column = schema.accession_column
+
+        base_stmt = select(model.id, model.filing_date, model.cik, key_column) \
+            .select_from(join(model, company_model, model.cik == company_model.cik)) \
+            .where(form_filter) \
+            .where(
+                or_( # Include if SIC is NULL or NOT IN the excluded list
+                    company_model.sic == None,
+                    company_model.sic.notin_(excluded_sics)
+                )
+            )
+        if pending_only:
+            base_stmt = base_stmt.where(
+                model.download_status.in_(DOWNLOAD_TODO_STATUSES))
+        if start_date:
+            base_stmt = base_stmt.where(model.filing_date >= start_date)
+        if end_date:
+            base_stmt = base_stmt.where(model.filing_date <= end_date)
+        if descending:
+            base_stmt = base_stmt.order_by(model.filing_date.desc(),
+                                           model.id.desc())
+        else:
+            base_stmt = base_stmt.order_by(model.filing_date.asc(),
+                                           model.id.asc())
+
+        yielded = 0
+        last_key = None  # (filing_date, id) of the last row seen
+        while limit is None or yielded < limit:
+            fetch = page_size if limit is None else min(page_size,
+                                                        limit - yielded)
+            stmt = base_stmt
+            if last_key is not None:
+                last_date, last_id = last_key
+                # Expanded row-value comparison; works on every dialect. The
+                # redundant plain bound on filing_date keeps the predicate a
+                # simple range for the (form_type, filing_date) index and for
+                # partition pruning (see partitioning.py)
+                if descending:
+                    stmt = stmt.where(
+                        model.filing_date <= last_date,
+                        or_(model.filing_date < last_date,
+                            and_(model.filing_date == last_date,
+                                 model.id < last_id)))
+                else:
+                    stmt = stmt.where(
+                        model.filing_date >= last_date,
+                        or_(model.filing_date > last_date,
+                            and_(model.filing_date == last_date,
+                                 model.id > last_id)))
+            with get_session(self.session_factory) as session:
+                try:
+                    rows = session.execute(stmt.limit(fetch)).all()
+                except SQLAlchemyError as e:
+                    logger.error(
+                        f"Database error finding filings for download: {e}",
+                        exc_info=True)
+                    raise DatabaseQueryError(
+                        "Failed to query filings for download")
+            if not rows:
+                break
+            for row in rows:
+                # Translate back to the string keys callers expect
+                yield {
+                    'cik': schema.decode_cik(row[2]),
+                    'accession_number': schema.decode_accession(row[3]),
+                    'filing_date': row[1]
+                }
+            yielded += len(rows)
+            if len(rows) < fetch:
+                break
+            last_key = (rows[-1][1], rows[-1][0])
+
+    def mark_download_results(self, results: Sequence[Dict]) -> int:
+        """
+        Records document download outcomes on the filings rows.
 
-        return results_list
+        Args:
+            results: Dictionaries with 'accession_number' and 'download_status',
+                     plus optional 'local_path', 'downloaded_at' and 'byte_size'.
+                     An optional 'filing_date' narrows the UPDATE to one
+                     partition of a partitioned table (see partitioning.py).
+
+        Returns:
+            The number of rows updated.
+
+        Raises:
+            DatabaseError: If an update batch fails.
+        """
+        if not results:
+            return 0
+        table, key_column = self._schema.table, self._schema.accession_column
+        # Rows with a known filing date / without one (executemany needs one shape)
+        dated_params, undated_params = [], []
+        for result in results:
+            key = self._schema.encode_accession(result.get('accession_number'))
+            if key is None:
+                continue
+            param = {
+                'b_key': key,
+                'b_status': result['download_status'],
+                'b_local_path': result.get('local_path'),
+                'b_downloaded_at': result.get('downloaded_at'),
+                'b_byte_size': result.get('byte_size'),
+            }
+            if result.get('filing_date') is not None:
+                param['b_filing_date'] = result['filing_date']
+                dated_params.append(param)
+            else:
+                undated_params.append(param)
+        # Bind names must differ from column names in an executemany UPDATE
+        stmt = table.update().where(key_column == bindparam('b_key')).values(
+            download_status=bindparam('b_status'),
+            local_path=bindparam('b_local_path'),
+            downloaded_at=bindparam('b_downloaded_at'),
+            byte_size=bindparam('b_byte_size'))
+        dated_stmt = stmt.where(table.c.filing_date == bindparam('b_filing_date'))
+
+        db_settings = get_settings().database
+        batch_size = max(1, db_settings.write_batch_size)
+        updated = 0
+        try:
+            for batch_stmt, params in ((dated_stmt, dated_params),
+                                       (stmt, undated_params)):
+                for start in range(0, len(params), batch_size):
+                    updated += self._execute_batch_with_retry(
+                        batch_stmt, params[start:start + batch_size],
+                        "Filing download status update",
+                        db_settings.write_max_retries)
+        finally:
+            if self._cache is not None:
+                self._cache.invalidate(r.get('accession_number')
+                                       for r in results)
+        logger.debug(f"Updated download status of {updated} filings.")
+        return updated
+
+    # --- Bulk column reads (no ORM objects) ---
+    def _read_columns(self, columns: Optional[Sequence[str]]):
+        """
+        Resolves requested Filing column names to select expressions.
+
+        Returns:
+            (names, expressions, converters): converters is a per-column list of
+            callables (or None) translating compact values back to string keys,
+            or None when no column needs translating.
+
+        Raises:
+            ValueError: If a name isn't a Filing column.
+        """
+        names = tuple(columns) if columns else FILING_READ_COLUMNS
+        unknown = [c for c in names if c not in FILING_READ_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown filing columns: {unknown}")
+        expressions, converters = self._schema.read_columns(names)
+        return names, expressions, converters
+
+    def _select_filing_columns(self, expressions):
+        """SELECT of the given expressions from filings (compact: joined to form_types)."""
+        return select(*expressions).select_from(self._schema.select_from())
+
+    def _run_chunked(self, names, expressions, converters, key_column,
+                     keys: List, description: str, extra_filters=()) -> List:
+        """Runs the column select once per IN-list chunk of `keys` in one session."""
+        rows: List = []
+        row_type = _filing_row_type(names)
+        base_stmt = self._select_filing_columns(expressions)
+        for extra_filter in extra_filters:
+            base_stmt = base_stmt.where(extra_filter)
+        with get_session(self.session_factory) as session:
+            try:
+                for i in range(0, len(keys), _READ_IN_CHUNK):
+                    stmt = base_stmt.where(
+                        key_column.in_(keys[i:i + _READ_IN_CHUNK]))
+                    rows.extend(
+                        _convert_row(row_type, converters, row)
+                        for row in session.execute(stmt))
+            except SQLAlchemyError as e:
+                logger.error(f"Database error {description}: {e}", exc_info=True)
+                raise DatabaseQueryError(f"Failed {description}")
+        return rows
+
+    def get_filings_by_accessions(self,
+                                  accession_numbers: Sequence[str],
+                                  columns: Optional[Sequence[str]] = None) -> List:
+        """
+        Reads the given filings as lightweight rows (no ORM objects or identity map).
+
+        Args:
+            accession_numbers: Accession numbers to look up (IN lists are chunked).
+            columns: Filing column names to select (default: all of FILING_READ_COLUMNS).
+
+        Returns:
+            FilingRow named tuples for the filings that exist, in no particular order.
+
+        Raises:
+            ValueError: If an unknown column is requested.
+            DatabaseQueryError: If the database query fails.
+        """
+        names, expressions, converters = self._read_columns(columns)
+        wanted = [
+            k for k in map(self._schema.encode_accession,
+                           dict.fromkeys(accession_numbers)) if k is not None
+        ]
+        if not wanted:
+            return []
+        return self._run_chunked(names, expressions, converters,
+                                 self._schema.accession_column,
+                                 wanted, "querying filings by accession number")
+
+    def get_filings_for_ciks(self,
+                             ciks: Sequence[str],
+                             columns: Optional[Sequence[str]] = None,
+                             form_types: Optional[Sequence[str]] = None) -> List:
+        """
+        Reads all filings of the given companies as lightweight rows.
+
+        Args:
+            ciks: Company CIKs (IN lists are chunked).
+            columns: Filing column names to select (default: all of FILING_READ_COLUMNS).
+            form_types: Optional form types to restrict to.
+
+        Returns:
+            FilingRow named tuples, in no particular order.
+
+        Raises:
+            ValueError: If an unknown column is requested.
+            DatabaseQueryError: If the database query fails.
+        """
+        names, expressions, converters = self._read_columns(columns)
+        schema = self._schema
+        wanted = [
+            k for k in map(schema.encode_cik, dict.fromkeys(ciks)) if k is not None
+        ]
+        if not wanted:
+            return []
+        extra_filters = [schema.form_column.in_(list(form_types))] if form_types else []
+        return self._run_chunked(names, expressions, converters,
+                                 schema.model.cik,
+                                 wanted, "querying filings by CIK",
+                                 extra_filters)
+
+    def iter_filings(self,
+                     form_types: Optional[Sequence[str]] = None,
+                     date_range: Optional[Tuple[Optional[date],
+                                                Optional[date]]] = None,
+                     columns: Optional[Sequence[str]] = None,
+                     page_size: Optional[int] = None) -> Iterator:
+        """
+        Streams filings as lightweight rows, in id order.
+
+        Pages are read with keyset pagination on the primary key (one short
+        query and session per page), so no connection or cursor stays open
+        while the caller consumes rows.
+
+        Args:
+            form_types: Optional form types to include.
+            date_range: Optional (start, end) filing dates, inclusive; either may be None.
+            columns: Filing column names to select (default: all of FILING_READ_COLUMNS).
+            page_size: Rows per page. Defaults to DB_READ_PAGE_SIZE.
+
+        Yields:
+            FilingRow named tuples.
+
+        Raises:
+            ValueError: If an unknown column is requested.
+            DatabaseQueryError: If a page query fails.
+        """
+        names, expressions, converters = self._read_columns(columns)
+        page_size = page_size or get_settings().database.read_page_size
+        model = self._schema.model
+        # The id is selected last, as the keyset cursor, and not returned
+        base_stmt = self._select_filing_columns([*expressions, model.id])
+        if form_types:
+            base_stmt = base_stmt.where(
+                self._schema.form_column.in_(list(form_types)))
+        start_date, end_date = date_range or (None, None)
+        if start_date:
+            base_stmt = base_stmt.where(model.filing_date >= start_date)
+        if end_date:
+            base_stmt = base_stmt.where(model.filing_date <= end_date)
+        base_stmt = base_stmt.order_by(model.id).limit(page_size)
+        row_type = _filing_row_type(names)
+
+        last_id = None
+        while True:
+            stmt = base_stmt if last_id is None else base_stmt.where(
+                model.id > last_id)
+            with get_session(self.session_factory) as session:
+                try:
+                    rows = session.execute(stmt).all()
+                except SQLAlchemyError as e:
+                    logger.error(f"Database error streaming filings: {e}",
+                                 exc_info=True)
+                    raise DatabaseQueryError("Failed to stream filings")
+            for row in rows:
+                yield _convert_row(row_type, converters, row[:-1])
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1][-1]
+
+    def load_filing_columns(
+            self,
+            form_types: Optional[Sequence[str]] = None,
+            date_range: Optional[Tuple[Optional[date], Optional[date]]] = None,
+            columns: Optional[Sequence[str]] = None) -> Dict[str, List]:
+        """
+        Like iter_filings(), but returns column arrays: {column name: [values]}.
+        """
+        names = tuple(columns) if columns else FILING_READ_COLUMNS
+        arrays: Dict[str, List] = {name: [] for name in names}
+        appenders = [arrays[name].append for name in names]
+        for row in self.iter_filings(form_types, date_range, names):
+            for append, value in zip(appenders, row):
+                append(value)
+        return arrays
 
     # Add other methods as needed, e.g., find_filings_by_cik, find_filings_by_form_and_date etc.
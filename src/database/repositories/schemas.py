@@ -0,0 +1,228 @@
+# src/database/repositories/schemas.py
+"""
+Per-schema adapters for the repositories.
+
+The classic tables (companies, filings) store CIKs and accession numbers as
+strings; with DB_COMPACT_SCHEMA the data lives in compact_companies /
+compact_filings with integer keys and form type ids. Each repository picks
+one adapter in __init__ (company_schema() / filing_schema()) and writes its
+queries once against it: the adapter names the model and key columns,
+encodes the caller's string keys for queries and writes, and decodes rows
+back to the string-keyed Company / Filing objects callers expect.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import join
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.core.batches import FILING_COLUMNS, FilingBatch, as_mappings
+from src.core.exceptions import DatabaseError
+from src.core.identifiers import (accession_to_int, cik_to_int,
+                                  int_to_accession, int_to_cik)
+from src.database.compact import (CompactCompany, CompactFiling, FormType,
+                                  COMPACT_FILING_COLUMNS, company_mapping_to_compact,
+                                  compact_to_company, compact_to_filing,
+                                  filing_row_to_compact, form_type_registry)
+from src.database.models import Company, Filing
+from src.database.session import get_session
+
+logger = logging.getLogger(__name__)
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+# --- Companies ---
+class CompanySchema:
+    """companies: string CIK key, rows are Company objects already."""
+    model = Company
+    # String CIK -> stored key (None if it can't be encoded)
+    encode_cik: Callable[[Optional[str]], Any] = staticmethod(_same)
+
+    def to_company(self, session: Session, row: Any) -> Company:
+        """Loaded row -> detached Company with the string CIK."""
+        # Keep loaded attributes usable after the session commits
+        session.expunge(row)
+        return row
+
+    def encode_mappings(self, mappings: List[Dict]) -> List[Dict]:
+        """Company mappings (string CIK) -> rows as stored."""
+        return mappings
+
+
+class CompactCompanySchema(CompanySchema):
+    """compact_companies: INT CIK key."""
+    model = CompactCompany
+    encode_cik = staticmethod(cik_to_int)
+
+    def to_company(self, session: Session, row: Any) -> Company:
+        return compact_to_company(row)
+
+    def encode_mappings(self, mappings: List[Dict]) -> List[Dict]:
+        return [m for m in map(company_mapping_to_compact, mappings) if m]
+
+
+def company_schema(compact: bool) -> CompanySchema:
+    return CompactCompanySchema() if compact else CompanySchema()
+
+
+# --- Filings ---
+class FilingSchema:
+    """filings: string CIK, form type and accession number."""
+    model = Filing
+    company_model = Company
+    index_suffix = ""  # Accession index file (different tables, different ids)
+    accession_name = 'accession_number'
+    write_columns = FILING_COLUMNS
+    # String key -> stored key (None if it can't be encoded), and back
+    encode_accession: Callable[[Optional[str]], Any] = staticmethod(_same)
+    decode_accession: Callable[[Any], str] = staticmethod(_same)
+    encode_cik: Callable[[Optional[str]], Any] = staticmethod(_same)
+    decode_cik: Callable[[Any], str] = staticmethod(_same)
+    # Stored accession -> accession index value (None if it can't be encoded)
+    index_value: Callable[[Any], Optional[int]] = staticmethod(accession_to_int)
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+    @property
+    def accession_column(self):
+        return self.table.c[self.accession_name]
+
+    @property
+    def form_column(self):
+        """Form type code, in selects from select_from()."""
+        return Filing.form_type
+
+    def select_from(self):
+        """FROM clause for column reads (where form_column is available)."""
+        return Filing
+
+    def to_filing(self, session: Session, row: Any) -> Filing:
+        """Loaded row -> detached Filing with string keys."""
+        # Keep loaded attributes usable after the session commits
+        session.expunge(row)
+        return row
+
+    def form_type_filter(self, session: Session, form_types: Sequence[str]):
+        """WHERE clause on the model for these form types; None if none can match."""
+        return Filing.form_type.in_(form_types)
+
+    def read_columns(self, names: Sequence[str]) -> Tuple[List, Optional[List[Converter]]]:
+        """
+        Filing column names -> (select expressions, converters): converters
+        translate stored values back to string keys (None: nothing to translate).
+        """
+        return [Filing.__table__.c[name] for name in names], None
+
+    def encode_rows(self, session_factory,
+                    filing_mappings: Union[FilingBatch, List[Dict]]
+                    ) -> Tuple[Iterable[tuple], int]:
+        """
+        Filings to insert -> (write_columns tuples, row count). Rows may be
+        produced lazily; encode_mappings() gives them again as mappings.
+        """
+        if isinstance(filing_mappings, FilingBatch):
+            rows = filing_mappings.iter_rows()
+        else:
+            rows = (tuple(m.get(c) for c in FILING_COLUMNS)
+                    for m in filing_mappings)
+        return rows, len(filing_mappings)
+
+    def encode_mappings(self, filing_mappings: Union[FilingBatch, List[Dict]],
+                        rows: Iterable[tuple]) -> List[Dict]:
+        """Filings to insert as executemany mappings (rows: from encode_rows)."""
+        # Columnar batches are expanded to row mappings only here, at the DB boundary
+        return as_mappings(filing_mappings)
+
+
+class CompactFilingSchema(FilingSchema):
+    """compact_filings: INT CIK, SMALLINT form type id and BIGINT accession."""
+    model = CompactFiling
+    company_model = CompactCompany
+    index_suffix = "_compact"
+    accession_name = 'accession'
+    write_columns = COMPACT_FILING_COLUMNS
+    encode_accession = staticmethod(accession_to_int)
+    decode_accession = staticmethod(int_to_accession)
+    encode_cik = staticmethod(cik_to_int)
+    decode_cik = staticmethod(int_to_cik)
+    # Accessions are already stored as integers
+    index_value = staticmethod(_same)
+
+    @property
+    def form_column(self):
+        return FormType.code
+
+    def select_from(self):
+        return join(CompactFiling, FormType, CompactFiling.form_type_id == FormType.id)
+
+    def to_filing(self, session: Session, row: Any) -> Filing:
+        return compact_to_filing(
+            row, form_type_registry.code_for(session, row.form_type_id))
+
+    def form_type_filter(self, session: Session, form_types: Sequence[str]):
+        form_type_ids = form_type_registry.ids_for(session, form_types, create=False)
+        if not form_type_ids:
+            return None
+        return CompactFiling.form_type_id.in_(list(form_type_ids.values()))
+
+    def read_columns(self, names: Sequence[str]) -> Tuple[List, Optional[List[Converter]]]:
+        expressions, converters = [], []
+        for name in names:
+            if name == 'cik':
+                expressions.append(CompactFiling.cik)
+                converters.append(int_to_cik)
+            elif name == 'accession_number':
+                expressions.append(CompactFiling.accession)
+                converters.append(int_to_accession)
+            elif name == 'form_type':
+                expressions.append(FormType.code)
+                converters.append(None)
+            else:
+                expressions.append(CompactFiling.__table__.c[name])
+                converters.append(None)
+        return expressions, converters
+
+    def encode_rows(self, session_factory,
+                    filing_mappings: Union[FilingBatch, List[Dict]]
+                    ) -> Tuple[Iterable[tuple], int]:
+        """Translates keys (and form types, registering new ones) first."""
+        if isinstance(filing_mappings, FilingBatch):
+            form_codes = set(filing_mappings.form_types)
+        else:
+            form_codes = {m.get('form_type') for m in filing_mappings} - {None}
+        try:
+            # Own transaction, so new form_types ids are committed before use
+            with get_session(session_factory) as session:
+                form_type_ids = form_type_registry.ids_for(session, form_codes)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error resolving form types: {e}", exc_info=True)
+            raise DatabaseError(f"Failed to resolve form types: {e}")
+
+        rows, _ = super().encode_rows(session_factory, filing_mappings)
+        compact_rows = [
+            r for r in (filing_row_to_compact(row, form_type_ids) for row in rows)
+            if r is not None
+        ]
+        dropped = len(filing_mappings) - len(compact_rows)
+        if dropped:
+            logger.warning(
+                f"Skipped {dropped} filings whose CIK/accession number can't be integer-encoded."
+            )
+        return compact_rows, len(compact_rows)
+
+    def encode_mappings(self, filing_mappings: Union[FilingBatch, List[Dict]],
+                        rows: Iterable[tuple]) -> List[Dict]:
+        return [dict(zip(COMPACT_FILING_COLUMNS, r)) for r in rows]
+
+
+def filing_schema(compact: bool) -> FilingSchema:
+    return CompactFilingSchema() if compact else FilingSchema()
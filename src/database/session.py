@@ -5,17 +5,18 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
 
-from . import models
+from . import migrations
 from src.config.settings import DatabaseSettings  # Import specific settings class
 from src.core.exceptions import DatabaseConnectionError, DatabaseError  # Import custom exceptions
+from .dialects import get_backend
 
 logger = logging.getLogger(__name__)  # Use specific logger
 
 
 def create_database_if_not_exists(db_settings: DatabaseSettings):
-    """Creates the database specified in settings if it doesn't exist."""
+    """Creates the (MySQL) database specified in settings if it doesn't exist."""
     # Connect without specifying the database name first
-    server_url = f"mysql+mysqlconnector://{db_settings.user}:{db_settings.password}@{db_settings.host}:{db_settings.port}/?charset=utf8mb4"
+    server_url = get_backend("mysql").server_url(db_settings)
     temp_engine = None
     try:
         logger.info(
@@ -48,18 +49,22 @@ def create_database_if_not_exists(db_settings: DatabaseSettings):
             temp_engine.dispose()
 
 
-def create_database_tables(engine):
-    """Creates the database tables based on SQLAlchemy models."""
-    logger.info("Creating database tables if they don't exist...")
+def create_database_tables(engine, compact_schema: bool = False):
+    """
+    Brings the schema up to date: creates missing tables and applies pending
+    migrations (see migrations.py). Safe to call on any existing database.
+    """
+    logger.info("Creating/upgrading database tables...")
     try:
-        # Assumes Base is imported from models module
-        models.Base.metadata.create_all(bind=engine)
-        logger.info("Database tables checked/created successfully.")
+        versions = migrations.upgrade(engine, compact_schema=compact_schema)
+        logger.info(f"Database tables checked/created successfully (schema versions: {versions}).")
         return True
     except SQLAlchemyError as e:
         logger.error(f"Error creating database tables: {e}", exc_info=True)
         # Raise a general database error
         raise DatabaseError(f"Failed to create database tables: {e}")
+    except DatabaseError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error creating database tables: {e}",
                      exc_info=True)
@@ -68,7 +73,9 @@ def create_database_tables(engine):
 
 def initialize_database(db_settings: DatabaseSettings):
     """
-    Creates DB if needed, creates engine and session factory, creates tables.
+    Creates engine and session factory; if the schema isn't current (one
+    SELECT on schema_version), creates the DB if needed and runs migrations.
+    A database already at the latest schema version gets no DDL at all.
 
     Args:
         db_settings: An instance of DatabaseSettings containing connection details.
@@ -80,35 +87,35 @@ def initialize_database(db_settings: DatabaseSettings):
         DatabaseConnectionError: If connection or initial setup fails.
         DatabaseError: If table creation fails.
     """
-    # Ensure database exists first
-    create_database_if_not_exists(db_settings)
-
-    # Now connect to the specific database
-    DATABASE_URL = (
-        f"mysql+mysqlconnector://{db_settings.user}:{db_settings.password}@"
-        f"{db_settings.host}:{db_settings.port}/{db_settings.name}?charset=utf8mb4"
-    )
+    # Dialect-specific URL, engine options and setup (see dialects.py)
+    backend = get_backend(db_settings.backend)
+
+    DATABASE_URL = backend.url(db_settings)
     engine = None
     try:
         logger.info(
-            f"Connecting to database '{db_settings.name}' and creating engine..."
+            f"Connecting to {backend.name} database '{db_settings.name}' and creating engine..."
         )
-        engine = create_engine(
-            DATABASE_URL,
-            pool_recycle=3600,  # Recycle connections after 1 hour
-            pool_size=10,  # Default pool size
-            max_overflow=20,  # Allow 20 extra connections under load
-            pool_pre_ping=True,  # Check connection validity before use
-            echo=False)
+        engine = create_engine(DATABASE_URL,
+                               echo=False,
+                               **backend.engine_kwargs(db_settings))
+        backend.configure_engine(engine)
 
         # Create the session factory (scoped for thread safety)
         session_factory = scoped_session(
             sessionmaker(autocommit=False, autoflush=False, bind=engine))
         logger.info("Database engine and session factory created.")
 
-        # Create tables using the newly created engine
-        # This raises DatabaseError on failure
-        create_database_tables(engine)
+        # Fast path: skip CREATE DATABASE / create_all() / reflection entirely
+        # when schema_version says nothing is pending
+        if migrations.is_schema_current(engine, db_settings.compact_schema):
+            logger.info("Database schema is current; skipping DDL.")
+        else:
+            # Ensure database exists (connections are lazy, so the engine
+            # created above stays usable), then create tables / migrate.
+            # This raises DatabaseError on failure
+            backend.create_database(db_settings)
+            create_database_tables(engine, compact_schema=db_settings.compact_schema)
 
         # Return the engine and session factory on success
         logger.info("Database initialization successful.")
@@ -0,0 +1,299 @@
+# src/database/staging.py
+
+import logging
+import os
+import tempfile
+import time
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.core.exceptions import BulkLoadUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Merge modes for staged_merge()
+MERGE_IGNORE = "ignore"  # Keep existing rows (INSERT IGNORE semantics)
+MERGE_UPSERT = "upsert"  # Overwrite non-key columns of existing rows
+
+# When the MySQL server/driver refuses LOAD DATA LOCAL INFILE, later batches
+# go straight to the regular INSERT path for LOCAL_INFILE_RETRY_SECONDS
+# instead of failing again; then the loader is tried again (the server may
+# have been reconfigured while a long-running process kept going).
+LOCAL_INFILE_RETRY_SECONDS = 3600
+_local_infile_refused_at: Optional[float] = None
+
+# MySQL errors meaning "local infile is disabled" (server: 3948, client: 2068,
+# older servers: 1148); any other LOAD DATA error is a regular database error
+_LOCAL_INFILE_REFUSED_ERRNOS = frozenset({3948, 2068, 1148})
+
+# Rows per executemany() when filling a staging table without a file loader
+_STAGE_INSERT_CHUNK = 10000
+
+
+def is_available(dialect_name: str) -> bool:
+    """Whether the staged bulk load path can be attempted on this dialect."""
+    if dialect_name == "mysql":
+        return (_local_infile_refused_at is None
+                or time.monotonic() - _local_infile_refused_at >= LOCAL_INFILE_RETRY_SECONDS)
+    return dialect_name in ("sqlite", "postgresql")
+
+
+# --- Value encoding ---
+def _db_value(value: Any) -> Any:
+    """Normalizes a Python value for staging (dates as ISO strings, bools as 0/1)."""
+    if isinstance(value, bool):
+        return 1 if value else 0
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _tsv_field(value: Any) -> str:
+    """
+    Encodes one field in the text format shared by MySQL LOAD DATA and
+    PostgreSQL COPY: NULL is \\N and backslash, tab and newlines are escaped.
+    """
+    if value is None:
+        return "\\N"
+    value = str(_db_value(value))
+    if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+        value = (value.replace("\\", "\\\\").replace("\t", "\\t").replace(
+            "\n", "\\n").replace("\r", "\\r"))
+    return value
+
+
+def write_tsv(rows: Iterable[Sequence[Any]], file_obj) -> int:
+    """Writes rows as escaped TSV lines to an open text file. Returns the row count."""
+    count = 0
+    for row in rows:
+        file_obj.write("\t".join([_tsv_field(v) for v in row]))
+        file_obj.write("\n")
+        count += 1
+    return count
+
+
+# --- Merge ---
+def staged_merge(session: Session,
+                 table: Table,
+                 columns: Sequence[str],
+                 rows: Iterable[Sequence[Any]],
+                 mode: str,
+                 key_columns: Sequence[str] = ()) -> Tuple[int, int]:
+    """
+    Loads rows into an unindexed temporary staging table and merges them into
+    `table` with one set-based INSERT ... SELECT.
+
+    - MySQL: rows are written to a temporary TSV file and loaded with
+      LOAD DATA LOCAL INFILE (needs local_infile enabled on the server and the
+      allow_local_infile connect arg, set by initialize_database).
+    - PostgreSQL: rows are streamed with COPY ... FROM STDIN (psycopg2), else
+      inserted with executemany.
+    - SQLite: rows are inserted into a TEMP table with executemany.
+
+    Everything happens on the session's connection and inside its transaction;
+    the caller commits.
+
+    Args:
+        session: Active session (the staging table is connection-local).
+        table: Target table.
+        columns: Column names, in the order of the values in each row.
+        rows: Row tuples.
+        mode: MERGE_IGNORE or MERGE_UPSERT.
+        key_columns: Conflict key columns (used by MERGE_UPSERT).
+
+    Returns:
+        (rows_staged, rows_affected). rows_affected is the driver rowcount of
+        the merge (MySQL: 1 per insert, 2 per changed update; SQLite/PostgreSQL:
+        1 per row inserted or updated).
+
+    Raises:
+        BulkLoadUnavailableError: If the loader is refused (callers fall back).
+        SQLAlchemyError: On other database errors.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if not is_available(dialect_name):
+        raise BulkLoadUnavailableError(
+            f"Staged bulk load not available for dialect '{dialect_name}'")
+
+    staging_name = f"stg_{table.name}"
+    column_list = ", ".join(columns)
+    update_columns = [c for c in columns if c not in key_columns]
+    if mode == MERGE_UPSERT and not update_columns:
+        mode = MERGE_IGNORE  # Only key columns present: nothing to update
+
+    if dialect_name == "mysql":
+        session.execute(text(f"DROP TEMPORARY TABLE IF EXISTS {staging_name}"))
+        # CREATE ... AS SELECT copies column types but no indexes or keys
+        session.execute(
+            text(f"CREATE TEMPORARY TABLE {staging_name} AS "
+                 f"SELECT {column_list} FROM {table.name} WHERE 1=0"))
+        try:
+            rows_staged = _load_mysql(session, staging_name, column_list, rows)
+            if mode == MERGE_UPSERT:
+                updates = ", ".join(f"{c} = VALUES({c})" for c in update_columns)
+                merge_sql = (f"INSERT INTO {table.name} ({column_list}) "
+                             f"SELECT {column_list} FROM {staging_name} "
+                             f"ON DUPLICATE KEY UPDATE {updates}")
+            else:
+                merge_sql = (f"INSERT IGNORE INTO {table.name} ({column_list}) "
+                             f"SELECT {column_list} FROM {staging_name}")
+            rows_affected = session.execute(text(merge_sql)).rowcount
+        finally:
+            _drop_quietly(session, f"DROP TEMPORARY TABLE IF EXISTS {staging_name}")
+        return rows_staged, rows_affected
+
+    if dialect_name == "postgresql":
+        # pg_temp: never drop a permanent table of the same name
+        session.execute(text(f"DROP TABLE IF EXISTS pg_temp.{staging_name}"))
+        session.execute(
+            text(f"CREATE TEMPORARY TABLE {staging_name} AS "
+                 f"SELECT {column_list} FROM {table.name} WITH NO DATA"))
+        # Numbers rows in load order, so the last row of a repeated key wins
+        session.execute(
+            text(f"ALTER TABLE {staging_name} ADD COLUMN stg_seq BIGINT "
+                 f"GENERATED ALWAYS AS IDENTITY"))
+        try:
+            rows_staged = _load_postgresql(session, staging_name, columns,
+                                           column_list, rows)
+            if mode == MERGE_UPSERT:
+                keys = ", ".join(key_columns)
+                updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+                # ON CONFLICT DO UPDATE rejects the same key twice in one statement
+                merge_sql = (f"INSERT INTO {table.name} ({column_list}) "
+                             f"SELECT DISTINCT ON ({keys}) {column_list} FROM {staging_name} "
+                             f"ORDER BY {keys}, stg_seq DESC "
+                             f"ON CONFLICT ({keys}) DO UPDATE SET {updates}")
+            else:
+                merge_sql = (f"INSERT INTO {table.name} ({column_list}) "
+                             f"SELECT {column_list} FROM {staging_name} "
+                             f"ON CONFLICT DO NOTHING")
+            rows_affected = session.execute(text(merge_sql)).rowcount
+        finally:
+            _drop_quietly(session, f"DROP TABLE IF EXISTS pg_temp.{staging_name}")
+        return rows_staged, rows_affected
+
+    # SQLite
+    session.execute(text(f"DROP TABLE IF EXISTS temp.{staging_name}"))
+    session.execute(
+        text(f"CREATE TEMP TABLE {staging_name} AS "
+             f"SELECT {column_list} FROM {table.name} WHERE 0"))
+    try:
+        rows_staged = _executemany_into(session, staging_name, columns,
+                                        column_list, rows, placeholder="?")
+        if mode == MERGE_UPSERT:
+            keys = ", ".join(key_columns)
+            updates = ", ".join(f"{c} = excluded.{c}" for c in update_columns)
+            # 'WHERE true' avoids the SELECT/ON CONFLICT parsing ambiguity
+            merge_sql = (f"INSERT INTO {table.name} ({column_list}) "
+                         f"SELECT {column_list} FROM {staging_name} WHERE true "
+                         f"ON CONFLICT ({keys}) DO UPDATE SET {updates}")
+        else:
+            merge_sql = (f"INSERT OR IGNORE INTO {table.name} ({column_list}) "
+                         f"SELECT {column_list} FROM {staging_name}")
+        rows_affected = session.execute(text(merge_sql)).rowcount
+    finally:
+        _drop_quietly(session, f"DROP TABLE IF EXISTS temp.{staging_name}")
+    return rows_staged, rows_affected
+
+
+def _load_mysql(session: Session, staging_name: str, column_list: str,
+                rows: Iterable[Sequence[Any]]) -> int:
+    """Writes rows to a temporary TSV file and LOAD DATA LOCAL INFILEs it."""
+    global _local_infile_refused_at
+    fd, tsv_path = tempfile.mkstemp(prefix=f"{staging_name}_", suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as tsv_file:
+            rows_staged = write_tsv(rows, tsv_file)
+        # The file name must be a string literal in LOAD DATA
+        path_literal = tsv_path.replace("\\", "\\\\").replace("'", "\\'")
+        try:
+            session.execute(
+                text(f"LOAD DATA LOCAL INFILE '{path_literal}' "
+                     f"INTO TABLE {staging_name} CHARACTER SET utf8mb4 "
+                     f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                     f"({column_list})"))
+        except SQLAlchemyError as e:
+            if _mysql_errno(e) not in _LOCAL_INFILE_REFUSED_ERRNOS:
+                raise
+            _local_infile_refused_at = time.monotonic()
+            logger.warning(
+                f"LOAD DATA LOCAL INFILE refused ({e.__class__.__name__}: {e}). "
+                f"Disabling the staged bulk load path for "
+                f"{LOCAL_INFILE_RETRY_SECONDS}s.")
+            raise BulkLoadUnavailableError(f"LOAD DATA LOCAL INFILE failed: {e}")
+        _local_infile_refused_at = None
+        logger.debug(f"Loaded {rows_staged} rows into {staging_name} from {tsv_path}")
+        return rows_staged
+    finally:
+        try:
+            os.unlink(tsv_path)
+        except OSError:
+            pass
+
+
+def _mysql_errno(error: SQLAlchemyError) -> Optional[int]:
+    """MySQL error number of a wrapped DBAPI error (mysql-connector or PyMySQL)."""
+    orig = getattr(error, "orig", None)
+    errno = getattr(orig, "errno", None)
+    if errno is None and getattr(orig, "args", None):
+        errno = orig.args[0]
+    return errno if isinstance(errno, int) else None
+
+
+def _load_postgresql(session: Session, staging_name: str,
+                     columns: Sequence[str], column_list: str,
+                     rows: Iterable[Sequence[Any]]) -> int:
+    """COPYs rows into the staging table through a spooled TSV buffer."""
+    dbapi_cursor = session.connection().connection.cursor()
+    if not hasattr(dbapi_cursor, "copy_expert"):  # Not psycopg2
+        dbapi_cursor.close()
+        return _executemany_into(session, staging_name, columns, column_list,
+                                 rows, placeholder="%s")
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024,
+                                           mode="w+",
+                                           encoding="utf-8",
+                                           newline="") as buffer:
+            rows_staged = write_tsv(rows, buffer)
+            buffer.seek(0)
+            dbapi_cursor.copy_expert(
+                f"COPY {staging_name} ({column_list}) FROM STDIN", buffer)
+        return rows_staged
+    finally:
+        dbapi_cursor.close()
+
+
+def _executemany_into(session: Session, staging_name: str,
+                      columns: Sequence[str], column_list: str,
+                      rows: Iterable[Sequence[Any]], placeholder: str) -> int:
+    """Fills the staging table with raw DBAPI executemany() in chunks (no per-row dicts)."""
+    insert_sql = (f"INSERT INTO {staging_name} ({column_list}) VALUES "
+                  f"({', '.join([placeholder] * len(columns))})")
+    dbapi_cursor = session.connection().connection.cursor()
+    rows_staged = 0
+    try:
+        chunk = []
+        for row in rows:
+            chunk.append(tuple(_db_value(v) for v in row))
+            if len(chunk) >= _STAGE_INSERT_CHUNK:
+                dbapi_cursor.executemany(insert_sql, chunk)
+                rows_staged += len(chunk)
+                chunk = []
+        if chunk:
+            dbapi_cursor.executemany(insert_sql, chunk)
+            rows_staged += len(chunk)
+    finally:
+        dbapi_cursor.close()
+    return rows_staged
+
+
+def _drop_quietly(session: Session, drop_sql: str) -> None:
+    """Drops the staging table; failures are logged (the table is connection-local anyway)."""
+    try:
+        session.execute(text(drop_sql))
+    except SQLAlchemyError as e:
+        logger.debug(f"Could not drop staging table ({drop_sql}): {e}")
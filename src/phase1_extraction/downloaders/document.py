@@ -2,19 +2,24 @@
 
 import logging
 import shutil
+import zlib
 from pathlib import Path
+from typing import List, Optional, Set
 import requests
 import gzip
 import io
 
 # Assuming .base defines AbstractDownloader
 from .base import AbstractDownloader
-from src.core.exceptions import DownloadError, FileSystemError, NotFoundError, RequestTimeoutError  # Import exceptions
+from src.core.exceptions import DownloadError, FileSystemError, NotFoundError, RequestTimeoutError, SGMLParsingError  # Import exceptions
+from src.phase1_extraction.parsers.sgml import SGMLDocumentSplitter, SubmissionDocument
 
 logger = logging.getLogger(__name__)
 
 # Gzip magic number
 GZIP_MAGIC_NUMBER = b'\x1f\x8b'
+# Bytes read from the socket per step when streaming a full submission
+SUBMISSION_CHUNK_SIZE = 1 << 16
 
 
 class DocumentDownloader(AbstractDownloader):
@@ -159,3 +164,117 @@ class DocumentDownloader(AbstractDownloader):
                 f"Unexpected error during document download for {url}: {e}",
                 exc_info=True)
             return False
+
+    # --- Full submission (.txt bundle) ---
+    def _build_submission_url(self, cik: str,
+                              accession_number: str) -> str | None:
+        """Constructs the EDGAR URL of a filing's complete submission text file."""
+        return self._build_document_url(cik, accession_number,
+                                        f"{accession_number}.txt")
+
+    def download_submission(
+            self,
+            cik: str,
+            accession_number: str,
+            output_dir: Path,
+            document_types: Optional[Set[str]] = None
+    ) -> Optional[List[SubmissionDocument]]:
+        """
+        Downloads a filing's complete submission text file in one request and
+        streams it through SGMLDocumentSplitter, which writes each embedded
+        document (optionally only those in document_types) to output_dir as
+        <CIK>_<accession without dashes>_<FILENAME>, the same names as
+        single-document downloads (phase 2 identifies documents by name).
+        The bundle is never held in memory; a gzip-encoded body is
+        decompressed on the fly.
+
+        Returns:
+            The documents written, in submission order (the primary document
+            first when it is kept); an empty list if the submission was split
+            but no document matched document_types; None if the download or
+            the split failed.
+        """
+        url = self._build_submission_url(cik, accession_number)
+        if not url:
+            logger.error(
+                f"Could not build submission URL for {cik}/{accession_number}")
+            return None
+
+        try:
+            # output_dir itself is created by the splitter once a document is kept
+            output_dir.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise FileSystemError(
+                f"Failed to create directory {output_dir.parent}: {e}") from e
+
+        logger.info(f"Attempting to download full submission from {url}")
+        splitter = SGMLDocumentSplitter(
+            output_dir,
+            document_types,
+            filename_prefix=f"{cik}_{accession_number.replace('-', '')}_")
+        try:
+            response = self._make_request(url,
+                                          headers=self.headers,
+                                          stream=True,
+                                          timeout=120)
+            completed = False
+            try:
+                decompressor = None
+                for chunk in response.iter_content(
+                        chunk_size=SUBMISSION_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    if decompressor is None:
+                        # Same magic-number check as download(): some bodies
+                        # arrive gzipped without a Content-Encoding header
+                        decompressor = zlib.decompressobj(
+                            zlib.MAX_WBITS | 16) if chunk.startswith(
+                                GZIP_MAGIC_NUMBER) else False
+                    if decompressor:
+                        chunk = decompressor.decompress(chunk)
+                    splitter.feed(chunk)
+                if decompressor:
+                    splitter.feed(decompressor.flush())
+                documents = splitter.close()
+                completed = True
+            finally:
+                response.close()
+                if not completed:
+                    splitter.abort()
+
+            if not documents:
+                logger.warning(
+                    f"No matching documents in submission {accession_number} "
+                    f"(types: {sorted(document_types) if document_types else 'all'})")
+                return documents
+            logger.info(
+                f"Split submission {accession_number} into {len(documents)} documents "
+                f"({sum(d.size for d in documents)} bytes) in {output_dir.name}")
+            return documents
+
+        # --- Exception Handling ---
+        except NotFoundError:
+            logger.warning(f"Submission not found at {url} (404)")
+            return None
+        except RequestTimeoutError:
+            logger.error(f"Timeout downloading submission from {url}")
+            return None
+        except DownloadError as e:
+            logger.error(f"Download failed for submission {url}: {e}",
+                         exc_info=False)
+            return None
+        except (SGMLParsingError, zlib.error) as e:
+            logger.error(f"Could not split submission {url}: {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Connection lost while streaming {url}: {e}")
+            return None
+        except IOError as e:
+            logger.error(f"Failed to write documents to {output_dir}: {e}",
+                         exc_info=True)
+            return None
+        except Exception as e:
+            logger.error(
+                f"Unexpected error during submission download for {url}: {e}",
+                exc_info=True)
+            return None
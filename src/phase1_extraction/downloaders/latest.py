@@ -0,0 +1,76 @@
+# src/phase1_extraction/downloaders/latest.py
+
+import logging
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+from .base import AbstractDownloader
+from src.core.exceptions import DownloadError, NotFoundError, RequestTimeoutError  # Import custom exceptions
+
+logger = logging.getLogger(__name__)
+
+
+class LatestFilingsDownloader(AbstractDownloader):
+    """
+    Downloads the EDGAR "latest filings" Atom feed (newest filings first).
+
+    With DAEMON_FEED_URL set, that URL is fetched as-is instead (a single
+    page); file:// URLs are read from disk, so the daemon can run against a
+    local stub.
+    """
+
+    def build_feed_url(self, start: int = 0, count: int = 100) -> str:
+        """Constructs the URL of one page of the SEC feed (all form types)."""
+        return (f"{self.sec_api_settings.base_url}/cgi-bin/browse-edgar"
+                f"?action=getcurrent&type=&company=&dateb=&owner=include"
+                f"&start={start}&count={count}&output=atom")
+
+    def download(self, start: int = 0, count: int = 100) -> Optional[str]:
+        """
+        Downloads one page of the feed.
+
+        Args:
+            start: Offset of the first entry (0 = newest).
+            count: Entries per page (the SEC accepts up to 100).
+
+        Returns:
+            The Atom XML text, or None if the page doesn't exist (404, or a
+            page past the first of a DAEMON_FEED_URL feed).
+
+        Raises:
+            RequestTimeoutError: If the request times out.
+            DownloadError: For other HTTP errors, network or file read issues.
+        """
+        feed_url = self.settings.pipeline.daemon_feed_url
+        if feed_url:
+            if start > 0:
+                return None  # Custom feeds are a single page
+            url = feed_url
+        else:
+            url = self.build_feed_url(start, count)
+
+        if url.startswith("file://"):
+            path = Path(unquote(urlparse(url).path))
+            try:
+                return path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                logger.warning(f"Feed stub not found: {path}")
+                return None
+            except OSError as e:
+                raise DownloadError(f"Failed to read feed stub {path}: {e}",
+                                    url=url)
+
+        logger.debug(f"Downloading latest filings feed page from {url}")
+        try:
+            response = self._make_request(url,
+                                          headers=self.headers,
+                                          stream=False,
+                                          timeout=30)
+            return response.content.decode("utf-8", errors="replace")
+        except NotFoundError:
+            logger.warning(f"Latest filings feed not found at {url} (404).")
+            return None
+        except RequestTimeoutError:
+            logger.error(f"Timeout downloading latest filings feed from {url}")
+            raise
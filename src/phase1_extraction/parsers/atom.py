@@ -0,0 +1,112 @@
+# src/phase1_extraction/parsers/atom.py
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import date
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .base import AbstractParser
+from src.core.batches import FilingBatch
+from src.core.exceptions import AtomParsingError
+from src.config.settings import AppSettings
+
+logger = logging.getLogger(__name__)
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+
+# <title>10-K - APPLE INC (0000320193) (Filer)</title>
+_TITLE_RE = re.compile(r"\((\d{1,10})\)\s*\(([^)]+)\)\s*$")
+# <id>urn:tag:sec.gov,2008:accession-number=0000320193-24-000123</id>
+_ACCESSION_RE = re.compile(r"accession-number=(\d{10}-\d{2}-\d{6})")
+# <summary> ... <b>Filed:</b> 2024-11-01 <b>AccNo:</b> ...
+_FILED_RE = re.compile(r"Filed:\s*(?:</b>)?\s*(\d{4}-\d{2}-\d{2})")
+
+# One entry is listed per company involved in a filing; the filer's wins
+_ROLE_PRIORITY = {"Filer": 0, "Issuer": 1, "Subject": 2}
+
+
+class LatestFilingsParser(AbstractParser):
+    """
+    Parses the EDGAR latest-filings Atom feed into a FilingBatch (one row
+    per accession number, primary document unknown).
+    """
+
+    def __init__(self, settings: AppSettings):
+        """Initializes the parser with necessary configurations."""
+        super().__init__(settings)
+
+    def parse(self,
+              input_source: str,
+              target_forms: Optional[Set[str]] = None,
+              *args,
+              **kwargs) -> FilingBatch:
+        """
+        Parses one page of the feed.
+
+        Args:
+            input_source: The Atom XML text.
+            target_forms: Optional set of upper-case form types to keep.
+
+        Returns:
+            A FilingBatch in feed order (newest first). Entries missing an
+            accession number, CIK or date are skipped.
+
+        Raises:
+            AtomParsingError: If the XML can't be parsed.
+        """
+        try:
+            root = ET.fromstring(input_source)
+        except ET.ParseError as e:
+            raise AtomParsingError(f"Invalid Atom XML: {e}", source="latest filings feed")
+
+        # accession -> (role priority, row); dict order keeps first-seen order
+        best: Dict[str, Tuple[int, Tuple[Any, ...]]] = {}
+        skipped = 0
+        for entry in root.iter(f"{_ATOM}entry"):
+            parsed = self._parse_entry(entry)
+            if parsed is None:
+                skipped += 1
+                continue
+            priority, row = parsed
+            if target_forms and row[1] not in target_forms:
+                continue
+            accession_number = row[3]
+            if accession_number not in best or priority < best[accession_number][0]:
+                best[accession_number] = (priority, row)
+
+        batch = FilingBatch()
+        for _, (cik, form_type, filing_date, accession_number, primary_doc) in best.values():
+            batch.append(cik, form_type, filing_date, accession_number, primary_doc)
+        if skipped:
+            logger.debug(f"Skipped {skipped} incomplete feed entries.")
+        return batch
+
+    @staticmethod
+    def _parse_entry(entry: ET.Element) -> Optional[Tuple[int, Tuple[Any, ...]]]:
+        """(role priority, FILING_COLUMNS row) for one <entry>, or None if incomplete."""
+        title = (entry.findtext(f"{_ATOM}title") or "").strip()
+        entry_id = entry.findtext(f"{_ATOM}id") or ""
+        category = entry.find(f"{_ATOM}category")
+
+        accession_match = _ACCESSION_RE.search(entry_id)
+        title_match = _TITLE_RE.search(title)
+        if not accession_match or not title_match:
+            return None
+        form_type = category.get("term") if category is not None else None
+        if not form_type:
+            # Title starts with the form type: "10-K - APPLE INC (...)"
+            form_type = title.split(" - ", 1)[0]
+        form_type = form_type.strip().upper()
+
+        filed_match = _FILED_RE.search(entry.findtext(f"{_ATOM}summary") or "")
+        date_text = filed_match.group(1) if filed_match else (
+            entry.findtext(f"{_ATOM}updated") or "")[:10]
+        try:
+            filing_date = date.fromisoformat(date_text)
+        except ValueError:
+            return None
+
+        cik = title_match.group(1).zfill(10)
+        priority = _ROLE_PRIORITY.get(title_match.group(2).strip(), len(_ROLE_PRIORITY))
+        return priority, (cik, form_type, filing_date, accession_match.group(1), None)
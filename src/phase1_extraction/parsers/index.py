@@ -7,13 +7,14 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from .base import AbstractParser
+from src.core.batches import FilingBatch
 from src.core.exceptions import ParsingError, IndexParsingError
 from src.config.settings import AppSettings
 
 logger = logging.getLogger(__name__)
 
-# Define type alias for clarity, list of filing dictionaries
-ParseResult = List[Dict[str, Any]]
+# Define type alias for clarity: a columnar batch of filings
+ParseResult = FilingBatch
 
 
 class IndexParser(AbstractParser):
@@ -47,14 +48,14 @@ class IndexParser(AbstractParser):
                           all valid filing lines are returned. Example: {'10-K', '10-K/A'}.
 
         Returns:
-            A list of dictionaries, each representing a filing found that matches
-            the target_forms (if provided). Returns empty list if no relevant
+            A FilingBatch holding each filing found that matches the
+            target_forms (if provided). Returns an empty batch if no relevant
             filings are found or on parsing errors that prevent extraction.
 
         Raises:
             IndexParsingError: If fundamental parsing fails (e.g., cannot find header separator).
         """
-        filings_found: ParseResult = []
+        filings_found: ParseResult = FilingBatch()
         # Use StringIO to easily iterate lines from the input string
         # Handle potential different line endings robustly
         content_io = StringIO(
@@ -160,18 +161,8 @@ class IndexParser(AbstractParser):
                 # Store what the index *says*, finding the *real* HTM is later
                 primary_doc_name = filename_path.split('/')[-1]
 
-                filings_found.append({
-                    "cik":
-                    cik,
-                    "form_type":
-                    form_type,
-                    "filing_date":
-                    filing_date,
-                    "accession_number":
-                    accession_number,
-                    "primary_document_filename":
-                    primary_doc_name
-                })
+                filings_found.append(cik, form_type, filing_date,
+                                     accession_number, primary_doc_name)
 
             except Exception as e:
                 # Catch unexpected errors processing a single line
@@ -3,27 +3,161 @@
 import logging
 import json
 import re
+import functools
 from pathlib import Path
-from datetime import datetime
+from datetime import date
 from typing import Any, Dict, List, Optional, Tuple
 
+# --- Optional fast JSON backends ---
+# msgspec decodes straight into a typed schema and skips every key we don't map.
+# orjson still builds the full document but is considerably faster than stdlib json.
+MSGSPEC_AVAILABLE = False
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    pass  # msgspec is optional
+
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass  # orjson is optional
+
 # Assuming .base defines AbstractParser
 from .base import AbstractParser
+from src.core.batches import FilingBatch
 from src.core.exceptions import ParsingError, JSONParsingError  # Import custom exceptions
+from src.config.settings import AppSettings
 
 logger = logging.getLogger(__name__)
 
 # Define a type alias for the return structure for clarity
-# Tuple[Optional[CompanyDict], List[FilingDict], ErrorCount]
-ParseResult = Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]
+# Tuple[Optional[CompanyDict], FilingBatch, ErrorCount]
+ParseResult = Tuple[Optional[Dict[str, Any]], FilingBatch, int]
+
+# Backends in order of preference when 'auto' is configured
+JSON_BACKENDS = ('msgspec', 'orjson', 'json')
+
+# Errors raised by any of the backends for malformed input
+_DECODE_ERRORS: Tuple[type, ...] = (json.JSONDecodeError, )
+if MSGSPEC_AVAILABLE:
+    _DECODE_ERRORS += (msgspec.DecodeError, )
+
+# --- msgspec schema (only the fields mapped below are decoded) ---
+# omit_defaults: absent keys stay absent in to_builtins() (not None), as with
+# the other backends
+if MSGSPEC_AVAILABLE:
+
+    class _BusinessAddress(msgspec.Struct, omit_defaults=True):
+        street1: Optional[str] = None
+        street2: Optional[str] = None
+        city: Optional[str] = None
+        stateOrCountry: Optional[str] = None
+        stateOrCountryDescription: Optional[str] = None
+        zipCode: Optional[str] = None
+
+    class _Addresses(msgspec.Struct, omit_defaults=True):
+        business: Optional[_BusinessAddress] = None
+
+    class _RecentFilings(msgspec.Struct, omit_defaults=True):
+        # Only the four columns we store; the other ~10 columns are skipped
+        form: Optional[List[Optional[str]]] = None
+        filingDate: Optional[List[Optional[str]]] = None
+        accessionNumber: Optional[List[Optional[str]]] = None
+        primaryDocument: Optional[List[Optional[str]]] = None
+
+    class _Filings(msgspec.Struct, omit_defaults=True):
+        recent: Optional[_RecentFilings] = None
+
+    class _Submission(msgspec.Struct, omit_defaults=True):
+        entityName: Optional[str] = None
+        name: Optional[str] = None
+        sic: Optional[str] = None
+        entityType: Optional[str] = None
+        sicDescription: Optional[str] = None
+        insiderTransactionForOwnerExists: Any = None
+        insiderTransactionForIssuerExists: Any = None
+        phone: Optional[str] = None
+        addresses: Optional[_Addresses] = None
+        filings: Optional[_Filings] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_msgspec_decoder():
+    """Builds the schema-driven decoder once per process (lazily, so it never needs pickling)."""
+    return msgspec.json.Decoder(_Submission)
+
+
+@functools.lru_cache(maxsize=16384)
+def parse_iso_date(date_str: str) -> date:
+    """
+    Parses a strict 'YYYY-MM-DD' string into a date.
+
+    Cached because submission files repeat the same few thousand dates millions
+    of times. Raises ValueError for anything that is not exactly YYYY-MM-DD,
+    matching the previous strptime('%Y-%m-%d') behaviour.
+    """
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        raise ValueError(f"Not an ISO date: '{date_str}'")
+    return date.fromisoformat(date_str)
 
 
 class JSONParser(AbstractParser):
     """
     Parses CIK JSON submission files obtained from the SEC bulk submissions.zip.
     Extracts company metadata and recent filing information.
+
+    Decoding uses the fastest available backend (msgspec > orjson > stdlib json),
+    selectable via the JSON_DECODER_BACKEND setting.
     """
 
+    def __init__(self, settings: AppSettings):
+        """Initializes the parser and resolves the JSON decoder backend."""
+        super().__init__(settings)
+        self.backend = self._resolve_backend(
+            self.pipeline_settings.json_decoder_backend)
+        logger.info(f"JSONParser using '{self.backend}' decoder backend.")
+
+    @staticmethod
+    def _resolve_backend(requested: str) -> str:
+        """Maps the configured backend name to one that is actually importable."""
+        available = {
+            'msgspec': MSGSPEC_AVAILABLE,
+            'orjson': ORJSON_AVAILABLE,
+            'json': True
+        }
+        requested = (requested or 'auto').strip().lower()
+        if requested != 'auto':
+            if available.get(requested):
+                return requested
+            logger.warning(
+                f"JSON decoder backend '{requested}' is not available. Falling back to 'auto'."
+            )
+        return next(name for name in JSON_BACKENDS if available[name])
+
+    def decode(self, raw_bytes: bytes) -> Dict[str, Any]:
+        """
+        Decodes a submission document into a plain dict holding only the keys
+        this parser maps (for msgspec) or the full document (orjson/json).
+
+        Raises:
+            json.JSONDecodeError / msgspec.DecodeError: On malformed input.
+        """
+        if self.backend == 'msgspec':
+            try:
+                return msgspec.to_builtins(_get_msgspec_decoder().decode(raw_bytes))
+            except msgspec.ValidationError as e:
+                # Valid JSON that doesn't fit the schema (unexpected types);
+                # fall back to a generic decode and let the mapping below cope.
+                logger.debug(
+                    f"Schema decode failed ({e}); using generic decode.")
+                return msgspec.json.decode(raw_bytes)
+        if self.backend == 'orjson':
+            return orjson.loads(raw_bytes)
+        return json.loads(raw_bytes)
+
     # Overriding the parse method from the base class
     def parse(self, input_source: Path, *args, **kwargs) -> ParseResult:
         """
@@ -35,12 +169,12 @@ class JSONParser(AbstractParser):
         Returns:
             A tuple containing:
             - A dictionary with extracted company data (or None if parsing fails).
-            - A list of dictionaries, each representing a recent filing.
+            - A FilingBatch with the recent filings (columnar, see src.core.batches).
             - An integer count of parsing errors encountered within the file.
         """
         file_path = input_source  # Rename for clarity within the method
         company_data: Optional[Dict[str, Any]] = None
-        filings_data: List[Dict[str, Any]] = []
+        filings_data = FilingBatch()
         parse_errors: int = 0
 
         # Extract CIK from filename
@@ -56,17 +190,22 @@ class JSONParser(AbstractParser):
         cik = cik_match.group(1)  # cik identifierelse if(){}
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                raw_data = self.decode(f.read())
+            if not isinstance(raw_data, dict):
+                raise JSONParsingError("Top-level JSON value is not an object",
+                                       source=str(file_path))
 
             # --- Extract Company Info ---
             # Use .get() with defaults to handle potentially missing keys gracefully
             company_name = raw_data.get('entityName', '') or raw_data.get(
                 'name', '') or f"Company CIK {cik}"
-            addresses = raw_data.get('addresses', {})
-            # Ensure addresses is dict before accessing business key
-            business_address = addresses.get('business', {}) if isinstance(
-                addresses, dict) else {}
+            addresses = raw_data.get('addresses')
+            # Either level may be missing or null
+            business_address = addresses.get('business') if isinstance(
+                addresses, dict) else None
+            if not isinstance(business_address, dict):
+                business_address = {}
 
             # Convert 0/1 insider flags to Boolean or None
             owner_exists_raw = raw_data.get('insiderTransactionForOwnerExists')
@@ -161,29 +300,20 @@ class JSONParser(AbstractParser):
                                     parse_errors += 1
                                     continue  # Skip this filing record
 
-                                # Parse date string
+                                # Parse date string (cached fast ISO path)
                                 try:
-                                    filing_date_obj = datetime.strptime(
-                                        date_str, '%Y-%m-%d').date()
-                                except ValueError:
+                                    filing_date_obj = parse_iso_date(date_str)
+                                except (ValueError, TypeError):
                                     logger.warning(
                                         f"Invalid date format '{date_str}' in filing record index {i} for CIK {cik}"
                                     )
                                     parse_errors += 1
                                     continue  # Skip this filing record
 
-                                filings_data.append({
-                                    "cik":
-                                    cik,
-                                    "form_type":
-                                    form,
-                                    "filing_date":
-                                    filing_date_obj,
-                                    "accession_number":
-                                    acc_num,
-                                    "primary_document_filename":
-                                    filename
-                                })
+                                # Batch interns the form type and stores the date as an ordinal
+                                filings_data.append(cik, form,
+                                                    filing_date_obj, acc_num,
+                                                    filename)
                             except IndexError:
                                 # Should not happen with min_len check, but as safety fallback
                                 logger.error(
@@ -210,7 +340,9 @@ class JSONParser(AbstractParser):
             logger.error(f"JSON file not found: {file_path}")
             # Let caller handle FileNotFoundError or re-raise as ParsingError
             raise ParsingError(f"File not found", source=str(file_path))
-        except json.JSONDecodeError as e:
+        except JSONParsingError:
+            raise
+        except _DECODE_ERRORS as e:
             logger.error(f"Invalid JSON in file {file_path}: {e}")
             # Raise specific JSON error, including source path
             raise JSONParsingError(f"Invalid JSON format: {e}",
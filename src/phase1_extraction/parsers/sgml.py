@@ -0,0 +1,265 @@
+# src/phase1_extraction/parsers/sgml.py
+
+import binascii
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set
+
+from src.core.exceptions import SGMLParsingError
+
+logger = logging.getLogger(__name__)
+
+# Bytes of document text held back while streaming: enough to spot a
+# "</TEXT>" split across chunks and to strip a closing <XBRL>/<PDF> wrapper
+_TEXT_HOLD_BYTES = 64
+# A first text line longer than this can't be a wrapper tag or uuencode header
+_TEXT_START_PEEK_BYTES = 256
+# Lines outside <TEXT> (headers, tags) are short; longer partial lines are dropped
+_MAX_TAG_LINE_BYTES = 1 << 16
+
+_END_TEXT = b"</TEXT>"
+_WRAPPER_TAGS = (b"<XBRL>", b"<XML>", b"<PDF>", b"<JSON>")
+_TAG_LINE_RE = re.compile(rb"^<([A-Z][A-Z0-9-]*)>(.*)$")
+_UU_BEGIN_RE = re.compile(rb"^begin [0-7]{3,4} ")
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.-]")
+
+# Splitter states
+_OUTSIDE, _META, _TEXT_START, _TEXT, _UU, _AFTER_TEXT = range(6)
+
+
+@dataclass
+class SubmissionDocument:
+    """One <DOCUMENT> of a full submission, as written by SGMLDocumentSplitter."""
+    type: str
+    sequence: Optional[int]
+    filename: str
+    description: Optional[str]
+    path: Path
+    size: int = 0
+
+
+def type_matches(document_type: str, wanted_types: Optional[Set[str]]) -> bool:
+    """True if wanted_types is empty/None or contains the type or its base ('EX-21' matches 'EX-21.1')."""
+    if not wanted_types:
+        return True
+    document_type = document_type.upper()
+    return (document_type in wanted_types
+            or document_type.split('.', 1)[0] in wanted_types)
+
+
+class SGMLDocumentSplitter:
+    """
+    Incremental splitter for EDGAR full-submission text files
+    (<accession number>.txt: an <SEC-HEADER> followed by one
+    <DOCUMENT><TYPE>..<FILENAME>..<TEXT>...</TEXT></DOCUMENT> per file).
+
+    feed() it the bundle in chunks of any size; each embedded document is
+    written straight to output_dir under filename_prefix + its <FILENAME>
+    (via a .part file renamed on completion), so memory use stays bounded by
+    the chunk size.
+    Uuencoded documents (images, PDFs, archives) are decoded, and the
+    <XBRL>/<XML>/<PDF>/<JSON> wrappers EDGAR adds around some documents are
+    removed. Documents whose type isn't in document_types are skipped.
+    """
+
+    def __init__(self,
+                 output_dir: Path,
+                 document_types: Optional[Set[str]] = None,
+                 filename_prefix: str = ""):
+        self.output_dir = Path(output_dir)
+        self.filename_prefix = filename_prefix
+        self.document_types = {t.upper() for t in document_types} if document_types else None
+        self.documents: List[SubmissionDocument] = []
+        self._buffer = bytearray()
+        self._state = _OUTSIDE
+        self._meta: Dict[str, str] = {}
+        self._wrapper: Optional[bytes] = None
+        self._document: Optional[SubmissionDocument] = None
+        self._out: Optional[BinaryIO] = None
+        self._part_path: Optional[Path] = None
+        self._documents_seen = 0
+
+    # --- Public API ---
+    def feed(self, data: bytes) -> None:
+        """Processes the next chunk of the submission."""
+        self._buffer += data
+        self._process()
+
+    def close(self) -> List[SubmissionDocument]:
+        """
+        Finishes the stream and returns the documents written.
+
+        Raises:
+            SGMLParsingError: If the stream ended inside a document (the
+                partially written file is removed).
+        """
+        if self._buffer and not self._buffer.endswith(b"\n"):
+            # Let a final line without a newline through the line states
+            self._buffer += b"\n"
+            self._process()
+        if self._state != _OUTSIDE:
+            self.abort()
+            raise SGMLParsingError("Submission ended inside a <DOCUMENT>",
+                                   source=str(self.output_dir))
+        return self.documents
+
+    def split(self, chunks: Iterable[bytes]) -> List[SubmissionDocument]:
+        """feed()s every chunk, then close()s."""
+        for chunk in chunks:
+            self.feed(chunk)
+        return self.close()
+
+    # --- State machine ---
+    def _process(self) -> None:
+        while True:
+            if self._state == _TEXT:
+                if not self._stream_text():
+                    return
+                continue
+            if self._state == _TEXT_START and self._first_line_is_content():
+                self._state = _TEXT
+                continue
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                if len(self._buffer) > _MAX_TAG_LINE_BYTES and self._state != _UU:
+                    # Not a tag line we care about; keep memory bounded
+                    del self._buffer[:-len(_END_TEXT)]
+                return
+            line = bytes(self._buffer[:newline]).rstrip(b"\r")
+            del self._buffer[:newline + 1]
+            self._handle_line(line)
+
+    def _handle_line(self, line: bytes) -> None:
+        stripped = line.strip()
+        if self._state == _OUTSIDE:
+            if stripped == b"<DOCUMENT>":
+                self._meta = {}
+                self._state = _META
+        elif self._state == _META:
+            if stripped.startswith(b"<TEXT>"):
+                self._start_document()
+                self._state = _TEXT_START
+            elif stripped == b"</DOCUMENT>":
+                self._state = _OUTSIDE  # Document without text
+            else:
+                match = _TAG_LINE_RE.match(stripped)
+                if match:
+                    self._meta[match.group(1).decode("ascii")] = match.group(
+                        2).decode("utf-8", errors="replace").strip()
+        elif self._state == _TEXT_START:
+            if stripped in _WRAPPER_TAGS:
+                self._wrapper = stripped
+            elif stripped == _END_TEXT:
+                self._finish_text(b"")
+            elif _UU_BEGIN_RE.match(stripped):
+                self._state = _UU
+            else:
+                self._write(line)
+                # Give the newline back so a "</TEXT>" on the next line is found
+                self._buffer[:0] = b"\n"
+                self._state = _TEXT
+        elif self._state == _UU:
+            if stripped == b"end":
+                self._finish_text(b"")
+            elif stripped == _END_TEXT:
+                self._finish_text(b"")  # Missing "end" line
+            elif stripped and stripped not in _WRAPPER_TAGS:
+                self._write(_decode_uu_line(stripped))
+        elif self._state == _AFTER_TEXT:
+            if stripped == b"</DOCUMENT>":
+                self._state = _OUTSIDE
+
+    def _first_line_is_content(self) -> bool:
+        """True if the text's first line is too long to be a wrapper/uuencode header."""
+        head = self._buffer[:_TEXT_START_PEEK_BYTES]
+        return len(head) == _TEXT_START_PEEK_BYTES and b"\n" not in head
+
+    def _stream_text(self) -> bool:
+        """Writes buffered text up to </TEXT>. Returns False when more data is needed."""
+        end = self._buffer.find(b"\n" + _END_TEXT)
+        if end >= 0:
+            self._finish_text(bytes(self._buffer[:end]))
+            del self._buffer[:end + 1 + len(_END_TEXT)]
+            return True
+        flush = len(self._buffer) - _TEXT_HOLD_BYTES
+        if flush > 0:
+            self._write(self._buffer[:flush])
+            del self._buffer[:flush]
+        return False
+
+    # --- Output ---
+    def _start_document(self) -> None:
+        self._documents_seen += 1
+        self._wrapper = None
+        document_type = self._meta.get("TYPE", "").upper() or "UNKNOWN"
+        sequence_text = self._meta.get("SEQUENCE", "")
+        sequence = int(sequence_text) if sequence_text.isdigit() else None
+        filename = _safe_filename(self._meta.get("FILENAME")) or _safe_filename(
+            f"{sequence or self._documents_seen}_{document_type}.txt")
+        self._document = SubmissionDocument(
+            type=document_type,
+            sequence=sequence,
+            filename=filename,
+            description=self._meta.get("DESCRIPTION"),
+            path=self.output_dir / f"{self.filename_prefix}{filename}")
+        if not type_matches(document_type, self.document_types):
+            self._out = None
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._part_path = self._document.path.with_name(self._document.path.name + ".part")
+        self._out = open(self._part_path, "wb")
+
+    def _write(self, data) -> None:
+        if self._out is not None:
+            self._out.write(data)
+            self._document.size += len(data)
+
+    def _finish_text(self, tail: bytes) -> None:
+        """Writes the held-back end of the text (minus the closing wrapper) and completes the file."""
+        if self._state != _UU:
+            tail = tail.rstrip()
+            if self._wrapper is not None:
+                closing = b"</" + self._wrapper[1:]
+                if tail.endswith(closing):
+                    tail = tail[:-len(closing)].rstrip()
+            if tail or (self._document is not None and self._document.size):
+                self._write(tail + b"\n")
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+            self._part_path.replace(self._document.path)
+            self._part_path = None
+            self.documents.append(self._document)
+            logger.debug(f"Wrote {self._document.type} document {self._document.filename} "
+                         f"({self._document.size} bytes).")
+        self._document = None
+        self._state = _AFTER_TEXT
+
+    def abort(self) -> None:
+        """Removes the partially written document (e.g. after a dropped connection)."""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        if self._part_path is not None:
+            self._part_path.unlink(missing_ok=True)
+            self._part_path = None
+
+
+def _safe_filename(name: Optional[str]) -> Optional[str]:
+    """Reduces a <FILENAME> value to a plain file name (no directories or odd characters)."""
+    if not name:
+        return None
+    name = _UNSAFE_FILENAME_CHARS.sub("_", Path(name.strip()).name)
+    return name if name.strip("._") else None
+
+
+def _decode_uu_line(line: bytes) -> bytes:
+    """Decodes one uuencoded line (tolerating the padding some encoders omit or add)."""
+    try:
+        return binascii.a2b_uu(line)
+    except binascii.Error:
+        # Same workaround as the stdlib uu module: trust the length byte
+        nbytes = (((line[0] - 32) & 63) * 4 + 5) // 3
+        return binascii.a2b_uu(line[:nbytes])
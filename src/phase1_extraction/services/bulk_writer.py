@@ -0,0 +1,140 @@
+# src/phase1_extraction/services/bulk_writer.py
+
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.core.batches import FilingBatch
+from src.database import CompanyRepository, FilingRepository
+
+logger = logging.getLogger(__name__)
+
+# Sentinel placed on the queue to tell the writer thread to finish
+_STOP = object()
+
+# (batch_number, company_mappings, filings)
+WriteBatch = Tuple[int, List[Dict], FilingBatch]
+
+
+class BulkIngestWriter:
+    """
+    Writes parsed bulk-ingest batches to the database on a dedicated thread.
+
+    The parsing side calls submit() with each batch; the writer drains a bounded
+    queue, upserting companies before filings (filings reference companies).
+    A full queue blocks submit(), which in turn stops the parser from pulling
+    more results, so memory stays bounded while CPU and DB I/O overlap.
+
+    The first database error stops the writer; subsequent submit() calls
+    return False so the producer can abort.
+    """
+
+    def __init__(self,
+                 company_repo: CompanyRepository,
+                 filing_repo: FilingRepository,
+                 queue_size: int = 4):
+        """
+        Args:
+            company_repo: Repository used for company upserts.
+            filing_repo: Repository used for filing INSERT IGNORE.
+            queue_size: Maximum number of parsed batches waiting to be written.
+        """
+        self.company_repo = company_repo
+        self.filing_repo = filing_repo
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._run,
+                                        name="bulk-ingest-writer",
+                                        daemon=True)
+        self.error: Optional[BaseException] = None
+
+        # Statistics (written by the writer thread)
+        self.batches_written = 0
+        self.companies_affected = 0
+        self.filings_inserted = 0
+        self.write_seconds = 0.0
+        # Time the producer spent in submit() (backpressure), written by the producer
+        self.producer_wait_seconds = 0.0
+
+    def start(self) -> None:
+        logger.info(
+            f"Starting bulk ingest writer thread (queue size {self._queue.maxsize})."
+        )
+        self._thread.start()
+
+    def submit(self, batch_number: int, companies: List[Dict],
+               filings: FilingBatch) -> bool:
+        """
+        Queues a batch for writing, blocking while the queue is full.
+
+        Returns:
+            True if the batch was queued, False if the writer has failed.
+        """
+        item: WriteBatch = (batch_number, companies, filings)
+        wait_start = time.monotonic()
+        while self.error is None:
+            try:
+                self._queue.put(item, timeout=1.0)
+                self.producer_wait_seconds += time.monotonic() - wait_start
+                return True
+            except queue.Full:
+                continue  # Re-check for writer failure, then keep waiting
+        return False
+
+    def close(self) -> bool:
+        """
+        Signals the writer to finish the remaining batches and waits for it.
+
+        Returns:
+            True if every batch was written without error.
+        """
+        if self._thread.is_alive():
+            # Use a timed put loop so a failed writer can't block us forever
+            while self._thread.is_alive():
+                try:
+                    self._queue.put(_STOP, timeout=1.0)
+                    break
+                except queue.Full:
+                    continue
+            self._thread.join()
+        logger.info(
+            f"Bulk ingest writer finished. Batches written: {self.batches_written}, "
+            f"DB write time: {self.write_seconds:.1f}s, "
+            f"parser blocked on full queue: {self.producer_wait_seconds:.1f}s")
+        return self.error is None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            if self.error is not None:
+                continue  # Drain without writing after a failure
+            batch_number, companies, filings = item
+            try:
+                self._write_batch(batch_number, companies, filings)
+            except Exception as e:  # DatabaseError or anything unexpected
+                logger.error(
+                    f"Bulk ingest writer failed on batch {batch_number}: {e}. "
+                    f"Remaining batches will be skipped.",
+                    exc_info=True)
+                self.error = e
+
+    def _write_batch(self, batch_number: int, companies: List[Dict],
+                     filings: FilingBatch) -> None:
+        start = time.monotonic()
+        if companies:
+            affected_rows = self.company_repo.bulk_upsert(companies)
+            self.companies_affected += affected_rows
+            logger.info(
+                f"Batch {batch_number}: upserted {len(companies)} companies "
+                f"(MySQL affected rows: {affected_rows}).")
+        if filings:
+            inserted_count = self.filing_repo.bulk_insert_ignore(filings)
+            self.filings_inserted += inserted_count
+            logger.info(
+                f"Batch {batch_number}: {inserted_count}/{len(filings)} filings inserted."
+            )
+        self.write_seconds += time.monotonic() - start
+        self.batches_written += 1
@@ -0,0 +1,256 @@
+# src/phase1_extraction/services/daemon_service.py
+
+import logging
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from src.core.batches import FilingBatch
+from src.core.exceptions import DatabaseError, FinlensError
+from src.phase1_extraction.services.pipeline_service import PipelineService
+
+logger = logging.getLogger(__name__)
+
+# Accession numbers remembered between polls (the feed overlaps from poll to poll)
+_SEEN_CAPACITY = 50000
+# Days of daily indices the scheduled incremental job re-checks (today + yesterday)
+_INCREMENTAL_DAYS = 2
+
+
+@dataclass
+class _ScheduledJob:
+    name: str
+    interval_seconds: float
+    run: Callable[[], Any]
+    next_run: float = 0.0  # time.monotonic(); 0 = due at startup
+
+
+class DaemonService:
+    """
+    Long-running pipeline (main.py --mode daemon).
+
+    Polls the EDGAR latest-filings feed every DAEMON_POLL_SECONDS and pushes
+    each new filing straight through company/filing insert, primary document
+    download and (optionally) phase-2 parsing, so filings are available
+    minutes after publication instead of after the next daily index.
+
+    The incremental (daily index) and backfill (current year's quarterly
+    indices) jobs run on their own schedules in a background thread, one at a
+    time, so a long job never delays polling. The PipelineService and its
+    engine, repositories (with their caches and accession index),
+    downloaders and parsers stay warm for the life of the process.
+    """
+
+    def __init__(self, pipeline: PipelineService):
+        self.pipeline = pipeline
+        self.settings = pipeline.settings
+        # Accession numbers already handled, oldest first (bounded)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._stop_event = threading.Event()
+        self._job_executor = ThreadPoolExecutor(max_workers=1,
+                                                thread_name_prefix="daemon-job")
+        self._running_job: Optional[Future] = None
+
+        pipeline_settings = self.settings.pipeline
+        self._jobs: List[_ScheduledJob] = []
+        if pipeline_settings.daemon_incremental_hours > 0:
+            self._jobs.append(
+                _ScheduledJob(
+                    "incremental", pipeline_settings.daemon_incremental_hours * 3600,
+                    lambda: pipeline.run_incremental_update(
+                        days_to_check=_INCREMENTAL_DAYS)))
+        if pipeline_settings.daemon_backfill_hours > 0:
+            self._jobs.append(
+                _ScheduledJob(
+                    "backfill", pipeline_settings.daemon_backfill_hours * 3600,
+                    lambda: pipeline.run_historical_backfill(
+                        date.today().year, date.today().year)))
+
+    @cached_property
+    def processor(self):
+        """Warm phase-2 ProcessorService, or None if it can't be loaded."""
+        try:
+            from src.phase2_parsing.services.processor_service import ProcessorService
+            return ProcessorService(self.settings)
+        except (ImportError, RuntimeError, SystemExit) as e:
+            # processor_service exits at import time when sec-parser is missing
+            logger.error(f"Phase-2 parsing disabled, ProcessorService unavailable: {e}")
+            return None
+
+    def stop(self) -> None:
+        """Asks run() to return after the current poll (safe from signal handlers)."""
+        self._stop_event.set()
+
+    # --- Main loop ---
+    def run(self, max_polls: Optional[int] = None) -> bool:
+        """
+        Polls until stop() (SIGINT/SIGTERM) or max_polls polls have run, then
+        waits for a running scheduled job to finish.
+
+        Returns:
+            True (errors in a poll or job are logged and retried later).
+        """
+        interval = self.settings.pipeline.daemon_poll_seconds
+        logger.info(f"Daemon started: polling every {interval:g}s, scheduled jobs: "
+                    f"{[job.name for job in self._jobs] or 'none'}.")
+        previous_handlers = self._install_signal_handlers()
+        polls = 0
+        try:
+            while not self._stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    self.poll_once()
+                except FinlensError as e:
+                    logger.error(f"Poll failed: {e}. Retrying next interval.")
+                except Exception as e:
+                    logger.error(f"Unexpected error during poll: {e}", exc_info=True)
+                self._run_due_jobs()
+                polls += 1
+                if max_polls is not None and polls >= max_polls:
+                    break
+                self._stop_event.wait(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            if self._running_job is not None and not self._running_job.done():
+                logger.info("Waiting for the running scheduled job to finish...")
+            self._job_executor.shutdown(wait=True)
+            self._restore_signal_handlers(previous_handlers)
+        logger.info(f"Daemon stopped after {polls} polls.")
+        return True
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, lambda *_: self.stop())
+        return previous
+
+    @staticmethod
+    def _restore_signal_handlers(previous) -> None:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    # --- Polling ---
+    def poll_once(self) -> int:
+        """
+        Fetches the feed, then inserts, downloads and parses the filings not
+        seen before.
+
+        Returns:
+            The number of new filings found.
+        """
+        new_filings = self._fetch_new_filings()
+        if not new_filings:
+            logger.debug("No new filings in the latest filings feed.")
+            return 0
+        logger.info(f"{len(new_filings)} new filings in the latest filings feed.")
+        self._ingest(new_filings)
+        # Only remembered once stored, so a failed insert is retried next poll
+        self._remember(new_filings.accession_numbers)
+        self._download_and_parse(new_filings)
+        return len(new_filings)
+
+    def _fetch_new_filings(self) -> FilingBatch:
+        """Reads feed pages (newest first) until one contains an already seen filing."""
+        pipeline_settings = self.settings.pipeline
+        page_size = pipeline_settings.daemon_feed_page_size
+        new_filings = FilingBatch()
+        for page in range(max(1, pipeline_settings.daemon_feed_max_pages)):
+            content = self.pipeline.latest_downloader.download(start=page * page_size,
+                                                               count=page_size)
+            if not content:
+                break
+            page_filings = self.pipeline.latest_parser.parse(content)
+            if not page_filings:
+                break
+            unseen = [
+                i for i, accession_number in enumerate(page_filings.accession_numbers)
+                if accession_number not in self._seen
+            ]
+            new_filings.extend(page_filings.take(unseen))
+            if len(unseen) < len(page_filings):
+                break  # Reached filings handled by an earlier poll
+        return new_filings.dedupe()
+
+    def _remember(self, accession_numbers) -> None:
+        for accession_number in accession_numbers:
+            self._seen[accession_number] = None
+            self._seen.move_to_end(accession_number)
+        while len(self._seen) > _SEEN_CAPACITY:
+            self._seen.popitem(last=False)
+
+    def _ingest(self, filings: FilingBatch) -> None:
+        """Adds unknown companies (from the submissions API), then the filings."""
+        ciks = filings.unique_ciks()
+        known_ciks = self.pipeline.company_repo.get_existing_ciks(list(ciks))
+        companies = []
+        for cik in sorted(ciks - known_ciks):
+            company_details = self.pipeline._fetch_company_data_from_api(cik)
+            if company_details:
+                companies.append(company_details)
+        if companies:
+            self.pipeline.company_repo.bulk_upsert(companies)
+        inserted = self.pipeline.filing_repo.bulk_insert_ignore(filings)
+        logger.info(f"Daemon ingest: {len(companies)} new companies, "
+                    f"{inserted} new filings inserted.")
+
+    def _download_and_parse(self, filings: FilingBatch) -> None:
+        """Downloads the primary documents of target-form filings, then parses them."""
+        target_forms = self.settings.pipeline.target_primary_doc_forms
+        wanted = filings.filter_forms(target_forms)
+        if not wanted:
+            return
+        self.pipeline.download_filing_documents(
+            [{
+                'cik': mapping['cik'],
+                'accession_number': mapping['accession_number'],
+                'filing_date': mapping['filing_date']
+            } for mapping in wanted.iter_mappings()],
+            target_forms=target_forms)
+
+        if not self.settings.pipeline.daemon_parse_documents:
+            return
+        from src.database.models import DOWNLOAD_DONE
+        try:
+            rows = self.pipeline.filing_repo.get_filings_by_accessions(
+                wanted.accession_numbers, columns=('local_path', 'download_status'))
+        except DatabaseError as e:
+            logger.error(f"Could not look up downloaded documents: {e}")
+            return
+        paths = [
+            Path(row.local_path) for row in rows
+            if row.download_status == DOWNLOAD_DONE and row.local_path
+        ]
+        if paths and self.processor is not None:
+            logger.info(f"Parsing {len(paths)} newly downloaded documents...")
+            self.processor.run_processing(paths)
+
+    # --- Scheduled jobs ---
+    def _run_due_jobs(self) -> None:
+        """Starts the first due job unless one is still running."""
+        if self._running_job is not None and not self._running_job.done():
+            return
+        now = time.monotonic()
+        for job in self._jobs:
+            if job.next_run <= now:
+                job.next_run = now + job.interval_seconds
+                logger.info(f"Starting scheduled {job.name} job.")
+                self._running_job = self._job_executor.submit(self._run_job, job)
+                return
+
+    @staticmethod
+    def _run_job(job: _ScheduledJob) -> None:
+        started = time.monotonic()
+        try:
+            success = job.run()
+            logger.info(f"Scheduled {job.name} job finished in "
+                        f"{time.monotonic() - started:.0f}s (success: {success}).")
+        except Exception as e:
+            logger.error(f"Scheduled {job.name} job failed: {e}", exc_info=True)
@@ -9,44 +9,56 @@ import collections
 import json
 from pathlib import Path
 from datetime import date, timedelta, datetime
-from typing import List, Dict, Optional, Sequence, Tuple, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
-import multiprocessing  # For parallel parsing
 import concurrent.futures
 import unicodedata  # For filename cleaning
 import re  # For filename cleaning
+from functools import cached_property
+from typing import TYPE_CHECKING
 
-# Core components
+# Core components (lightweight; everything heavier is imported where it's used)
 from src.config.settings import AppSettings, get_settings
 from src.core.rate_limiting import RateLimiter
+from src.core.batches import FilingBatch
 from src.core.exceptions import *  # Import custom exceptions
 
-# Database components
-from src.database import (initialize_database, CompanyRepository,
-                          FilingRepository, get_session)
-from sqlalchemy.orm import Session, scoped_session
-
-# Extraction components
-from src.phase1_extraction.downloaders.base import AbstractDownloader
-from src.phase1_extraction.downloaders.bulk import BulkDownloader
-from src.phase1_extraction.downloaders.incremental import IncrementalDownloader
-from src.phase1_extraction.downloaders.document import DocumentDownloader
-from src.phase1_extraction.parsers.base import AbstractParser
-from src.phase1_extraction.parsers.json import JSONParser, ParseResult as JSONParseResult
-from src.phase1_extraction.parsers.index import IndexParser, ParseResult as IndexParseResult
-from src.phase1_extraction.parsers.html import HTMLMetadataParser  # Import the new parser
+# Database, downloaders and parsers pull in SQLAlchemy, requests, bs4 and the
+# JSON decoders. They are imported and built on first use (see the
+# "Lazily built components" properties), so each --mode only pays for what it runs.
+if TYPE_CHECKING:
+    from src.database import CompanyRepository, FilingRepository
+    from src.phase1_extraction.downloaders.bulk import BulkDownloader
+    from src.phase1_extraction.downloaders.incremental import IncrementalDownloader
+    from src.phase1_extraction.downloaders.document import DocumentDownloader
+    from src.phase1_extraction.downloaders.latest import LatestFilingsDownloader
+    from src.phase1_extraction.parsers.atom import LatestFilingsParser
+    from src.phase1_extraction.parsers.json import JSONParser, ParseResult as JSONParseResult
+    from src.phase1_extraction.parsers.index import IndexParser
+    from src.phase1_extraction.parsers.html import HTMLMetadataParser
 
 logger = logging.getLogger(__name__)
 
+# Download status updates are written back to the filings table in batches of this size
+_STATUS_FLUSH_SIZE = 500
 
-# --- Helper function for parallel JSON parsing ---
-# This function needs to be defined at the top level for multiprocessing to pickle it.
-# It now takes the parser instance as an argument.
-def _parse_cik_json_worker(parser: JSONParser,
-                           file_path: Path) -> Tuple[Path, JSONParseResult]:
-    """Worker function for parsing a single CIK JSON file using the provided parser."""
+# --- Helper functions for parallel JSON parsing ---
+# These need to be defined at the top level for multiprocessing to pickle them.
+# Each worker process receives the parser once (via the pool initializer) instead
+# of having it pickled alongside every file path.
+_worker_json_parser: Optional["JSONParser"] = None
+
+
+def _init_json_worker(parser: "JSONParser") -> None:
+    """Pool initializer: stores the parser instance for this worker process."""
+    global _worker_json_parser
+    _worker_json_parser = parser
+
+
+def _parse_cik_json_worker(file_path: Path) -> Tuple[Path, "JSONParseResult"]:
+    """Worker function for parsing a single CIK JSON file using the worker's parser."""
     try:
-        result = parser.parse(file_path)
+        result = _worker_json_parser.parse(file_path)
         return file_path, result
     except Exception as e:
         # Log error here or let the main loop handle it based on return?
@@ -54,8 +66,16 @@ def _parse_cik_json_worker(parser: JSONParser,
         logger.error(f"Error parsing {file_path.name} in worker: {e}",
                      exc_info=False)  # Keep log concise
         # Return structure indicating failure for this file
-        return file_path, (None, [], 1
-                           )  # Company=None, Filings=[], ErrorCount=1
+        return file_path, (None, FilingBatch(), 1
+                           )  # Company=None, Filings=empty, ErrorCount=1
+
+
+def _compute_imap_chunksize(num_items: int, num_workers: int) -> int:
+    """
+    Picks an imap chunksize that amortizes IPC overhead while still giving
+    each worker several batches (so stragglers don't idle the others).
+    """
+    return max(1, min(256, num_items // (max(1, num_workers) * 8)))
 
 
 # --- End Helper Function ---
@@ -67,39 +87,17 @@ class PipelineService:
     """
 
     def __init__(self):
-        """Initializes all components needed for the pipeline."""
+        """
+        Loads settings and prepares data directories. The database, downloaders
+        and parsers are built on first access, so settings overridden after
+        construction (e.g. from the command line) still apply to them.
+        """
         logger.info("Initializing PipelineService...")
         try:
             self.settings: AppSettings = get_settings()
             self.rate_limiter: RateLimiter = RateLimiter(
                 self.settings.sec_api.rate_limit)
 
-            # Initialize DB and Repositories
-            self.engine, self.session_factory = initialize_database(
-                self.settings.database)
-            self.company_repo: CompanyRepository = CompanyRepository(
-                self.session_factory)
-            self.filing_repo: FilingRepository = FilingRepository(
-                self.session_factory)
-            logger.info("Database and repositories initialized.")
-
-            # Initialize Downloaders
-            self.bulk_downloader: BulkDownloader = BulkDownloader(
-                self.settings, self.rate_limiter)
-            # IncrementalDownloader now handles both daily and quarterly index downloads
-            self.index_downloader: IncrementalDownloader = IncrementalDownloader(
-                self.settings, self.rate_limiter)
-            self.document_downloader: DocumentDownloader = DocumentDownloader(
-                self.settings, self.rate_limiter)
-            logger.info("Downloaders initialized.")
-
-            # Initialize Parsers
-            self.json_parser: JSONParser = JSONParser(self.settings)
-            self.index_parser: IndexParser = IndexParser(self.settings)
-            self.html_parser: HTMLMetadataParser = HTMLMetadataParser(
-                self.settings, self.rate_limiter)
-            logger.info("Parsers initialized.")
-
             # Define data paths from settings
             self.data_path: Path = self.settings.pipeline.data_path
             self.submissions_dir = self.data_path / 'submissions'
@@ -122,6 +120,74 @@ class PipelineService:
             raise RuntimeError(
                 f"Unexpected error during pipeline setup: {e}") from e
 
+    # --- Lazily built components ---
+    @cached_property
+    def _database(self):
+        """(engine, session_factory), created on first use."""
+        from src.database import initialize_database
+        database = initialize_database(self.settings.database)
+        logger.info("Database initialized.")
+        return database
+
+    @property
+    def engine(self):
+        return self._database[0]
+
+    @property
+    def session_factory(self):
+        return self._database[1]
+
+    @cached_property
+    def company_repo(self) -> "CompanyRepository":
+        from src.database import CompanyRepository
+        return CompanyRepository(self.session_factory)
+
+    @cached_property
+    def filing_repo(self) -> "FilingRepository":
+        from src.database import FilingRepository
+        return FilingRepository(self.session_factory)
+
+    @cached_property
+    def bulk_downloader(self) -> "BulkDownloader":
+        from src.phase1_extraction.downloaders.bulk import BulkDownloader
+        return BulkDownloader(self.settings, self.rate_limiter)
+
+    @cached_property
+    def index_downloader(self) -> "IncrementalDownloader":
+        # IncrementalDownloader handles both daily and quarterly index downloads
+        from src.phase1_extraction.downloaders.incremental import IncrementalDownloader
+        return IncrementalDownloader(self.settings, self.rate_limiter)
+
+    @cached_property
+    def document_downloader(self) -> "DocumentDownloader":
+        from src.phase1_extraction.downloaders.document import DocumentDownloader
+        return DocumentDownloader(self.settings, self.rate_limiter)
+
+    @cached_property
+    def latest_downloader(self) -> "LatestFilingsDownloader":
+        from src.phase1_extraction.downloaders.latest import LatestFilingsDownloader
+        return LatestFilingsDownloader(self.settings, self.rate_limiter)
+
+    @cached_property
+    def latest_parser(self) -> "LatestFilingsParser":
+        from src.phase1_extraction.parsers.atom import LatestFilingsParser
+        return LatestFilingsParser(self.settings)
+
+    @cached_property
+    def json_parser(self) -> "JSONParser":
+        from src.phase1_extraction.parsers.json import JSONParser
+        return JSONParser(self.settings)
+
+    @cached_property
+    def index_parser(self) -> "IndexParser":
+        from src.phase1_extraction.parsers.index import IndexParser
+        return IndexParser(self.settings)
+
+    @cached_property
+    def html_parser(self) -> "HTMLMetadataParser":
+        from src.phase1_extraction.parsers.html import HTMLMetadataParser
+        return HTMLMetadataParser(self.settings, self.rate_limiter)
+
     def _ensure_directories_exist(self):
         """Creates necessary data directories if they don't exist."""
         dirs_to_create = [
@@ -227,8 +293,15 @@ class PipelineService:
 
     def _ingest_bulk_json_data(self, source_dir: Path) -> bool:
         """
-        Parses CIK JSON files in chunks and ingests data into the database
-        to manage memory usage.
+        Parses CIK JSON files in parallel and ingests data into the database
+        through a pipelined writer:
+
+        - A persistent process pool parses files (dispatched in chunks of
+          bulk_ingest_file_chunk_size to bound in-flight results).
+        - Parsed results are grouped into write batches of bulk_write_batch_size
+          files and handed to a BulkIngestWriter thread via a bounded queue.
+        - The writer upserts companies and inserts filings while the workers
+          keep parsing; a full queue applies backpressure to the parser side.
         """
         logger.info(
             f"Scanning {source_dir} for CIK*.json files for ingestion...")
@@ -242,176 +315,134 @@ class PipelineService:
         logger.info(
             f"Found {total_files_to_process} CIK JSON files to process.")
 
-        # --- Chunking Configuration ---
-        # Adjust this based on available RAM and typical file contents
-        # Start with a value like 50,000 or 100,000 and monitor memory.
+        # --- Chunking / Batching Configuration ---
+        # Dispatch chunk: how many files are handed to the pool at once (bounds RAM).
+        # Write batch: how many parsed files are written to the DB per batch.
         file_chunk_size = self.settings.pipeline.bulk_ingest_file_chunk_size
+        write_batch_size = self.settings.pipeline.bulk_write_batch_size
         num_chunks = (total_files_to_process + file_chunk_size -
                       1) // file_chunk_size
         logger.info(
-            f"Processing files in {num_chunks} chunks of up to {file_chunk_size} files each."
+            f"Processing files in {num_chunks} dispatch chunks of up to {file_chunk_size} files, "
+            f"writing in batches of {write_batch_size} files "
+            f"(writer queue size {self.settings.pipeline.bulk_write_queue_size})."
         )
         # -----------------------------
 
         total_parse_errors = 0
-        total_companies_affected = 0
-        total_filings_inserted = 0
         overall_success = True
-
         num_workers = self.settings.pipeline.bulk_workers
-
-        # --- Process Files in Chunks ---
-        for chunk_index in range(num_chunks):
+        files_processed = 0
+        batches_submitted = 0
+        progress_every = max(1, min(file_chunk_size, total_files_to_process) // 5)
+        start_time = time.monotonic()
+
+        # Aggregators for the batch currently being assembled
+        batch_company_data: Dict[str, Dict] = {}  # Keyed by CIK (latest wins)
+        batch_filings_data = FilingBatch()  # Deduplicated by accession at flush
+        batch_files = 0
+
+        from src.phase1_extraction.services.bulk_writer import BulkIngestWriter
+        writer = BulkIngestWriter(
+            self.company_repo,
+            self.filing_repo,
+            queue_size=self.settings.pipeline.bulk_write_queue_size)
+        writer.start()
+
+        def _flush_batch() -> bool:
+            """Hands the current batch to the writer. Returns False if the writer failed."""
+            nonlocal batch_company_data, batch_filings_data, batch_files, batches_submitted
+            if not batch_files:
+                return True
+            batches_submitted += 1
+            queued = writer.submit(batches_submitted,
+                                   list(batch_company_data.values()),
+                                   batch_filings_data.dedupe())
+            batch_company_data, batch_filings_data, batch_files = {}, FilingBatch(), 0
+            return queued
+
+        def _chunk(chunk_index: int) -> List[Path]:
             start_index = chunk_index * file_chunk_size
-            end_index = start_index + file_chunk_size
-            file_chunk = all_cik_files[start_index:end_index]
-
-            if not file_chunk:
-                logger.info(
-                    f"Skipping empty chunk {chunk_index + 1}/{num_chunks}.")
-                continue
+            return all_cik_files[start_index:start_index + file_chunk_size]
 
+        try:
+            # --- One long-lived pool for the whole ingest ---
+            # Workers receive the parser once; results stream back unordered so the
+            # aggregator never waits for the slowest file in a chunk.
             logger.info(
-                f"--- Starting processing for chunk {chunk_index + 1}/{num_chunks} ({len(file_chunk)} files) ---"
+                f"Starting persistent parsing pool with {num_workers} workers..."
             )
+            import multiprocessing
+            with multiprocessing.Pool(processes=num_workers,
+                                      initializer=_init_json_worker,
+                                      initargs=(self.json_parser, )) as pool:
+
+                def _submit(chunk_index: int):
+                    file_chunk = _chunk(chunk_index)
+                    return pool.imap_unordered(
+                        _parse_cik_json_worker,
+                        file_chunk,
+                        chunksize=_compute_imap_chunksize(
+                            len(file_chunk), num_workers))
 
-            # Reset aggregators for the current chunk
-            chunk_company_data: Dict[str, Dict] = {
-            }  # Use dict keyed by CIK for latest data
-            chunk_filings_data: List[Dict] = []
-            chunk_parse_errors: int = 0
-            chunk_files_processed: int = 0
-
-            logger.info(
-                f"Starting parallel parsing for chunk with {num_workers} workers..."
-            )
-            tasks = [(self.json_parser, file_path) for file_path in file_chunk]
+                pending_results = _submit(0)
 
-            try:
-                # Process the current chunk in parallel
-                with multiprocessing.Pool(processes=num_workers) as pool:
-                    # Consider chunksize for starmap if chunks are very large
-                    # chunksize_starmap = max(1, len(tasks) // (num_workers * 4))
-                    results_iterator = pool.starmap(
-                        _parse_cik_json_worker,
-                        tasks)  # , chunksize=chunksize_starmap)
+                for chunk_index in range(num_chunks):
+                    results_iterator = pending_results
+                    pending_results = None
+                    chunk_files = 0
+                    chunk_len = len(_chunk(chunk_index))
 
                     for file_path, parse_result in results_iterator:
-                        chunk_files_processed += 1
-                        if chunk_files_processed % (file_chunk_size // 5 if file_chunk_size >= 5 else 1) == 0 or \
-                           chunk_files_processed == len(file_chunk):
-                            current_total_processed = start_index + chunk_files_processed
+                        chunk_files += 1
+                        files_processed += 1
+                        if files_processed % progress_every == 0 or files_processed == total_files_to_process:
                             logger.info(
-                                f"Chunk {chunk_index + 1} Parsing: "
-                                f"{chunk_files_processed}/{len(file_chunk)} files processed | "
-                                f"Overall: {current_total_processed}/{total_files_to_process}..."
+                                f"Bulk ingest progress: {files_processed}/{total_files_to_process} files parsed, "
+                                f"{writer.batches_written}/{batches_submitted} batches written."
                             )
 
                         company_data, filings_data, parse_errors = parse_result
-                        chunk_parse_errors += parse_errors
-
+                        total_parse_errors += parse_errors
                         if company_data and company_data.get('cik'):
-                            # Store latest parsed data for each CIK within the chunk
-                            chunk_company_data[
+                            batch_company_data[
                                 company_data['cik']] = company_data
-                        if filings_data:
-                            chunk_filings_data.extend(filings_data)
-
-                total_parse_errors += chunk_parse_errors
-                logger.info(
-                    f"Chunk {chunk_index + 1} parallel parsing complete. "
-                    f"Files processed in chunk: {chunk_files_processed}, "
-                    f"File/record errors in chunk: {chunk_parse_errors}")
-
-                # --- Database Ingestion for the Current Chunk ---
-                logger.info(
-                    f"Starting database ingestion phase for chunk {chunk_index + 1}..."
-                )
-
-                # Ingest Companies from the chunk using UPSERT
-                if chunk_company_data:
-                    company_list_chunk = list(chunk_company_data.values())
-                    logger.info(
-                        f"Upserting {len(company_list_chunk)} companies from chunk {chunk_index + 1}..."
-                    )
-                    try:
-                        # Repository handles internal batching if needed, but main batching is now the file chunk
-                        affected_rows = self.company_repo.bulk_upsert(
-                            company_list_chunk)
-                        total_companies_affected += affected_rows
-                        logger.info(
-                            f"Company upsert for chunk {chunk_index + 1} complete. MySQL affected rows: {affected_rows}"
-                        )
-                    except DatabaseError as e:
-                        logger.error(
-                            f"Company upsert failed during processing of chunk {chunk_index + 1}: {e}. Stopping bulk ingest.",
-                            exc_info=True)
-                        overall_success = False
-                        break  # Stop processing further chunks on DB error
-                else:
-                    logger.info(
-                        f"No valid company data to upsert in chunk {chunk_index + 1}."
-                    )
-
-                # Ingest Filings from the chunk using INSERT IGNORE
-                if chunk_filings_data:
-                    # Deduplication within the chunk - still beneficial
-                    unique_filings_dict_chunk = {
-                        f['accession_number']: f
-                        for f in chunk_filings_data
-                        if f.get('accession_number')
-                    }
-                    final_filings_to_insert_chunk = list(
-                        unique_filings_dict_chunk.values())
-                    logger.info(
-                        f"Inserting {len(final_filings_to_insert_chunk)} unique filings from chunk {chunk_index + 1} (after in-memory deduplication)..."
-                    )
-                    try:
-                        # Repository handles internal batching if needed
-                        inserted_count = self.filing_repo.bulk_insert_ignore(
-                            final_filings_to_insert_chunk)
-                        total_filings_inserted += inserted_count
-                        logger.info(
-                            f"Filing insert ignore for chunk {chunk_index + 1} complete. Rows actually inserted: {inserted_count}"
-                        )
-                    except DatabaseError as e:
-                        logger.error(
-                            f"Filing insert ignore failed during processing of chunk {chunk_index + 1}: {e}. Stopping bulk ingest.",
-                            exc_info=True)
-                        overall_success = False
-                        break  # Stop processing further chunks on DB error
-                else:
-                    logger.info(
-                        f"No valid filing data to insert in chunk {chunk_index + 1}."
-                    )
-
-                logger.info(
-                    f"--- Finished processing chunk {chunk_index + 1}/{num_chunks} ---"
-                )
+                        batch_filings_data.extend(filings_data)
+                        batch_files += 1
+
+                        # Dispatch the next chunk as soon as this one is fully received,
+                        # before a (possibly blocking) flush, so the pool keeps working.
+                        if pending_results is None and chunk_files == chunk_len and \
+                                chunk_index + 1 < num_chunks:
+                            pending_results = _submit(chunk_index + 1)
+
+                        if batch_files >= write_batch_size:
+                            if not _flush_batch():
+                                overall_success = False
+                                break
+
+                    if not overall_success:
+                        break
+                    if pending_results is None and chunk_index + 1 < num_chunks:
+                        pending_results = _submit(chunk_index + 1)
+
+                if overall_success and not _flush_batch():
+                    overall_success = False
 
-            except Exception as e:
+        except Exception as e:
+            logger.error(
+                f"Unexpected error during parallel parsing for bulk ingest: {e}",
+                exc_info=True)
+            overall_success = False
+        finally:
+            # Always let the writer finish what it has queued
+            if not writer.close():
                 logger.error(
-                    f"Unexpected error during parallel parsing or ingestion for chunk {chunk_index + 1}: {e}",
-                    exc_info=True)
+                    f"Bulk ingest writer reported an error: {writer.error}. Stopping bulk ingest."
+                )
                 overall_success = False
-                break  # Stop processing further chunks on unexpected error
-
-            # --- Explicitly clear chunk data to potentially help garbage collection ---
-            del chunk_company_data
-            del chunk_filings_data
-            del final_filings_to_insert_chunk  # if created
-            del company_list_chunk  # if created
-            del tasks
-            del results_iterator
-            # import gc # Optional: Force garbage collection (usually not needed)
-            # gc.collect()
-            # -------------------------------------------------------------------------
-
-            if not overall_success:  # Check if loop broke due to error
-                break
-
-        # --- End of Chunk Processing Loop ---
 
+        elapsed = time.monotonic() - start_time
         logger.info("=" * 50)
         if overall_success:
             logger.info(
@@ -423,13 +454,17 @@ class PipelineService:
 
         logger.info(f"Final Summary:")
         logger.info(
-            f"  Total Files Processed: Approximately {start_index + chunk_files_processed if 'start_index' in locals() else 0}/{total_files_to_process}"
+            f"  Total Files Processed: {files_processed}/{total_files_to_process}"
         )
         logger.info(f"  Total Parse Errors Encountered: {total_parse_errors}")
         logger.info(
-            f"  Total Company Rows Affected (MySQL Count): {total_companies_affected}"
+            f"  Total Company Rows Affected (MySQL Count): {writer.companies_affected}"
+        )
+        logger.info(
+            f"  Total Filing Rows Inserted: {writer.filings_inserted}")
+        logger.info(
+            f"  Elapsed: {elapsed:.1f}s (DB writes: {writer.write_seconds:.1f}s, overlapped with parsing)"
         )
-        logger.info(f"  Total Filing Rows Inserted: {total_filings_inserted}")
         logger.info("=" * 50)
 
         return overall_success
@@ -463,8 +498,7 @@ class PipelineService:
         )
 
         # 2. Download and Parse Indices
-        all_filings_from_indices: Dict[str, Dict] = {
-        }  # Key: acc_no, Value: filing dict
+        all_filings_from_indices = FilingBatch()  # Deduplicated by accession below
         for target_date in sorted(dates_to_process):  # Process chronologically
             logger.debug(f"Processing index for date: {target_date}")
             index_content: Optional[str] = None
@@ -479,11 +513,8 @@ class PipelineService:
                         index_content,
                         source_description=f"Daily-{target_date.isoformat()}")
                     if parsed_filings:
-                        # Add/overwrite results using accession number as key to auto-deduplicate across days
-                        for filing_dict in parsed_filings:
-                            if filing_dict.get("accession_number"):
-                                all_filings_from_indices[filing_dict[
-                                    "accession_number"]] = filing_dict
+                        # Accumulate; duplicates across days are removed once all dates are parsed
+                        all_filings_from_indices.extend(parsed_filings)
                         logger.debug(
                             f"Parsed {len(parsed_filings)} filings from index {target_date}."
                         )
@@ -506,6 +537,8 @@ class PipelineService:
                     exc_info=True)
                 overall_success = False
 
+        # Later days overwrite earlier ones for the same accession number
+        all_filings_from_indices = all_filings_from_indices.dedupe()
         if not all_filings_from_indices:
             logger.info("No filings found in recent indices to process.")
             # Return True because no fundamental error occurred, just no new data
@@ -514,7 +547,7 @@ class PipelineService:
         logger.info(
             f"Collected {len(all_filings_from_indices)} unique filing records from recent indices."
         )
-        filings_list_to_check = list(all_filings_from_indices.values())
+        filings_list_to_check = all_filings_from_indices
 
         # 3. Add New Filings to Database
         logger.info("Inserting/Ignoring filings into database...")
@@ -535,8 +568,8 @@ class PipelineService:
         # 4. Identify Potentially New or Changed CIKs
         # Get all unique CIKs involved in the recently downloaded filings
         ciks_in_recent_filings = {
-            f['cik']
-            for f in filings_list_to_check if f.get('cik')
+            cik
+            for cik in filings_list_to_check.unique_ciks() if cik
         }
         if not ciks_in_recent_filings:
             logger.info(
@@ -747,7 +780,7 @@ class PipelineService:
             for quarter in range(1, 5):  # Q1, Q2, Q3, Q4
                 source_desc = f"{year}-Q{quarter}"
                 logger.info(f"Processing {source_desc}...")
-                qtr_filings_list: List[Dict] = []
+                qtr_filings_list = FilingBatch()
                 qtr_content: Optional[str] = None
 
                 try:
@@ -838,15 +871,20 @@ class PipelineService:
 
     def _prepare_download_task(
             self, filing_info: Dict, target_forms: Set[str]
-    ) -> Optional[Tuple[str, str, str, str, Path]]:
+    ) -> Tuple[Optional[Tuple[str, str, str, str, Path]], str]:
         """
         Prepares details needed for downloading a single filing's primary document.
         Finds filename via HTML parser, builds URL and output path.
 
         Returns:
-            Tuple (cik, accession_number, primary_filename, download_url, output_path)
-            if document found and ready, else None.
+            (task, status): task is the tuple (cik, accession_number,
+            primary_filename, download_url, output_path) if the document was
+            found and is ready (status DOWNLOAD_PENDING), else None with
+            status DOWNLOAD_SKIPPED (nothing to download) or DOWNLOAD_FAILED
+            (error; worth retrying later).
         """
+        from src.database.models import (DOWNLOAD_FAILED, DOWNLOAD_PENDING,
+                                         DOWNLOAD_SKIPPED)
         cik = filing_info.get('cik')
         accession_number = filing_info.get('accession_number')
 
@@ -854,7 +892,7 @@ class PipelineService:
             logger.warning(
                 f"Skipping download prep due to missing CIK or Accession Number: {filing_info}"
             )
-            return None
+            return None, DOWNLOAD_SKIPPED
 
         try:
             # Find the primary HTM filename using the HTML parser
@@ -867,7 +905,7 @@ class PipelineService:
                 logger.info(
                     f"Skipping download prep for {cik}/{accession_number}: Flagged as likely ABS by HTML parser."
                 )
-                return None  # Don't prepare download for likely ABS filings (No real business operations)
+                return None, DOWNLOAD_SKIPPED  # Don't prepare download for likely ABS filings (No real business operations)
 
             if primary_filename:
                 # Construct output path
@@ -884,15 +922,16 @@ class PipelineService:
 
                 if download_url:
                     # Return all necessary details for the download job
-                    return cik, accession_number, primary_filename, download_url, output_path
+                    return (cik, accession_number, primary_filename,
+                            download_url, output_path), DOWNLOAD_PENDING
                 else:
                     logger.error(
                         f"Could not construct download URL for {cik}/{accession_number}/{primary_filename}"
                     )
-                    return None
+                    return None, DOWNLOAD_FAILED
             else:
                 # Filename not found (already logged by html_parser)
-                return None
+                return None, DOWNLOAD_SKIPPED
 
         except (ValueError, NotFoundError, NetworkError, ParsingError,
                 RequestTimeoutError) as e:
@@ -900,17 +939,36 @@ class PipelineService:
             logger.error(
                 f"Failed to find/prepare document for {cik}/{accession_number}: {e}",
                 exc_info=False)
-            return None
+            return None, DOWNLOAD_FAILED
         except Exception as e:
             # Log unexpected errors during preparation
             logger.error(
                 f"Unexpected error preparing download for {cik}/{accession_number}: {e}",
                 exc_info=True)
+            return None, DOWNLOAD_FAILED
+
+    def _download_submission(self, cik: str, accession_number: str,
+                             output_dir: Path) -> Union[Path, str, None]:
+        """
+        DOWNLOAD_FULL_SUBMISSION task: one request for the filing's complete
+        submission, split into output_dir. Returns the path of the first
+        document kept (the primary document, unless filtered out),
+        DOWNLOAD_SKIPPED if no document matched SUBMISSION_DOC_TYPES (nothing
+        to retry), or None if the download or split failed.
+        """
+        from src.database.models import DOWNLOAD_SKIPPED
+        documents = self.document_downloader.download_submission(
+            cik=cik,
+            accession_number=accession_number,
+            output_dir=output_dir,
+            document_types=self.settings.pipeline.submission_document_types)
+        if documents is None:
             return None
+        return documents[0].path if documents else DOWNLOAD_SKIPPED
 
     def download_filing_documents(
             self,
-            filings_to_process: Sequence[Dict],
+            filings_to_process: Iterable[Dict],
             target_forms: Set[str] = {'10-K', '10-K/A'},
             num_threads: Optional[int] = None,
             max_downloads: Optional[int] = None,
@@ -919,117 +977,200 @@ class PipelineService:
         Downloads specific document files (e.g., 10-Ks, 10-K/As) for a given list of filings.
         Finds primary filename via HTMLMetadataParser, downloads via DocumentDownloader in parallel.
 
+        Filings are consumed lazily (e.g. from FilingRepository.iter_filings_for_download):
+        each one is prepared and submitted as soon as it arrives, with at most a few
+        downloads per thread in flight, so memory stays flat and downloads start at once.
+        Outcomes are written back to the filings' download_status columns in batches.
+
+        With DOWNLOAD_FULL_SUBMISSION set, each filing costs a single request:
+        its complete submission text file is streamed and split into
+        <document dir>/<CIK>_<accession>/<CIK>_<accession>_<FILENAME> (documents
+        of SUBMISSION_DOC_TYPES only), skipping the index-page lookup; local_path records the first
+        document kept. The ABS check of that lookup and skip_existing don't
+        apply in this mode (download_status already tracks finished filings).
+
         Args:
-            filings_to_process: A sequence of dictionaries, each containing at least
-                                'cik' and 'accession_number'. Assumes this list
+            filings_to_process: An iterable of dictionaries, each containing at least
+                                'cik' and 'accession_number' (and optionally
+                                'filing_date'). Assumes this list
                                 is already filtered for relevant companies (e.g., non-ABS).
             target_forms: The set of form types to find the primary document for.
             num_threads: Number of parallel download threads. Defaults to pipeline setting.
             max_downloads: Optional limit on the number of documents to download.
             skip_existing: If True, checks if the output file exists and skips download if it does.
         """
+        from src.database.models import (DOWNLOAD_DONE, DOWNLOAD_FAILED,
+                                         DOWNLOAD_SKIPPED)
         # Use setting as default if argument is None
         _target_forms = target_forms if target_forms is not None else self.settings.pipeline.target_primary_doc_forms
         _num_threads = num_threads if num_threads is not None else self.settings.pipeline.download_threads
+        full_submission = self.settings.pipeline.download_full_submission
+        max_in_flight = _num_threads * 4
 
         logger.info(
-            f"Preparing to download documents for up to {len(filings_to_process)} filings "
-            f"(Target forms: {_target_forms}) using {_num_threads} threads.")
+            f"Starting document downloads (Target forms: {_target_forms}"
+            f"{', full submissions' if full_submission else ''}) "
+            f"using {_num_threads} threads.")
 
-        # --- Stage 1: Prepare Download Tasks ---
-        download_tasks: List[Tuple[str, str, str, str, Path]] = [
-        ]  # (cik, acc_no, filename, url, output_path)
         prep_errors = 0
         skipped_existing = 0
-
-        for filing_info in filings_to_process:
-            task_details = self._prepare_download_task(filing_info,
-                                                       target_forms)
-            if task_details:
-                output_path_to_check = task_details[
-                    4]  # Path is the 5th element (index 4)
-                if skip_existing and output_path_to_check.exists():
-                    logger.debug(
-                        f"Skipping download, file exists: {output_path_to_check}"
-                    )
-                    skipped_existing += 1
-                else:
-                    download_tasks.append(task_details)
-            else:
-                prep_errors += 1
-
-            # Apply max_downloads limit *after* potential skipping
-            if max_downloads is not None and len(
-                    download_tasks) >= max_downloads:
-                logger.info(
-                    f"Reached max_downloads limit ({max_downloads}) for actual downloads. Stopping task preparation."
-                )
-                break  # Stop adding new tasks
-
-        logger.info(f"Prepared {len(download_tasks)} download tasks. "
-                    f"Skipped {skipped_existing} existing files. "
-                    f"Encountered {prep_errors} errors during preparation.")
-
-        if not download_tasks:
-            logger.info("No documents need downloading.")
-            return 0, prep_errors  # Return success=0, fail=prep_errors? Or just 0,0? Let's do 0,0
-
-        # --- Stage 2: Execute Downloads in Parallel ---
-        logger.info(
-            f"Starting parallel download of {len(download_tasks)} documents..."
-        )
+        skipped_unmatched = 0
+        submitted = 0
         success_count = 0
-        failure_count = prep_errors  # Start failure count with prep errors
-
-        with concurrent.futures.ThreadPoolExecutor(
-                max_workers=num_threads) as executor:
-            # Map futures back to output_path for logging
-            future_to_path: Dict[concurrent.futures.Future, Path] = {}
-
-            for task_tuple in download_tasks:
-                # Unpack arguments needed by DocumentDownloader.download
-                submit_cik, submit_acc_no, submit_filename, submit_url, submit_output_path = task_tuple
-
-                future = executor.submit(
-                    self.document_downloader.download,  # The method to call
-                    cik=submit_cik,
-                    accession_number=submit_acc_no,
-                    filename=submit_filename,
-                    output_path=submit_output_path)
-                future_to_path[
-                    future] = submit_output_path  # Map future to output path
-
-            processed_count = 0
-            total_tasks = len(download_tasks)
-            for future in concurrent.futures.as_completed(future_to_path):
-                output_path = future_to_path[future]
-                processed_count += 1
+        failure_count = 0
+        status_updates: List[Dict] = []
+
+        def _record(filing_info: Dict, status: str,
+                    output_path: Optional[Path] = None):
+            # Queue a download_status update; flushed every _STATUS_FLUSH_SIZE
+            update = {
+                'accession_number': filing_info['accession_number'],
+                'download_status': status
+            }
+            if filing_info.get('filing_date') is not None:
+                # Lets the UPDATE prune to one partition of a partitioned table
+                update['filing_date'] = filing_info['filing_date']
+            if status == DOWNLOAD_DONE and output_path is not None:
+                try:
+                    update['byte_size'] = output_path.stat().st_size
+                except OSError:
+                    pass
+                update['local_path'] = str(output_path)
+                update['downloaded_at'] = datetime.now()
+            status_updates.append(update)
+            if len(status_updates) >= _STATUS_FLUSH_SIZE:
+                _flush_status_updates()
+
+        def _flush_status_updates():
+            if not status_updates:
+                return
+            try:
+                self.filing_repo.mark_download_results(status_updates)
+            except DatabaseError as e:
+                # Status is bookkeeping only; the next run re-checks these filings
+                logger.error(f"Failed to record download status: {e}")
+            status_updates.clear()
+
+        def _collect(done_futures):
+            # Tally finished downloads; future_to_task maps futures to (filing_info, output path)
+            nonlocal success_count, failure_count, skipped_unmatched
+            for future in done_futures:
+                filing_info, output_path = future_to_task.pop(future)
                 try:
                     success = future.result(
-                    )  # Get result (True/False) from downloader
+                    )  # True/False from downloader, or the primary path of a full submission
+                    if success == DOWNLOAD_SKIPPED:
+                        # Full submission without a document of the wanted types
+                        skipped_unmatched += 1
+                        _record(filing_info, DOWNLOAD_SKIPPED)
+                        continue
+                    if isinstance(success, Path):
+                        output_path = success
                     if success:
                         success_count += 1
+                        _record(filing_info, DOWNLOAD_DONE, output_path)
                         logger.debug(
                             f"Download successful: {output_path.name}")
                     else:
                         failure_count += 1
+                        _record(filing_info, DOWNLOAD_FAILED)
                         logger.warning(
                             f"Download reported as failed for: {output_path.name}"
                         )
-
-                    # Log progress periodically
-                    if processed_count % 100 == 0 or processed_count == total_tasks:
-                        logger.info(
-                            f"Download progress: {processed_count}/{total_tasks} "
-                            f"(Success: {success_count}, Failed: {failure_count})"
-                        )
-
                 except Exception as exc:
                     logger.error(
                         f'Task for {output_path.name} generated an exception during future.result(): {exc}',
                         exc_info=True)
                     failure_count += 1
+                    _record(filing_info, DOWNLOAD_FAILED)
+
+                # Log progress periodically
+                processed_count = success_count + failure_count
+                if processed_count % 100 == 0:
+                    logger.info(
+                        f"Download progress: {processed_count}/{submitted} submitted "
+                        f"(Success: {success_count}, Failed: {failure_count})")
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=_num_threads) as executor:
+            future_to_task: Dict[concurrent.futures.Future, Tuple[Dict,
+                                                                   Path]] = {}
+
+            for filing_info in filings_to_process:
+                # Apply max_downloads limit *after* potential skipping
+                if max_downloads is not None and submitted >= max_downloads:
+                    logger.info(
+                        f"Reached max_downloads limit ({max_downloads}) for actual downloads. Stopping task preparation."
+                    )
+                    break
+
+                if full_submission:
+                    submit_cik = filing_info.get('cik')
+                    submit_acc_no = filing_info.get('accession_number')
+                    if not submit_cik or not submit_acc_no:
+                        prep_errors += 1
+                        if submit_acc_no:
+                            _record(filing_info, DOWNLOAD_SKIPPED)
+                        continue
+                    submit_output_dir = self.document_storage_dir / (
+                        f"{submit_cik}_{submit_acc_no.replace('-', '')}")
+                    if len(future_to_task) >= max_in_flight:
+                        done, _ = concurrent.futures.wait(
+                            future_to_task,
+                            return_when=concurrent.futures.FIRST_COMPLETED)
+                        _collect(done)
+                    future = executor.submit(self._download_submission,
+                                             submit_cik, submit_acc_no,
+                                             submit_output_dir)
+                    future_to_task[future] = (filing_info, submit_output_dir)
+                    submitted += 1
+                    continue
+
+                task_details, prep_status = self._prepare_download_task(
+                    filing_info, _target_forms)
+                if not task_details:
+                    prep_errors += 1
+                    if filing_info.get('accession_number'):
+                        _record(filing_info, prep_status)
+                    continue
+                # (cik, acc_no, filename, url, output_path)
+                submit_cik, submit_acc_no, submit_filename, submit_url, submit_output_path = task_details
+                if skip_existing and submit_output_path.exists():
+                    logger.debug(
+                        f"Skipping download, file exists: {submit_output_path}"
+                    )
+                    skipped_existing += 1
+                    # Already on disk (e.g. from before status tracking): record it
+                    _record(filing_info, DOWNLOAD_DONE, submit_output_path)
+                    continue
+
+                # Bound the work queued ahead of the download threads
+                if len(future_to_task) >= max_in_flight:
+                    done, _ = concurrent.futures.wait(
+                        future_to_task,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    _collect(done)
+
+                future = executor.submit(
+                    self.document_downloader.download,  # The method to call
+                    cik=submit_cik,
+                    accession_number=submit_acc_no,
+                    filename=submit_filename,
+                    output_path=submit_output_path)
+                future_to_task[future] = (filing_info, submit_output_path)
+                submitted += 1
+
+            _collect(list(concurrent.futures.as_completed(future_to_task)))
+        _flush_status_updates()
+
+        logger.info(f"Submitted {submitted} download tasks. "
+                    f"Skipped {skipped_existing} existing files and "
+                    f"{skipped_unmatched} submissions without matching documents. "
+                    f"Encountered {prep_errors} errors during preparation.")
+        if not submitted:
+            logger.info("No documents need downloading.")
 
+        failure_count += prep_errors
         logger.info(
             f"Document download finished. Success: {success_count}, Failed: {failure_count} (incl. prep errors)."
         )
@@ -1039,7 +1180,10 @@ class PipelineService:
     # --- End of Document Download ---
 
     def close(self):
-        """Clean up resources, like the database engine."""
-        if hasattr(self, 'engine') and self.engine:
+        """Clean up resources, like the database engine (only if they were built)."""
+        if 'filing_repo' in self.__dict__:
+            # Persist known accession numbers so the next run starts warm
+            self.filing_repo.save_accession_index()
+        if '_database' in self.__dict__:
             logger.info("Disposing database engine.")
             self.engine.dispose()
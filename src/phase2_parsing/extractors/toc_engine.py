@@ -0,0 +1,254 @@
+# src/phase2_parsing/extractors/toc_engine.py
+"""
+Single-pass Table of Contents engine behind ToCExtractor.extract().
+
+Collects the rendered text lines and the direct text of the common block
+tags in one walk over the parsed document, matches "PART I" / "ITEM 1A"
+headings with a linear-time tokenizer (same groups as
+ToCExtractor.ITEM_LINE_RE, without its polynomial backtracking on
+whitespace runs) and de-duplicates with sets and dicts.
+"""
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+logger = logging.getLogger(__name__)
+
+# Tags whose direct text is scanned (step 2), as in the original find_all list
+TAGS_TO_SCAN = frozenset({
+    'td', 'th', 'p', 'div', 'span', 'li', 'a', 'b', 'strong', 'font', 'h1',
+    'h2', 'h3', 'h4'
+})
+# Tag text is cut to this many characters before matching
+MAX_TAG_TEXT_CHARS = 500
+
+# Ids of a complete 10-K table of contents. Once all of them were found in
+# the rendered lines, the rest of the lines (the body repeating the same
+# headings further down) is not scanned.
+CANONICAL_10K_IDS = frozenset({
+    'parti', 'partii', 'partiii', 'partiv',
+    'item1', 'item_1a', 'item_1b', 'item_1c', 'item2', 'item3', 'item4',
+    'item5', 'item6', 'item7', 'item_7a', 'item8', 'item9', 'item_9a',
+    'item_9b', 'item_9c', 'item10', 'item11', 'item12', 'item13', 'item14',
+    'item15', 'item16'
+})
+
+# --- Heading tokenizer ---
+# The identifier part of ITEM_LINE_RE; only its last run (roman numeral or
+# item number) is ever shortened by backtracking
+_IDENTIFIER_RE = re.compile(
+    r'\s*(?P<id>PART\s+(?P<roman>[IVX]+)|ITEM\s+(?P<number>\d+)[A-Z]?)',
+    re.IGNORECASE)
+_SEPARATOR_CHARS = frozenset('.-—:')  # [\.\-\—:\s]
+_TITLE_PUNCTUATION = frozenset('()&/,-')  # [\w\(\)&/\,\-\s]
+_DASHES = frozenset('–—')
+
+
+def _is_title_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_' or ch.isspace() or ch in _TITLE_PUNCTUATION
+
+
+def _title_ends(text: str) -> Tuple[List[int], List[int]]:
+    """
+    Right-to-left tables over text:
+      next_end[i]: the smallest p >= i where a title may end, i.e. the rest
+        text[p:] up to a line end matches the optional page-number suffix
+        (?:\\s*(?:\\.{2,}|\\s{2,}|–|—)\\s*\\d{0,3}\\s*)?$ of ITEM_LINE_RE;
+      run_end[i]: the end of the run of title characters starting at i.
+    """
+    n = len(text)
+    size = n + 3
+    to_eol = [False] * size  # \s*$
+    digits = [False] * size  # \d{0,3}\s*$
+    after_mark = [False] * size  # \s*\d{0,3}\s*$
+    dots_tail = [False] * size  # \.*\s*\d{0,3}\s*$
+    suffix = [False] * size  # \s*(?:\.{2,}|\s{2,}|–|—)\s*\d{0,3}\s*$
+    next_end = [n] * (n + 1)
+    run_end = [n] * (n + 1)
+    for i in range(n, -1, -1):
+        ch = text[i] if i < n else ''
+        space = ch.isspace()
+        to_eol[i] = i == n or ch == '\n' or (space and to_eol[i + 1])
+        matched = to_eol[i]
+        j = i
+        while not matched and j < n and j - i < 3 and text[j].isdecimal():
+            j += 1
+            matched = to_eol[j]
+        digits[i] = matched
+        after_mark[i] = digits[i] or (space and after_mark[i + 1])
+        dots_tail[i] = after_mark[i] or (ch == '.' and dots_tail[i + 1])
+        suffix[i] = ((ch == '.' and i + 1 < n and text[i + 1] == '.'
+                      and dots_tail[i + 2])
+                     or (ch in _DASHES and after_mark[i + 1])
+                     or (space and i + 1 < n and text[i + 1].isspace()
+                         and after_mark[i + 2])
+                     or (space and suffix[i + 1]))
+        if i < n:
+            next_end[i] = i if ch == '\n' or suffix[i] else next_end[i + 1]
+            run_end[i] = run_end[i + 1] if _is_title_char(ch) else i
+    return next_end, run_end
+
+
+def match_heading(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Finds a "PART I" / "ITEM 1A" heading the way
+    ToCExtractor.ITEM_LINE_RE.search(text) does and returns its
+    (identifier, title) groups, or None.
+
+    Instead of backtracking through the lazy title and the optional
+    page-number suffix (polynomial in the length of whitespace runs), the
+    possible title ends are tabulated once, so each candidate identifier
+    and separator split is checked in constant time.
+    """
+    tables = None
+    tried = set()
+    line_start = 0
+    while line_start <= len(text):
+        match = _IDENTIFIER_RE.match(text, line_start)
+        if match and match.start('id') not in tried:
+            tried.add(match.start('id'))
+            if tables is None:
+                tables = _title_ends(text)
+            found = _split_heading(text, match, *tables)
+            if found:
+                return found
+        newline = text.find('\n', line_start)
+        if newline < 0:
+            break
+        line_start = newline + 1  # '^' (MULTILINE) matches after each newline
+    return None
+
+
+def _split_heading(text: str, match: 're.Match', next_end: List[int],
+                   run_end: List[int]) -> Optional[Tuple[str, str]]:
+    """Tries identifier ends (longest first), then separator lengths (longest first)."""
+    n = len(text)
+    id_start = match.start('id')
+    last_run = match.start('roman') if match.group('roman') else match.start('number')
+    for id_end in range(match.end('id'), last_run, -1):
+        separator_end = id_end
+        while separator_end < n and (text[separator_end] in _SEPARATOR_CHARS
+                                     or text[separator_end].isspace()):
+            separator_end += 1
+        for title_start in range(separator_end, id_end - 1, -1):
+            if title_start >= n or not _is_title_char(text[title_start]):
+                continue
+            title_end = next_end[title_start + 1]
+            if title_end <= run_end[title_start]:
+                return text[id_start:id_end], text[title_start:title_end]
+    return None
+
+
+# --- Engine ---
+class ToCEngine:
+    """
+    Extracts (title, level, id) ToC entries from a parsed document.
+
+    Same candidates, ordering and tie-breaking as the original two-scan
+    ToCExtractor (rendered text lines first, then the direct text of block
+    tags), but the document is walked once and each heading is tokenized
+    in linear time. With stop_early, the line scan ends once every
+    CANONICAL_10K_IDS entry has been found.
+    """
+
+    def __init__(self,
+                 section_id: Callable[[str], str],
+                 level: Callable[[str], int],
+                 stop_early: bool = True):
+        self.section_id = section_id
+        self.level = level
+        self.stop_early = stop_early
+
+    def extract(self, soup: BeautifulSoup) -> List[Tuple[str, int, str]]:
+        parser_used = getattr(soup.builder, 'NAME', 'unknown')
+        lines, tag_texts = self._collect(soup)
+
+        candidates: List[Dict[str, Any]] = []
+        candidate_keys: Set[Tuple[str, str, int]] = set()
+        processed_texts: Set[str] = set()
+        found_ids: Set[str] = set()
+
+        def process(text: str, offset: int) -> bool:
+            heading = match_heading(text)
+            if not heading:
+                return False
+            identifier, title = heading
+            title = title.strip()
+            if not title:
+                return False
+            sec_id = self.section_id(identifier)
+            key = (sec_id, title, self.level(identifier))
+            if key in candidate_keys:
+                return False
+            candidate_keys.add(key)
+            candidates.append({'id': sec_id, 'title': title, 'level': key[2],
+                               'offset': offset})
+            found_ids.add(sec_id)
+            return True
+
+        # 1) Rendered text lines
+        for idx, line in enumerate(lines):
+            line = line.strip()
+            if not line or line in processed_texts:
+                continue
+            if process(line, idx):
+                processed_texts.add(line)
+                if self.stop_early and CANONICAL_10K_IDS <= found_ids:
+                    logger.debug(f"ToC covered after line {idx} of {len(lines)}.")
+                    break
+
+        # 2) Direct text of block tags
+        for text, offset in tag_texts:
+            if text and text not in processed_texts and process(text, offset):
+                processed_texts.add(text)
+
+        # 3) One entry per id: earliest offset, then shortest title
+        best: Dict[str, Dict[str, Any]] = {}
+        for c in candidates:
+            current = best.get(c['id'])
+            if (current is None or c['offset'] < current['offset']
+                    or (c['offset'] == current['offset']
+                        and len(c['title']) < len(current['title']))):
+                best[c['id']] = c
+
+        # 4) Document order
+        toc_list = [(d['title'], d['level'], d['id'])
+                    for d in sorted(best.values(), key=lambda d: d['offset'])]
+
+        logger.info(
+            f"Extracted {len(toc_list)} unique TOC entries using BeautifulSoup ('{parser_used}')."
+        )
+        if not toc_list:
+            logger.warning(
+                f"No TOC entries extracted using BeautifulSoup ('{parser_used}')."
+            )
+        return toc_list
+
+    @staticmethod
+    def _collect(soup: BeautifulSoup) -> Tuple[List[str], List[Tuple[str, int]]]:
+        """
+        One walk over the tree: the get_text(separator='\\n') lines, and for
+        each scanned tag its direct text with its offset (source line when
+        the parser records it, else its position among the scanned tags).
+        """
+        string_types = getattr(soup, 'interesting_string_types', None) \
+            or Tag.MAIN_CONTENT_STRING_TYPES
+        if isinstance(string_types, type):
+            string_types = {string_types}
+        strings: List[str] = []
+        tag_texts: List[Tuple[str, int]] = []
+        position = 0
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                if type(node) in string_types:
+                    strings.append(node)
+            elif node.name in TAGS_TO_SCAN:
+                text = ' '.join(child.strip() for child in node.contents
+                                if isinstance(child, NavigableString)).strip()
+                offset = node.sourceline
+                tag_texts.append((text[:MAX_TAG_TEXT_CHARS],
+                                  position if offset is None else offset))
+                position += 1
+        return '\n'.join(strings).splitlines(), tag_texts
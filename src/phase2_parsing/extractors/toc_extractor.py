@@ -2,12 +2,13 @@
 """
 Table of Contents Extractor using BeautifulSoup on raw HTML.
 Uses the specific regex provided by the user and attempts parsing
-with 'html.parser', falling back to 'lxml' if the initial parse fails.
+with 'html.parser', falling back to 'lxml' if the initial parse fails,
+or works on a document already parsed by the caller (extract()).
 """
 import logging
 import re
 import warnings
-from typing import Any, Dict, List, Tuple, Optional
+from typing import List, Tuple, Optional
 
 # --- Try importing lxml ---
 LXML_AVAILABLE = False
@@ -22,6 +23,8 @@ except ImportError:
 # but a general Exception might suffice for parser failures.
 from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
 
+from src.phase2_parsing.extractors.toc_engine import ToCEngine
+
 # --- Setup Logging ---
 logger = logging.getLogger(__name__)
 
@@ -78,19 +81,16 @@ class ToCExtractor:
         Parses raw HTML with BeautifulSoup, trying 'html.parser' first,
         then 'lxml' as a fallback, and extracts potential TOC entries.
         """
-        candidates: List[Dict[str, Any]] = []
         if not html:
             logger.warning("No HTML content provided for TOC extraction.")
             return []
 
         soup: Optional[BeautifulSoup] = None
-        parser_used: Optional[str] = None
 
         # --- Attempt 1: html.parser ---
         try:
             logger.debug("Attempting to parse HTML using 'html.parser'...")
             soup = BeautifulSoup(html, 'html.parser')
-            parser_used = 'html.parser'
             logger.debug("Successfully parsed HTML using 'html.parser'.")
         except Exception as e_html:
             logger.warning(
@@ -100,7 +100,6 @@ class ToCExtractor:
             if LXML_AVAILABLE:
                 try:
                     soup = BeautifulSoup(html, 'lxml')
-                    parser_used = 'lxml'
                     logger.info(
                         "Successfully parsed HTML using fallback 'lxml'."
                     )  # Log success with lxml
@@ -121,112 +120,15 @@ class ToCExtractor:
             logger.error("HTML could not be parsed by any available parser.")
             return []
 
-        processed_texts = set()
-
-        # Function to process a potential match
-        def process_match(m, offset):
-            if m:
-                identifier_group = m.group(1)
-                title_group = m.group('title')
-                if identifier_group and title_group:
-                    level = self._get_level_from_match(identifier_group)
-                    title = title_group.strip()
-                    if not title: return False  # Skip empty titles
-                    sec_id = sanitize_for_section_id(identifier_group)
-                    # Check if this exact combination already exists to avoid duplicates from different methods
-                    # Using a tuple of key elements as the check
-                    candidate_key = (sec_id, title, level)
-                    # Simple check based on key, could be refined if needed
-                    if candidate_key not in [(c['id'], c['title'], c['level'])
-                                             for c in candidates]:
-                        candidates.append({
-                            'id': sec_id,
-                            'title': title,
-                            'level': level,
-                            'offset': offset
-                        })
-                        return True
-            return False
-
-        # 1) Scan rendered text lines
-        try:
-            all_text = soup.get_text(separator='\n')
-            for idx, line in enumerate(all_text.splitlines()):
-                line = line.strip()
-                if not line or line in processed_texts: continue
-                match = self.ITEM_LINE_RE.search(line)  # Use search
-                if process_match(match, idx):
-                    processed_texts.add(
-                        line
-                    )  # Add raw line to prevent re-processing same text block
-        except Exception as e:
-            logger.warning(f"Error processing soup.get_text() lines: {e}")
-
-        # 2) Scan common block tags
-        try:
-            tags_to_scan = [
-                'td', 'th', 'p', 'div', 'span', 'li', 'a', 'b', 'strong',
-                'font', 'h1', 'h2', 'h3', 'h4'
-            ]
-            for tag in soup.find_all(tags_to_scan):
-                # Get text only from the direct tag, avoiding nested tags repeating text
-                # Use find_all(text=True, recursive=False) and join
-                direct_text_parts = tag.find_all(text=True, recursive=False)
-                text = ' '.join(part.strip()
-                                for part in direct_text_parts).strip()
-
-                # Fallback: If no direct text, get text from immediate children only
-                if not text and tag.contents:
-                    text = ' '.join(
-                        str(c).strip() for c in tag.contents
-                        if isinstance(c, str)).strip()
-
-                # Limit length check
-                text = text[:500]
-
-                if not text or text in processed_texts: continue
-
-                offset = getattr(tag, 'sourceline',
-                                 float('inf'))  # Use inf as default offset
-                match = self.ITEM_LINE_RE.search(text)  # Use search
-                if process_match(match, offset):
-                    processed_texts.add(text)  # Add unique text content found
-        except Exception as e:
-            logger.warning(f"Error processing block tags: {e}")
-
-        # 3) De-duplicate by id, keeping the earliest offset
-        best: Dict[str, Dict[str, Any]] = {}
-        for c in candidates:
-            # Ensure essential keys exist
-            if not c.get('id') or not c.get('title') or 'level' not in c:
-                logger.debug(
-                    f"Skipping candidate due to missing key fields: {c}")
-                continue
-
-            current_id = c['id']
-            current_offset = c.get(
-                'offset', float('inf'))  # Handle potential missing offset
-
-            if current_id not in best or current_offset < best[current_id].get(
-                    'offset', float('inf')):
-                best[current_id] = c
-            # Refined tie-breaking: if same offset, prefer shorter title (less likely to have page numbers etc.)
-            elif current_offset == best[current_id].get(
-                    'offset', float('inf')):
-                if len(c['title']) < len(best[current_id].get('title', '')):
-                    best[current_id] = c
-
-        # 4) Convert to final list and sort by original offset
-        toc_list = sorted([(d['title'], d['level'], d['id'])
-                           for d in best.values()],
-                          key=lambda x: best[x[2]].get('offset', float('inf'))
-                          )  # Sort using offset from 'best' dict
-
-        logger.info(
-            f"Extracted {len(toc_list)} unique TOC entries using BeautifulSoup ('{parser_used}')."
-        )
-        if not toc_list:
-            logger.warning(
-                f"No TOC entries extracted using BeautifulSoup ('{parser_used}')."
-            )
-        return toc_list
+        return self.extract(soup)
+
+    def extract(self, soup: BeautifulSoup) -> List[Tuple[str, int, str]]:
+        """
+        Extracts potential TOC entries from an already parsed document (e.g.
+        the shared FilingDocument.soup), so the HTML isn't parsed again.
+        Tags are placed by source line when the parser records it
+        ('html.parser'), else by their position in document order ('lxml').
+        The single-pass scan itself lives in ToCEngine.
+        """
+        engine = ToCEngine(sanitize_for_section_id, self._get_level_from_match)
+        return engine.extract(soup)
@@ -573,7 +573,7 @@ class SecParserNodeBuilder(AbstractNodeBuilder):
                         if hasattr(html_tag_wrapper, actual_bs4_tag_attribute):
                             bs4_tag = getattr(html_tag_wrapper,
                                               actual_bs4_tag_attribute)
-                            html_string = str(bs4_tag)  # Get the HTML string
+                            html_string = html_tag_wrapper.get_source_code()  # Memoized str(bs4_tag)
 
                             # Wrap HTML string in StringIO for pandas < 2.1 compatibility if needed
                             # For pandas >= 2.1, you can often pass the string directly
@@ -682,16 +682,9 @@ class SecParserNodeBuilder(AbstractNodeBuilder):
                         f"Error trying to extract ProcessingLog data using get_items(): {log_e}"
                     )
 
-            # Prepare bs4 tag info for metadata =
+            # Tag info for metadata, through HtmlTag's memoized accessors
+            # (elements restored from the sec-parser cache have no bs4 tree yet)
             html_tag_wrapper_for_meta = getattr(element, 'html_tag', None)
-            bs4_tag_for_meta = None
-            if html_tag_wrapper_for_meta:
-                actual_bs4_tag_attribute_for_meta = '_bs4'
-                if hasattr(html_tag_wrapper_for_meta,
-                           actual_bs4_tag_attribute_for_meta):
-                    bs4_tag_for_meta = getattr(
-                        html_tag_wrapper_for_meta,
-                        actual_bs4_tag_attribute_for_meta)
 
             sec_metadata = SecParserMetadata(
                 element_type=type(element).__name__,
@@ -700,10 +693,10 @@ class SecParserNodeBuilder(AbstractNodeBuilder):
                 text_md5=getattr(element, 'md5_hash', None),
                 char_count=len(element.text)
                 if hasattr(element, 'text') else 0,
-                source_html_tag_type=bs4_tag_for_meta.name
-                if bs4_tag_for_meta else None,
-                source_html_tag_hash=str(hash(str(bs4_tag_for_meta)))
-                if bs4_tag_for_meta else None,
+                source_html_tag_type=html_tag_wrapper_for_meta.name
+                if html_tag_wrapper_for_meta else None,
+                source_html_tag_hash=str(hash(html_tag_wrapper_for_meta.get_source_code()))
+                if html_tag_wrapper_for_meta else None,
                 source_html_visible_text_hash=str(hash(element.text))
                 if hasattr(element, 'text') and element.text else None,
                 processing_log=log_data,  # Use the (hopefully) populated list
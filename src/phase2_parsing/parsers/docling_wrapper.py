@@ -121,10 +121,13 @@ class DoclingWrapper:
         Path,  # Expecting path to actual file to be processed (HTML or PDF)
         pipeline_cls: Optional[Type['BasePipeline']] = None,
         backend_cls: Optional[
-            Type['AbstractDocumentBackend']] = None  # The CLASS to use
+            Type['AbstractDocumentBackend']] = None,  # The CLASS to use
+        content: Optional[bytes] = None
     ) -> Optional['DoclingDocument']:
         """
         Parses a document using Docling, using the specified backend class.
+        Pass content (e.g. FilingDocument.raw_bytes) when the file has already
+        been read, to skip reading input_path again.
         """
         # Check essential types availability using the direct import name
         if not self.converter or not ESSENTIAL_TYPES_AVAILABLE or not InputFormat or not InputDocument:
@@ -133,7 +136,7 @@ class DoclingWrapper:
             )
             return None
 
-        if not input_path.exists():
+        if content is None and not input_path.exists():
             logger.error(f"Input file not found: {input_path}")
             return None
 
@@ -184,10 +187,11 @@ class DoclingWrapper:
         # ----------------------------------------------------------------------
         try:
             # Read file content into BytesIO
-            file_content: Optional[bytes] = None
+            file_content: Optional[bytes] = content
             try:
-                with open(input_path, "rb") as f:
-                    file_content = f.read()
+                if file_content is None:
+                    with open(input_path, "rb") as f:
+                        file_content = f.read()
             except Exception as read_err:
                 logger.error(
                     f"Failed to read file content from {input_path}: {read_err}",
@@ -0,0 +1,282 @@
+# src/phase2_parsing/parsers/element_cache.py
+"""
+Persistent cache of sec-parser's semantic elements.
+
+sec-parser's output depends only on the HTML it is given and on the parser
+(class and installed version), so it is stored per filing under the SHA-256
+of the HTML. Each element is kept as its class, the source code and text of
+its tag, its processing log and any other instance state (level,
+section_type, style...) in gzipped JSON, without bs4 objects. Loading
+rebuilds the element objects; their tags answer .text and
+get_source_code() from the cache and only re-parse the HTML fragment when
+something needs the bs4 tree (e.g. table_to_markdown()).
+"""
+import dataclasses
+import gzip
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import time
+import warnings
+from importlib.metadata import PackageNotFoundError, version as package_version
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup, Tag, XMLParsedAsHTMLWarning
+
+# --- Try importing sec-parser ---
+SEC_PARSER_AVAILABLE = False
+try:
+    from sec_parser.processing_engine.html_tag import HtmlTag
+    from sec_parser.processing_engine.processing_log import ProcessingLog
+    from sec_parser.semantic_elements.abstract_semantic_element import AbstractSemanticElement
+    SEC_PARSER_AVAILABLE = True
+except ImportError:
+    HtmlTag = object  # Base class placeholder; the cache is disabled
+    ProcessingLog = AbstractSemanticElement = None
+
+from src.phase2_parsing.parsers.html_document import DEFAULT_PARSER_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the stored layout changes (part of the cache file names)
+CACHE_FORMAT_VERSION = 1
+
+# Classes are only restored from sec-parser's modules, plus these builtin
+# exception types (ErrorWhileProcessingElement.error): the file names the
+# class, and importing or calling arbitrary objects from it is not acceptable
+RESTORABLE_MODULE_PREFIXES = ('sec_parser.',)
+RESTORABLE_BUILTIN_EXCEPTIONS = frozenset({
+    'Exception', 'ArithmeticError', 'AssertionError', 'AttributeError',
+    'IndexError', 'KeyError', 'LookupError', 'NotImplementedError',
+    'RecursionError', 'RuntimeError', 'TypeError', 'ValueError',
+    'ZeroDivisionError'
+})
+
+_TAG_NAME_RE = re.compile(r'<\s*([^\s/>]+)')
+
+
+class UncacheableElementError(ValueError):
+    """An element holds state the cache can't serialize; the filing isn't cached."""
+
+
+def sec_parser_version() -> str:
+    try:
+        return package_version('sec-parser')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+# --- Tags restored from the cache ---
+class CachedHtmlTag(HtmlTag):
+    """
+    HtmlTag rebuilt from its cached source code and text. The bs4 tag is
+    parsed from the source code the first time it is used.
+    """
+
+    _PLACEHOLDER = Tag(name='span')
+
+    def __init__(self, source_code: str, text: str):
+        super().__init__(self._PLACEHOLDER)  # Sets ._bs4 (see the setter)
+        self._lazy_tag: Optional[Tag] = None
+        self._source_code = source_code
+        self._text = text
+
+    @property
+    def _bs4(self) -> Tag:
+        if self._lazy_tag is None:
+            self._lazy_tag = _parse_fragment(self._source_code)
+        return self._lazy_tag
+
+    @_bs4.setter
+    def _bs4(self, tag: Tag) -> None:
+        self._lazy_tag = tag
+
+    @property
+    def name(self) -> str:
+        if self._lazy_tag is None:
+            match = _TAG_NAME_RE.match(self._source_code)
+            if match:
+                return match.group(1).lower()
+        return self._bs4.name.lower()
+
+
+def _parse_fragment(source_code: str) -> Tag:
+    """
+    Parses one element's source code back into its tag. lxml round-trips
+    the tags it produced itself; anything it restructures (or wraps in
+    several nodes) is re-parsed with html.parser, which doesn't.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+        soup = BeautifulSoup(source_code, DEFAULT_PARSER_BACKEND)
+        root = soup.body or soup
+        if len(root.contents) == 1 and isinstance(root.contents[0], Tag):
+            return root.contents[0]
+        return BeautifulSoup(source_code, 'html.parser').find()
+
+
+# --- Encoding ---
+def _class_path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_class(path: str, base: Optional[type] = None) -> type:
+    """
+    Resolves a stored "module:qualname" to a class, refusing anything outside
+    RESTORABLE_MODULE_PREFIXES / RESTORABLE_BUILTIN_EXCEPTIONS, anything that
+    isn't a class and (with base) classes not derived from base.
+    """
+    module_name, _, qualname = path.partition(':')
+    if module_name == 'builtins':
+        allowed = qualname in RESTORABLE_BUILTIN_EXCEPTIONS
+    else:
+        allowed = module_name.startswith(RESTORABLE_MODULE_PREFIXES)
+    if not allowed:
+        raise ValueError(f"Refusing to restore {path} from the element cache")
+    obj: Any = importlib.import_module(module_name)
+    for part in qualname.split('.'):
+        obj = getattr(obj, part)
+    if not isinstance(obj, type) or (base is not None and not issubclass(obj, base)):
+        raise ValueError(f"Refusing to restore {path} from the element cache")
+    return obj
+
+
+def _encode_value(value: Any) -> Any:
+    """Instance state -> JSON (tagged dicts for dataclasses, elements and errors)."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, AbstractSemanticElement):
+        return {'element': encode_element(value)}
+    if isinstance(value, (list, tuple)):
+        items = [_encode_value(item) for item in value]
+        return {'tuple': items} if isinstance(value, tuple) else items
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {'dataclass': _class_path(type(value)),
+                'fields': {f.name: _encode_value(getattr(value, f.name))
+                           for f in dataclasses.fields(value)}}
+    if isinstance(value, BaseException):
+        return {'exception': _class_path(type(value)), 'message': str(value)}
+    raise UncacheableElementError(f"Can't cache a {type(value).__name__} value")
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if 'element' in value:
+        return decode_element(value['element'])
+    if 'tuple' in value:
+        return tuple(_decode_value(item) for item in value['tuple'])
+    if 'dataclass' in value:
+        cls = _load_class(value['dataclass'])
+        if not dataclasses.is_dataclass(cls):
+            raise ValueError(f"{value['dataclass']} is not a dataclass")
+        return cls(**{k: _decode_value(v) for k, v in value['fields'].items()})
+    if 'exception' in value:
+        return _load_class(value['exception'], BaseException)(value['message'])
+    raise ValueError(f"Unknown cached value {sorted(value)}")
+
+
+def encode_element(element: Any) -> Dict[str, Any]:
+    """One semantic element -> a JSON-serializable dict."""
+    html_tag = element.html_tag
+    state = {}
+    for attr, value in vars(element).items():
+        if attr not in ('_html_tag', 'processing_log'):
+            state[attr] = _encode_value(value)
+    return {
+        'type': _class_path(type(element)),
+        'html': html_tag.get_source_code(),
+        'text': html_tag.text,
+        'log': [[item.origin, item.payload]
+                for item in element.processing_log.get_items()],
+        'state': state,
+    }
+
+
+def decode_element(data: Dict[str, Any]) -> Any:
+    """
+    Rebuilds an element without running its __init__ (which differs per
+    class and re-logs the classification); the state is restored as stored.
+    """
+    cls = _load_class(data['type'], AbstractSemanticElement)
+    element = cls.__new__(cls)
+    processing_log = ProcessingLog()
+    for origin, payload in data['log']:
+        processing_log.add_item(message=payload, log_origin=origin)
+    element.__dict__.update(
+        {attr: _decode_value(value) for attr, value in data['state'].items()})
+    element._html_tag = CachedHtmlTag(data['html'], data['text'])
+    element.processing_log = processing_log
+    return element
+
+
+# --- Cache ---
+class SemanticElementCache:
+    """
+    sec-parser output per (HTML content, parser class, sec-parser version),
+    stored as <cache_dir>/<parser>-<version>/<sha256>.v<format>.json.gz.
+    Other parsers or versions never see each other's entries; directories of
+    versions no longer installed can be deleted.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.version = sec_parser_version()
+
+    def path_for(self, html_bytes: bytes, parser: Any) -> Path:
+        digest = hashlib.sha256(html_bytes).hexdigest()
+        namespace = f"{type(parser).__name__}-{self.version}"
+        return self.cache_dir / namespace / f"{digest}.v{CACHE_FORMAT_VERSION}.json.gz"
+
+    def load(self, path: Path) -> Optional[List[Any]]:
+        """The cached elements, or None on a miss or an unreadable entry."""
+        if not SEC_PARSER_AVAILABLE or not path.exists():
+            return None
+        started = time.monotonic()
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+            elements = [decode_element(data) for data in payload['elements']]
+        except (OSError, EOFError, ValueError, KeyError, TypeError,
+                AttributeError, ImportError) as e:
+            logger.warning(f"Ignoring unreadable sec-parser cache entry {path.name}: {e}")
+            return None
+        logger.info(f"Loaded {len(elements)} cached sec-parser elements from "
+                    f"{path.name} in {time.monotonic() - started:.2f}s")
+        return elements
+
+    def store(self, path: Path, elements: List[Any]) -> bool:
+        """Writes the elements (atomically); returns False if they can't be cached."""
+        if not SEC_PARSER_AVAILABLE:
+            return False
+        try:
+            payload = {
+                'format': CACHE_FORMAT_VERSION,
+                'sec_parser_version': self.version,
+                'elements': [encode_element(element) for element in elements],
+            }
+            data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        except (UncacheableElementError, TypeError, ValueError) as e:
+            logger.warning(f"Not caching sec-parser output for {path.name}: {e}")
+            return False
+
+        part_path = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(part_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(data)
+            part_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write sec-parser cache entry {path.name}: {e}")
+            return False
+        finally:
+            part_path.unlink(missing_ok=True)
+        logger.debug(f"Cached {len(elements)} sec-parser elements in {path.name} "
+                     f"({path.stat().st_size / 2**10:.0f} KB)")
+        return True
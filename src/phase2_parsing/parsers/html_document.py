@@ -0,0 +1,110 @@
+# src/phase2_parsing/parsers/html_document.py
+"""
+One filing's HTML, read and parsed once per filing and shared by the
+phase-2 stages (ToC extraction, sec-parser, Docling) instead of each stage
+re-reading the file or re-parsing the string.
+"""
+import logging
+import warnings
+from functools import cached_property
+from pathlib import Path
+from typing import Any, List, Optional
+
+from bs4 import BeautifulSoup, NavigableString, XMLParsedAsHTMLWarning
+
+# --- Try importing lxml ---
+LXML_AVAILABLE = False
+try:
+    import lxml
+    LXML_AVAILABLE = True
+except ImportError:
+    pass  # Falls back to 'html.parser'
+
+# --- sec-parser tag wrapper (only needed to hand it the shared tree) ---
+HTML_TAG_AVAILABLE = False
+try:
+    from sec_parser.processing_engine.html_tag import HtmlTag
+    HTML_TAG_AVAILABLE = True
+except ImportError:
+    HtmlTag = None
+
+logger = logging.getLogger(__name__)
+
+# Same backend sec-parser uses by default, so its input tree is unchanged
+DEFAULT_PARSER_BACKEND = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+ENCODINGS_TO_TRY = ['utf-8', 'latin-1', 'iso-8859-1', 'windows-1252']
+
+
+class FilingDocument:
+    """
+    A filing's raw bytes, decoded text and (lazily) its BeautifulSoup tree.
+
+    The tree is built on first access to .soup and reused by every stage
+    that reads HTML. sec-parser restructures the tags it classifies (it
+    moves merged elements under new parents), so read-only consumers such as
+    ToCExtractor must use .soup before parse_semantic_elements() is called.
+    """
+
+    def __init__(self,
+                 html: str,
+                 raw_bytes: Optional[bytes] = None,
+                 source: Optional[Path] = None,
+                 parser_backend: str = DEFAULT_PARSER_BACKEND):
+        self.html = html
+        self.raw_bytes = raw_bytes
+        self.source = source
+        self.parser_backend = parser_backend
+
+    @classmethod
+    def from_path(cls, path: Path, **kwargs) -> "FilingDocument":
+        """
+        Reads a file once and decodes it with the first encoding that works
+        (newlines normalized as in text mode).
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If none of ENCODINGS_TO_TRY can decode it.
+        """
+        raw_bytes = path.read_bytes()
+        for encoding in ENCODINGS_TO_TRY:
+            try:
+                html = raw_bytes.decode(encoding)
+            except UnicodeDecodeError:
+                logger.debug(
+                    f"Encoding {encoding} failed for {path.name}, trying next...")
+                continue
+            logger.debug(f"Successfully read {path.name} with encoding {encoding}")
+            html = html.replace('\r\n', '\n').replace('\r', '\n')
+            return cls(html, raw_bytes=raw_bytes, source=path, **kwargs)
+        raise ValueError(
+            f"Could not decode {path.name} with encodings {ENCODINGS_TO_TRY}")
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        """The parsed document (built once, on first access)."""
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+            return BeautifulSoup(self.html, self.parser_backend)
+
+    def root_tags(self) -> List[Any]:
+        """The body's top-level tags wrapped for sec-parser (as its HtmlTagParser does)."""
+        root = self.soup
+        if root.html:
+            root = root.html
+            root = root.body if root.body else root
+        return [
+            HtmlTag(child) for child in root.children
+            if not (isinstance(child, NavigableString) and not child.strip())
+        ]
+
+    def parse_semantic_elements(self, sec_parser_instance: Any) -> List[Any]:
+        """
+        Runs sec-parser on the shared tree when it supports parse_from_tags
+        (and the tree is non-empty); otherwise lets it parse the HTML string.
+        """
+        if HTML_TAG_AVAILABLE and hasattr(sec_parser_instance, 'parse_from_tags'):
+            root_tags = self.root_tags()
+            if root_tags:
+                return sec_parser_instance.parse_from_tags(root_tags)
+        return sec_parser_instance.parse(self.html)
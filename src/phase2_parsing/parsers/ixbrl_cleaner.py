@@ -0,0 +1,361 @@
+# src/phase2_parsing/parsers/ixbrl_cleaner.py
+"""
+Streaming pre-clean of (inline XBRL) filing HTML before phase-2 parsing.
+
+Inline-XBRL 10-Ks carry a hidden <ix:header> (contexts, units, hidden
+facts), display:none blocks, long inline styles and base64 images that
+BeautifulSoup and sec-parser would otherwise tokenize. IXBRLCleaner drops
+them in one streaming pass and keeps the ix: facts aside; CleanHTMLCache
+stores the compact HTML and the facts next to the original, keyed by its
+content hash, so each filing is cleaned once.
+"""
+import hashlib
+import html
+import json
+import logging
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the cleaning rules change (part of the cache file names)
+CLEANER_VERSION = 1
+
+ENCODINGS_TO_TRY = ['utf-8', 'latin-1', 'iso-8859-1', 'windows-1252']
+READ_CHUNK_CHARS = 1 << 20
+
+# Elements dropped with everything inside them
+DROPPED_ELEMENTS = frozenset({'ix:header', 'script', 'style', 'noscript', 'template'})
+# Elements dropped on their own (they have no content)
+DROPPED_VOID_ELEMENTS = frozenset({'meta', 'link', 'base'})
+# Never dropped when hidden: removing cells or rows breaks the table grid
+# (sec-parser's table metrics expect every row to have a cell)
+TABLE_ELEMENTS = frozenset({
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'col', 'colgroup', 'caption'
+})
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+})
+# Attributes kept (everything else, e.g. class or the ix: contextref/name,
+# is dropped; the facts keep the ix: attributes that matter)
+KEPT_ATTRIBUTES = frozenset({'style', 'id', 'name', 'href', 'colspan', 'rowspan', 'src', 'alt'})
+# The only style properties sec-parser reads (TextStyle: bold, italic,
+# centered, underline); kept verbatim so its classification is unchanged
+KEPT_STYLE_PROPERTIES = frozenset({'font-weight', 'font-style', 'text-align', 'text-decoration'})
+
+FACT_ELEMENTS = frozenset({'ix:nonnumeric', 'ix:nonfraction'})
+# ix: attribute -> key in the facts sidecar
+FACT_ATTRIBUTES = {
+    'name': 'name',
+    'contextref': 'context',
+    'unitref': 'unit',
+    'decimals': 'decimals',
+    'scale': 'scale',
+    'format': 'format',
+    'sign': 'sign',
+    'id': 'id',
+}
+
+_DISPLAY_NONE_RE = re.compile(r'(?:^|;)\s*display\s*:\s*none\b', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+# Only collapsed when a text node is nothing else (&nbsp; is content)
+_ASCII_WHITESPACE_RE = re.compile(r'[ \t\n\r\f]+')
+
+
+class IXBRLCleaner(HTMLParser):
+    """
+    feed() it HTML text in chunks of any size; the compact HTML goes to
+    write() as it is produced and the ix:nonNumeric / ix:nonFraction facts
+    (including the hidden ones) are collected in .facts.
+
+    Text content, the element structure of the visible document and the
+    style properties sec-parser reads are preserved; hidden subtrees,
+    scripts, comments, other attributes and styles and data: image URIs
+    are not. Whitespace-only text between tags is reduced to one character.
+    """
+
+    def __init__(self, write: Callable[[str], Any]):
+        super().__init__(convert_charrefs=True)
+        self._write = write
+        self.facts: List[Dict[str, Any]] = []
+        self.chars_out = 0
+        # Hidden subtree being dropped: its element name and nesting depth
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        # Facts whose text is being collected (nested facts all collect)
+        self._open_facts: List[Tuple[str, Dict[str, Any], Optional[List[str]]]] = []
+        self._exclude_depth = 0
+
+    # --- Output ---
+    def _emit(self, text: str) -> None:
+        self.chars_out += len(text)
+        self._write(text)
+
+    def _start_tag_text(self, tag: str, attrs: List[Tuple[str, Optional[str]]],
+                        self_closing: bool) -> str:
+        parts = [tag]
+        for attr, value in attrs:
+            if attr not in KEPT_ATTRIBUTES or value is None:
+                continue
+            if attr == 'style':
+                value = _filter_style(value)
+                if not value:
+                    continue
+            elif attr == 'src' and value.lstrip().lower().startswith('data:'):
+                continue  # Inline (base64) image payload
+            parts.append(f'{attr}="{html.escape(value, quote=True)}"')
+        return f"<{' '.join(parts)}{'/' if self_closing else ''}>"
+
+    # --- Facts ---
+    def _open_fact(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        fact: Dict[str, Any] = {
+            key: attributes[attr]
+            for attr, key in FACT_ATTRIBUTES.items() if attributes.get(attr)
+        }
+        if self._skip_tag is not None:
+            fact['hidden'] = True
+        if (attributes.get('xsi:nil') or '').lower() == 'true':
+            fact['nil'] = True
+        if tag == 'ix:nonnumeric' and (attributes.get('escape') or '').lower() == 'true':
+            # Text block (a whole note): its content stays in the HTML
+            fact['text_block'] = True
+        self.facts.append(fact)
+        self._open_facts.append((tag, fact, None if fact.get('text_block') else []))
+
+    def _close_fact(self, tag: str) -> None:
+        for i in range(len(self._open_facts) - 1, -1, -1):
+            if self._open_facts[i][0] == tag:
+                _, fact, parts = self._open_facts.pop(i)
+                if parts is not None:
+                    fact['value'] = _WHITESPACE_RE.sub(' ', ''.join(parts)).strip()
+                return
+
+    # --- HTMLParser callbacks ---
+    def handle_starttag(self, tag, attrs):
+        if tag in FACT_ELEMENTS:
+            self._open_fact(tag, attrs)
+        elif tag == 'ix:exclude':
+            self._exclude_depth += 1
+
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in DROPPED_VOID_ELEMENTS:
+            return
+        if tag in DROPPED_ELEMENTS or (tag not in TABLE_ELEMENTS and _is_hidden(attrs)):
+            if tag not in VOID_ELEMENTS:
+                self._skip_tag, self._skip_depth = tag, 1
+            return
+        self._emit(self._start_tag_text(tag, attrs, self_closing=False))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in FACT_ELEMENTS:
+            self._open_fact(tag, attrs)
+            self._close_fact(tag)
+        if (self._skip_tag is not None or tag in DROPPED_ELEMENTS
+                or tag in DROPPED_VOID_ELEMENTS
+                or (tag not in TABLE_ELEMENTS and _is_hidden(attrs))):
+            return
+        self._emit(self._start_tag_text(tag, attrs, self_closing=True))
+
+    def handle_endtag(self, tag):
+        if tag in FACT_ELEMENTS:
+            self._close_fact(tag)
+        elif tag == 'ix:exclude' and self._exclude_depth:
+            self._exclude_depth -= 1
+
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag in DROPPED_VOID_ELEMENTS or tag in DROPPED_ELEMENTS:
+            return
+        self._emit(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self._open_facts and not self._exclude_depth:
+            for _, _, parts in self._open_facts:
+                if parts is not None:
+                    parts.append(data)
+        if self._skip_tag is not None:
+            return
+        if _ASCII_WHITESPACE_RE.fullmatch(data):
+            data = '\n' if '\n' in data else ' '
+        self._emit(html.escape(data, quote=False))
+
+    # Comments, doctype, <?xml ...?> and CDATA sections are dropped
+    def handle_comment(self, data):
+        pass
+
+    def handle_decl(self, decl):
+        pass
+
+    def handle_pi(self, data):
+        pass
+
+    def unknown_decl(self, data):
+        pass
+
+    def close(self) -> None:
+        super().close()
+        while self._open_facts:  # Unclosed fact elements
+            self._close_fact(self._open_facts[-1][0])
+
+    def dei_facts(self) -> Dict[str, str]:
+        """Document and entity information (dei:) facts by local name (first value wins)."""
+        dei: Dict[str, str] = {}
+        for fact in self.facts:
+            name = fact.get('name', '')
+            if name.startswith('dei:') and 'value' in fact:
+                dei.setdefault(name[4:], fact['value'])
+        return dei
+
+
+def _filter_style(style: str) -> str:
+    """Keeps the KEPT_STYLE_PROPERTIES declarations (split the way sec-parser splits them)."""
+    kept = []
+    for declaration in style.split(';'):
+        if ':' in declaration:
+            prop, value = declaration.split(':', 1)
+            if prop.strip().lower() in KEPT_STYLE_PROPERTIES:
+                kept.append(f"{prop.strip()}:{value.strip()}")
+    return ';'.join(kept)
+
+
+def _is_hidden(attrs: List[Tuple[str, Optional[str]]]) -> bool:
+    for attr, value in attrs:
+        if attr == 'style' and value and _DISPLAY_NONE_RE.search(value):
+            return True
+    return False
+
+
+def clean_html_file(source: Path, target: Path) -> IXBRLCleaner:
+    """
+    Streams source through an IXBRLCleaner into target (UTF-8), decoding
+    with the first of ENCODINGS_TO_TRY that works (newlines normalized as
+    in text mode). Returns the cleaner, holding the facts.
+
+    Raises:
+        OSError: If source can't be read or target can't be written.
+        ValueError: If none of the encodings can decode source.
+    """
+    for encoding in ENCODINGS_TO_TRY:
+        try:
+            with open(source, 'r', encoding=encoding) as src, \
+                    open(target, 'w', encoding='utf-8') as out:
+                cleaner = IXBRLCleaner(out.write)
+                while True:
+                    chunk = src.read(READ_CHUNK_CHARS)
+                    if not chunk:
+                        break
+                    cleaner.feed(chunk)
+                cleaner.close()
+            return cleaner
+        except UnicodeDecodeError:
+            logger.debug(f"Encoding {encoding} failed for {source.name}, trying next...")
+    raise ValueError(f"Could not decode {source.name} with encodings {ENCODINGS_TO_TRY}")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CleanHTMLCache:
+    """
+    Clean copies of filing HTML, stored in cache_dir (default: next to the
+    original) as <stem>.<sha256 prefix>.clean<version>.htm with the facts in
+    <stem>.<sha256 prefix>.facts<version>.json. A changed original (or
+    cleaner version) gets a new name; the outdated copies are removed.
+    Originals with the same name in different directories share cache_dir,
+    so the facts sidecar records the original's full path and only copies
+    made from the same original are ever removed.
+    """
+
+    HASH_PREFIX_CHARS = 16
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _dir_for(self, html_path: Path) -> Path:
+        return self.cache_dir if self.cache_dir is not None else html_path.parent
+
+    def paths_for(self, html_path: Path, digest: str) -> Tuple[Path, Path]:
+        key = f"{html_path.stem}.{digest[:self.HASH_PREFIX_CHARS]}"
+        directory = self._dir_for(html_path)
+        return (directory / f"{key}.clean{CLEANER_VERSION}.htm",
+                directory / f"{key}.facts{CLEANER_VERSION}.json")
+
+    def get(self, html_path: Path) -> Path:
+        """
+        Returns the clean copy of html_path, creating it (and the facts
+        sidecar) if there is none for the current content.
+
+        Raises:
+            OSError: If the original can't be read or the copy written.
+            ValueError: If the original can't be decoded.
+        """
+        digest = file_sha256(html_path)
+        clean_path, facts_path = self.paths_for(html_path, digest)
+        if clean_path.exists():
+            logger.debug(f"Using cached clean HTML {clean_path.name}")
+            return clean_path
+
+        part_path = clean_path.with_name(clean_path.name + '.part')
+        try:
+            cleaner = clean_html_file(html_path, part_path)
+            facts_doc = {
+                'source': str(html_path.resolve()),
+                'sha256': digest,
+                'cleaner_version': CLEANER_VERSION,
+                'dei': cleaner.dei_facts(),
+                'facts': cleaner.facts,
+            }
+            with open(facts_path, 'w', encoding='utf-8') as f:
+                json.dump(facts_doc, f, ensure_ascii=False, separators=(',', ':'))
+            # The HTML last: its presence means both files are complete
+            part_path.replace(clean_path)
+        finally:
+            part_path.unlink(missing_ok=True)
+
+        self._remove_outdated(html_path, clean_path, facts_path)
+        size = html_path.stat().st_size
+        logger.info(f"Pre-cleaned {html_path.name}: {size / 2**20:.1f} MB -> "
+                    f"{clean_path.stat().st_size / 2**20:.1f} MB, "
+                    f"{len(cleaner.facts)} ix facts -> {facts_path.name}")
+        return clean_path
+
+    def _remove_outdated(self, html_path: Path, *current: Path) -> None:
+        """Removes older copies of html_path (never those of a same-named file)."""
+        own_files = re.compile(
+            rf"({re.escape(html_path.stem)}\.[0-9a-f]{{{self.HASH_PREFIX_CHARS}}})"
+            rf"\.facts\d+\.json")
+        source = str(html_path.resolve())
+        directory = self._dir_for(html_path)
+        for facts_path in directory.glob(f"{html_path.stem}.*.json"):
+            match = own_files.fullmatch(facts_path.name)
+            if not match or facts_path in current:
+                continue
+            try:
+                with open(facts_path, encoding='utf-8') as f:
+                    if json.load(f).get('source') != source:
+                        continue
+            except (OSError, ValueError, AttributeError) as e:
+                logger.debug(f"Keeping clean copy {facts_path.name}: {e}")
+                continue
+            for path in directory.glob(f"{match.group(1)}.clean*.htm"):
+                if path not in current:
+                    path.unlink(missing_ok=True)
+            facts_path.unlink(missing_ok=True)
@@ -1,4 +1,5 @@
 # src/phase2_parsing/services/processor_service.py
+import gc
 import logging
 import json
 import time
@@ -7,9 +8,12 @@ import os
 import re
 # Removed tempfile and BytesIO imports as they were for docling/pdf path
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, TYPE_CHECKING
 import traceback
 
+if TYPE_CHECKING:
+    from src.phase2_parsing.services.worker_pool import TaskFailure
+
 # --- Parser Choice Configuration ---
 # Set to use sec-parser exclusively for now
 PARSER_CHOICE = "sec_parser"
@@ -90,6 +94,9 @@ try:
     from src.config.settings import get_settings, AppSettings
     from src.phase2_parsing.extractors.metadata_extractor import MetadataExtractor
     from src.phase2_parsing.extractors.toc_extractor import ToCExtractor
+    from src.phase2_parsing.parsers.html_document import FilingDocument
+    from src.phase2_parsing.parsers.ixbrl_cleaner import CleanHTMLCache
+    from src.phase2_parsing.parsers.element_cache import SemanticElementCache
     from src.phase2_parsing.node_builders.ToC_node_builder import TOCHierarchicalNodeBuilder as DefaultNodeBuilder
     from src.phase2_parsing.node_builders.node_builder import FinLensNode
 except ImportError as e:
@@ -98,6 +105,38 @@ except ImportError as e:
     sys.exit(1)
 # -----------------------------------------
 
+# --- Helper functions for parallel processing ---
+# Top-level so multiprocessing can reach them. Each worker gets a fully
+# initialized ProcessorService once (inherited through fork, or built by the
+# initializer where fork isn't available); per filing only the small task dict
+# goes out and a status tuple comes back, since workers write the node JSON.
+_worker_processor: Optional["ProcessorService"] = None
+
+# Tiny document parsed once before forking so lazily built parser state exists
+_WARM_UP_HTML = "<html><body><p>PART I</p><p>Item 1. Business</p></body></html>"
+
+
+def _init_processing_worker(processor_or_settings: Any) -> None:
+    """Pool initializer: stores (or builds and warms up) this worker's ProcessorService."""
+    global _worker_processor
+    if isinstance(processor_or_settings, ProcessorService):
+        _worker_processor = processor_or_settings  # Inherited via fork, already warm
+        return
+    _worker_processor = ProcessorService(processor_or_settings)
+    _worker_processor._warm_up()
+    gc.freeze()  # Keep the long-lived parser state out of every collection
+
+
+def _process_filing_worker(task_info: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Worker function: processes one filing with the worker's ProcessorService."""
+    return _worker_processor._process_and_summarize(task_info)
+
+
+# --- End Helper Functions ---
+
+# Result status of filings killed by the worker supervisor
+STATUS_QUARANTINED = "Quarantined"
+
 
 class ProcessorService:
     """
@@ -132,6 +171,18 @@ class ProcessorService:
             self.html_fixture_path = Path(
                 __file__).resolve().parent.parent.parent / "tests" / "fixtures"
             self.output_nodes_path = self.base_data_path / "nodes_json"
+            # Diagnostics of filings that timed out, ran out of memory or
+            # crashed a worker; they are skipped until the record is deleted
+            self.quarantine_path = self.base_data_path / "quarantine"
+            # Pre-cleaned filing copies and their inline XBRL facts
+            self.clean_cache: Optional[CleanHTMLCache] = None
+            if self.settings.pipeline.ixbrl_preclean:
+                self.clean_cache = CleanHTMLCache(self.base_data_path / "clean_html")
+            # sec-parser output per HTML content hash and parser version
+            self.element_cache: Optional[SemanticElementCache] = None
+            if self.settings.pipeline.sec_parser_cache:
+                self.element_cache = SemanticElementCache(
+                    self.base_data_path / "sec_parser_cache")
             # Removed temp_pdf_path
             self.output_nodes_path.mkdir(parents=True, exist_ok=True)
 
@@ -240,34 +291,35 @@ class ProcessorService:
         raw_html_content: Optional[str] = None
 
         try:
-            # --- Read HTML Content ---
-            encodings_to_try = [
-                'utf-8', 'latin-1', 'iso-8859-1', 'windows-1252'
-            ]
-            for enc in encodings_to_try:
+            # --- Pre-clean (cached; the original is parsed if this fails) ---
+            parse_path = html_path
+            if self.clean_cache is not None:
                 try:
-                    with open(html_path, "r", encoding=enc) as f:
-                        raw_html_content = f.read()
-                    logger.debug(
-                        f"Successfully read {html_path.name} with encoding {enc}"
-                    )
-                    break
-                except UnicodeDecodeError:
-                    logger.debug(
-                        f"Encoding {enc} failed for {html_path.name}, trying next..."
-                    )
-                except Exception as read_err:
-                    logger.error(
-                        f"Failed to read {html_path} for parsing: {read_err}")
-                    return identifier, None, None, True  # Cannot proceed
+                    parse_path = self.clean_cache.get(html_path)
+                except (OSError, ValueError) as clean_err:
+                    logger.warning(
+                        f"Pre-cleaning {html_path.name} failed, parsing the original: {clean_err}")
+            # -------------------------
 
-            if raw_html_content is None:
+            # --- Read HTML Content (once; all stages share this document) ---
+            try:
+                document = FilingDocument.from_path(parse_path)
+            except (OSError, ValueError) as read_err:
                 logger.error(
-                    f"Could not decode HTML file {html_path.name} with attempted encodings."
-                )
-                return identifier, None, None, True
+                    f"Failed to read {parse_path} for parsing: {read_err}")
+                return identifier, None, None, True  # Cannot proceed
+            raw_html_content = document.html
             # -------------------------
 
+            # --- ToC from the shared tree (before sec-parser restructures it) ---
+            toc_list: List[Tuple[str, int, str]] = []
+            try:
+                toc_list = self.toc_extractor.extract(document.soup)
+            except Exception as e:
+                logger.error(f"ToC extraction failed for {identifier}: {e}",
+                             exc_info=True)
+            # ---------------------------------------------------------------
+
             # --- Use sec-parser ---
             if PARSER_CHOICE == "sec_parser":
                 if not self.sec_parser_instance:
@@ -278,10 +330,18 @@ class ProcessorService:
                     f"Attempting parse for {html_path.name} using sec-parser..."
                 )
                 try:
-                    # Pass the HTML string content to sec-parser
-                    semantic_elements: List[
-                        AbstractSemanticElement] = self.sec_parser_instance.parse(
-                            raw_html_content)
+                    cache_path: Optional[Path] = None
+                    semantic_elements: Optional[List[AbstractSemanticElement]] = None
+                    if self.element_cache is not None:
+                        cache_path = self.element_cache.path_for(
+                            document.raw_bytes, self.sec_parser_instance)
+                        semantic_elements = self.element_cache.load(cache_path)
+                    if semantic_elements is None:
+                        # Classify the shared tree (falls back to parsing the string)
+                        semantic_elements = document.parse_semantic_elements(
+                            self.sec_parser_instance)
+                        if cache_path is not None:
+                            self.element_cache.store(cache_path, semantic_elements)
                     parser_output = semantic_elements  # Store the list of elements
                     logger.info(
                         f"sec-parser successfully processed {html_path.name} ({len(semantic_elements)} elements found)."
@@ -338,16 +398,8 @@ class ProcessorService:
                     parser_output, raw_html_content)  # Needs update
                 doc_meta.update({k: v for k, v in extracted_meta.items() if v})
 
-                # ToCExtractor might still work on raw HTML, or could be adapted
-                # to use sec-parser's potential ToC elements if available.
-                if raw_html_content:
-                    toc_list = self.toc_extractor.extract_from_html(
-                        raw_html_content)
-                    doc_meta['toc'] = toc_list
-                else:
-                    logger.warning(
-                        f"Skipping ToC extraction for {identifier} as raw HTML could not be read."
-                    )
+                # ToC was extracted from the shared tree above
+                doc_meta['toc'] = toc_list
 
             except Exception as e:
                 logger.error(
@@ -407,14 +459,124 @@ class ProcessorService:
         else:
             return identifier, None, None, True  # Error
 
+    def _warm_up(self) -> None:
+        """Runs the parser once on a tiny document so its lazy imports and caches are built."""
+        try:
+            if self.sec_parser_instance is not None:
+                self.sec_parser_instance.parse(_WARM_UP_HTML)
+            self.toc_extractor.extract_from_html(_WARM_UP_HTML)
+        except Exception as e:
+            logger.debug(f"Parser warm-up failed (ignored): {e}")
+
+    def _process_and_summarize(
+            self, task_info: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Processes one filing and reduces the outcome to (identifier, status, details)."""
+        identifier = task_info.get("filename_base")
+        try:
+            id_res, nodes_res, root_res, error_flag = self._process_single_filing(
+                task_info)
+        except Exception as loop_exc:
+            logger.error(
+                f"Critical error during loop execution for {identifier}: {loop_exc}",
+                exc_info=True)
+            return identifier, "Error", f"Loop exception: {type(loop_exc).__name__}"
+
+        if error_flag:
+            return id_res, "Error", "Processing failed (check logs)"
+        if nodes_res is not None and root_res is not None:
+            return id_res, "OK", f"{len(nodes_res)} nodes (Adaptation needed)"
+        return id_res, "Warn", "No nodes (Adaptation needed)"
+
+    def _quarantine(self, task_info: Dict[str, Any], failure: "TaskFailure") -> None:
+        """Writes the diagnostics record that keeps a filing out of later runs."""
+        record = {
+            "identifier": task_info.get("filename_base"),
+            "html_path": str(task_info.get("html_path")),
+            "file_size": task_info.get("file_size"),
+            "reason": failure.reason,
+            "details": failure.details,
+            "elapsed_seconds": round(failure.elapsed_seconds, 1),
+            "peak_rss_mb": round(failure.peak_rss_bytes / 2**20)
+            if failure.peak_rss_bytes else None,
+            "exit_code": failure.exit_code,
+            "worker_pid": failure.pid,
+            "quarantined_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        record_path = self.quarantine_path / f"{task_info.get('filename_base')}.json"
+        try:
+            self.quarantine_path.mkdir(parents=True, exist_ok=True)
+            with open(record_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, indent=2)
+            logger.error(f"Quarantined {record['identifier']} ({failure.reason}): "
+                         f"{failure.details}. Record: {record_path}")
+        except OSError as e:
+            logger.error(f"Failed to write quarantine record {record_path}: {e}")
+
+    def _iter_results(self, tasks_info: List[Dict[str, Any]],
+                      num_workers: int):
+        """
+        Yields (identifier, status, details) per filing, as each one finishes.
+
+        Filings run in supervised worker processes (see SupervisedWorkerPool):
+        one that exceeds PROCESSING_TIMEOUT_SECONDS or PROCESSING_MAX_RSS_MB,
+        or crashes its worker, is killed and quarantined while the rest of
+        the batch carries on. The workers share this warmed-up instance
+        through fork (copy-on-write). Tasks are dispatched one at a time in
+        the given (largest first) order, so a big filing never starts last.
+        Only with a single worker and both limits disabled do filings run in
+        this process, in order.
+        """
+        pipeline_settings = self.settings.pipeline
+        timeout = pipeline_settings.processing_timeout_seconds
+        max_rss_mb = pipeline_settings.processing_max_rss_mb
+        if num_workers <= 1 and not timeout and not max_rss_mb:
+            for task_info in tasks_info:
+                yield self._process_and_summarize(task_info)
+            return
+
+        import multiprocessing
+        from src.phase2_parsing.services.worker_pool import SupervisedWorkerPool, FAILURE_ERROR
+        use_fork = "fork" in multiprocessing.get_all_start_methods()
+        if use_fork:
+            self._warm_up()
+        with SupervisedWorkerPool(
+                num_workers,
+                _process_filing_worker,
+                initializer=_init_processing_worker,
+                initargs=(self if use_fork else self.settings, ),
+                timeout=timeout,
+                max_rss_bytes=max_rss_mb * 2**20,
+                max_tasks_per_worker=pipeline_settings.processing_max_tasks_per_worker,
+                context=multiprocessing.get_context(
+                    "fork" if use_fork else None)) as pool:
+            for task_info, result, failure in pool.imap_unordered(tasks_info):
+                if failure is None:
+                    yield result
+                elif failure.reason == FAILURE_ERROR:
+                    logger.error(f"Worker error for {task_info.get('filename_base')}: "
+                                 f"{failure.details}")
+                    yield (task_info.get("filename_base"), "Error",
+                           "Worker exception (check logs)")
+                else:
+                    self._quarantine(task_info, failure)
+                    yield (task_info.get("filename_base"), STATUS_QUARANTINED,
+                           f"{failure.reason}: {failure.details}")
+            logger.info(f"Used {pool.workers_started} worker processes "
+                        f"for {len(tasks_info)} filings.")
+
     def run_processing(self, html_files: List[Path]):
-        """ Processes a list of HTML files sequentially using the configured parser. """
+        """
+        Processes a list of HTML files using the configured parser:
+        sequentially, or with PROCESSING_WORKERS > 1 in a pool of pre-initialized
+        worker processes (largest files first, results as they finish).
+        """
         if not html_files:
             logger.warning("No input files provided for processing.")
             return
 
         tasks_info = []
         processed_bases = set()
+        quarantined_skipped = 0
         for file_path in html_files:  # Use correct variable name
             if not file_path.is_file():
                 logger.warning(f"Skipping non-existent file: {file_path}")
@@ -428,12 +590,20 @@ class ProcessorService:
                 )
                 continue
             processed_bases.add(filename_base)
+            if (self.quarantine_path / f"{filename_base}.json").exists():
+                quarantined_skipped += 1
+                logger.warning(
+                    f"Skipping quarantined filing {file_path.name} "
+                    f"(delete {self.quarantine_path / (filename_base + '.json')} to retry)."
+                )
+                continue
 
             output_json_path = self.output_nodes_path / f"{filename_base}_nodes.json"
             tasks_info.append({
                 **metadata,
                 "html_path": file_path,  # Pass original HTML path
-                "output_json_path": output_json_path
+                "output_json_path": output_json_path,
+                "file_size": file_path.stat().st_size
             })
 
         if not tasks_info:
@@ -442,59 +612,44 @@ class ProcessorService:
             return
 
         num_files = len(tasks_info)
+        num_workers = max(1, min(self.settings.pipeline.processing_workers,
+                                 num_files))
+        if num_workers > 1:
+            # Largest first: the longest filings start early instead of
+            # becoming the batch's tail
+            tasks_info.sort(key=lambda task: task["file_size"], reverse=True)
+            mode = f"in parallel ({num_workers} worker processes)"
+        else:
+            mode = "sequentially"
         logger.info(
-            f"Starting sequential processing for {num_files} files using '{PARSER_CHOICE}' parser..."
+            f"Starting processing for {num_files} files {mode} using '{PARSER_CHOICE}' parser..."
         )
 
         results_summary: Dict[str, Dict[str, Any]] = {}
         success_count = 0
         warning_count = 0
         error_count = 0
+        quarantined_count = 0
         start_time = time.time()
 
-        for i, task_info in enumerate(tasks_info):
-            identifier = task_info.get("filename_base")
-            try:
-                id_res, nodes_res, root_res, error_flag = self._process_single_filing(
-                    task_info)
-                result_key = id_res
-
-                if error_flag:
-                    error_count += 1
-                    results_summary[result_key] = {
-                        "status": "Error",
-                        "details": "Processing failed (check logs)"
-                    }
-                elif nodes_res is not None and root_res is not None:
-                    success_count += 1
-                    results_summary[result_key] = {
-                        "status": "OK",
-                        "details":
-                        f"{len(nodes_res)} nodes (Adaptation needed)"
-                    }  # Note adaptation needed
-                else:
-                    warning_count += 1
-                    results_summary[result_key] = {
-                        "status": "Warn",
-                        "details": "No nodes (Adaptation needed)"
-                    }  # Note adaptation needed
-
-            except Exception as loop_exc:
+        for i, (result_key, status, details) in enumerate(
+                self._iter_results(tasks_info, num_workers)):
+            if status == "Error":
                 error_count += 1
-                logger.error(
-                    f"Critical error during loop execution for {identifier}: {loop_exc}",
-                    exc_info=True)
-                results_summary[identifier] = {
-                    "status": "Error",
-                    "details": f"Loop exception: {type(loop_exc).__name__}"
-                }
+            elif status == STATUS_QUARANTINED:
+                quarantined_count += 1
+            elif status == "OK":
+                success_count += 1
+            else:
+                warning_count += 1
+            results_summary[result_key] = {"status": status, "details": details}
 
             logger.info(f"Progress: {i+1}/{num_files} files processed...")
 
         end_time = time.time()
         duration = end_time - start_time
         logger.info(
-            f"Finished processing {num_files} files sequentially in {duration:.2f} seconds."
+            f"Finished processing {num_files} files {mode} in {duration:.2f} seconds."
         )
 
         # --- Print Summary ---
@@ -505,6 +660,8 @@ class ProcessorService:
         print(
             f"  Warnings (No Nodes/Root - Needs Adaptation): {warning_count}")
         print(f"  Errors (Exceptions/Failures): {error_count}")
+        print(f"  Quarantined (Timeout/Memory/Crash): {quarantined_count}"
+              f" (+{quarantined_skipped} skipped from earlier runs)")
         print("--- Individual Results ---")
         sorted_results = sorted(results_summary.items())
         for identifier, summary in sorted_results:
@@ -555,7 +712,7 @@ if __name__ == "__main__":
 
     try:
         processor = ProcessorService()
-        processor.run_processing(all_files_to_process)  # Run sequentially
+        processor.run_processing(all_files_to_process)  # PROCESSING_WORKERS > 1 runs a pool
     except Exception as main_err:
         logger.critical(f"ProcessorService failed to run: {main_err}",
                         exc_info=True)
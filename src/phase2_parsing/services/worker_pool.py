@@ -0,0 +1,320 @@
+# src/phase2_parsing/services/worker_pool.py
+
+import gc
+import logging
+import os
+import signal
+import time
+import traceback
+from dataclasses import dataclass
+from multiprocessing import connection
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# resource is POSIX-only; without it only the supervisor's RSS check applies
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    resource = None
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Message kinds sent from a worker back to the supervisor
+_OK, _ERROR, _MEMORY = "ok", "error", "memory"
+
+# Failure reasons reported in TaskFailure.reason
+FAILURE_ERROR = "error"  # The handler raised; the worker is fine
+FAILURE_TIMEOUT = "timeout"  # Killed after exceeding the wall-clock timeout
+FAILURE_MEMORY = "memory"  # Exceeded the RSS ceiling / address-space limit
+FAILURE_CRASH = "crash"  # The worker died (segfault, OOM killer, os._exit...)
+
+# RLIMIT_AS backstop: address space a worker may add on top of what it
+# inherits, as a multiple of the RSS ceiling (virtual size runs well above RSS)
+_ADDRESS_SPACE_FACTOR = 2
+# Seconds a retiring worker gets to exit before it is terminated
+_JOIN_TIMEOUT = 5.0
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class TaskFailure:
+    """Why a task produced no result, with diagnostics for the quarantine record."""
+    reason: str
+    details: str
+    elapsed_seconds: float
+    peak_rss_bytes: Optional[int] = None
+    exit_code: Optional[int] = None
+    pid: Optional[int] = None
+
+
+def _memory_bytes(pid: int) -> Optional[Tuple[int, int]]:
+    """(virtual size, RSS) of a process from /proc (Linux), or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            size_pages, rss_pages = f.read().split()[:2]
+        return int(size_pages) * _PAGE_SIZE, int(rss_pages) * _PAGE_SIZE
+    except (OSError, ValueError):
+        return None
+
+
+def _worker_main(conn, handler: Callable[[Any], Any],
+                 initializer: Optional[Callable[..., None]],
+                 initargs: Sequence[Any],
+                 max_rss_bytes: Optional[int]) -> None:
+    """Worker process loop: receives one task at a time until it gets None."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is the supervisor's job
+    if max_rss_bytes and RESOURCE_AVAILABLE:
+        # Hard backstop for allocations between two supervisor RSS checks:
+        # beyond it they raise MemoryError instead of growing the process
+        memory = _memory_bytes(os.getpid())
+        limit = (memory[0] if memory else 0) + max_rss_bytes * _ADDRESS_SPACE_FACTOR
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    if initializer is not None:
+        initializer(*initargs)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break  # Supervisor went away
+        if task is None:
+            break
+        try:
+            conn.send((_OK, handler(task)))
+        except MemoryError:
+            # The heap may be left fragmented; report and let the supervisor replace us
+            conn.send((_MEMORY, traceback.format_exc()))
+            break
+        except Exception:
+            conn.send((_ERROR, traceback.format_exc()))
+    conn.close()
+
+
+class _Worker:
+    """Supervisor-side handle of one worker process and the task it is running."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task: Any = None
+        self.busy = False
+        self.started = 0.0
+        self.peak_rss = 0
+        self.tasks_done = 0
+
+    def assign(self, task: Any) -> None:
+        self.conn.send(task)
+        self.task = task
+        self.busy = True
+        self.started = time.monotonic()
+        self.peak_rss = 0
+
+    def finish(self) -> Any:
+        task, self.task, self.busy = self.task, None, False
+        self.tasks_done += 1
+        return task
+
+    def failure(self, reason: str, details: str) -> TaskFailure:
+        return TaskFailure(reason=reason,
+                           details=details,
+                           elapsed_seconds=time.monotonic() - self.started,
+                           peak_rss_bytes=self.peak_rss or None,
+                           exit_code=self.process.exitcode,
+                           pid=self.process.pid)
+
+
+class SupervisedWorkerPool:
+    """
+    Process pool that isolates each task: a worker runs one task at a time,
+    and the supervisor (the calling process) kills it when the task exceeds
+    the wall-clock timeout or RSS ceiling or the worker dies, reports the task
+    as failed with diagnostics and starts a fresh worker, so one pathological
+    input never stalls or takes down the batch. Workers are also recycled
+    after max_tasks_per_worker tasks to shed fragmented heaps.
+
+    Memory is capped twice: the supervisor reads each busy worker's RSS from
+    /proc every poll_interval seconds, and (where the resource module exists)
+    RLIMIT_AS makes runaway allocations in between fail with MemoryError.
+
+    With the fork start method, workers inherit the caller's state (e.g. a
+    warmed-up parser passed in initargs, which isn't pickled); gc.freeze()
+    around each fork keeps those pages shared copy-on-write.
+    """
+
+    def __init__(self,
+                 num_workers: int,
+                 handler: Callable[[Any], Any],
+                 initializer: Optional[Callable[..., None]] = None,
+                 initargs: Sequence[Any] = (),
+                 timeout: Optional[float] = None,
+                 max_rss_bytes: Optional[int] = None,
+                 max_tasks_per_worker: Optional[int] = None,
+                 context=None,
+                 poll_interval: float = 1.0):
+        import multiprocessing
+        self.num_workers = max(1, num_workers)
+        self.handler = handler
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        self.timeout = timeout or None
+        self.max_rss_bytes = max_rss_bytes or None
+        self.max_tasks_per_worker = max_tasks_per_worker or None
+        self.context = context or multiprocessing.get_context()
+        self.poll_interval = poll_interval
+        self._workers: List[_Worker] = []
+        self.workers_started = 0
+
+    def __enter__(self) -> "SupervisedWorkerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # --- Worker lifecycle ---
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_worker_main,
+                                       args=(child_conn, self.handler,
+                                             self.initializer, self.initargs,
+                                             self.max_rss_bytes),
+                                       daemon=True)
+        forking = self.context.get_start_method() == "fork"
+        if forking:
+            gc.collect()
+            gc.freeze()
+        try:
+            process.start()
+        finally:
+            if forking:
+                gc.unfreeze()
+        child_conn.close()
+        self.workers_started += 1
+        return _Worker(process, parent_conn)
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        """Stops a worker (asking nicely unless kill) and releases its pipe."""
+        if kill:
+            worker.process.kill()
+        else:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        worker.process.join(_JOIN_TIMEOUT)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+
+    def _replace(self, worker: _Worker, kill: bool = False) -> None:
+        self._retire(worker, kill=kill)
+        self._workers[self._workers.index(worker)] = self._spawn()
+
+    def close(self) -> None:
+        """Stops all workers (idle ones exit cleanly, busy ones are killed)."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            self._retire(worker, kill=worker.busy)
+
+    # --- Supervision ---
+    def imap_unordered(
+            self, tasks: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Any, Optional[TaskFailure]]]:
+        """
+        Runs every task, dispatching them in the given order, and yields
+        (task, result, None) or (task, None, TaskFailure) as each one finishes.
+        """
+        pending = iter(tasks)
+        exhausted = False
+        while len(self._workers) < self.num_workers:
+            self._workers.append(self._spawn())
+
+        while True:
+            for worker in self._workers:
+                if exhausted:
+                    break
+                if not worker.busy:
+                    try:
+                        worker.assign(next(pending))
+                    except StopIteration:
+                        exhausted = True
+            busy = [worker for worker in self._workers if worker.busy]
+            if not busy:
+                return
+
+            wait_for = [w.conn for w in busy] + [w.process.sentinel for w in busy]
+            connection.wait(wait_for, timeout=self._wait_timeout(busy))
+            for worker in busy:
+                outcome = self._check(worker)
+                if outcome is not None:
+                    yield outcome
+
+    def _wait_timeout(self, busy: List[_Worker]) -> float:
+        if not self.timeout:
+            return self.poll_interval
+        now = time.monotonic()
+        next_deadline = min(w.started + self.timeout for w in busy)
+        return max(0.0, min(self.poll_interval, next_deadline - now))
+
+    def _check(self, worker: _Worker
+               ) -> Optional[Tuple[Any, Any, Optional[TaskFailure]]]:
+        """Collects a finished task or enforces the limits on a running one."""
+        if worker.conn.poll():
+            try:
+                kind, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                kind = None  # Died mid-send; handled as a crash below
+            else:
+                if kind == _OK:
+                    outcome = (worker.task, payload, None)
+                else:
+                    reason = FAILURE_MEMORY if kind == _MEMORY else FAILURE_ERROR
+                    outcome = (worker.task, None, worker.failure(reason, payload))
+                worker.finish()
+                if kind == _MEMORY or (self.max_tasks_per_worker and
+                                       worker.tasks_done >= self.max_tasks_per_worker):
+                    self._replace(worker)
+                return outcome
+
+        if not worker.process.is_alive():
+            worker.process.join()
+            failure = worker.failure(
+                FAILURE_CRASH,
+                f"Worker exited with code {worker.process.exitcode}"
+                f"{' (killed by the OS, possibly out of memory)' if worker.process.exitcode == -signal.SIGKILL else ''}")
+            return self._fail(worker, failure)
+
+        elapsed = time.monotonic() - worker.started
+        if self.timeout and elapsed > self.timeout:
+            return self._fail(
+                worker,
+                worker.failure(FAILURE_TIMEOUT,
+                               f"Exceeded the {self.timeout:g}s timeout"),
+                kill=True)
+
+        if self.max_rss_bytes:
+            memory = _memory_bytes(worker.process.pid)
+            if memory is not None:
+                worker.peak_rss = max(worker.peak_rss, memory[1])
+                if memory[1] > self.max_rss_bytes:
+                    return self._fail(
+                        worker,
+                        worker.failure(
+                            FAILURE_MEMORY,
+                            f"RSS {memory[1] / 2**20:.0f} MB exceeded the "
+                            f"{self.max_rss_bytes / 2**20:.0f} MB ceiling"),
+                        kill=True)
+        return None
+
+    def _fail(self, worker: _Worker, failure: TaskFailure,
+              kill: bool = False) -> Tuple[Any, Any, TaskFailure]:
+        task = worker.finish()
+        logger.warning(f"Worker {failure.pid}: task failed ({failure.reason}) after "
+                       f"{failure.elapsed_seconds:.1f}s: {failure.details}")
+        self._replace(worker, kill=kill)
+        return task, None, failure
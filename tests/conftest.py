@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""
+Shared fixtures: database tests run against a throwaway SQLite file, with
+the settings singleton pointing at it (and at a temporary data directory).
+"""
+
+import os
+
+import pytest
+
+# SECAPISettings is instantiated when src.config.settings is imported
+os.environ.setdefault("SEC_USER_AGENT", "FinLens Tests tests@example.com")
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """
+    Returns connect(**database_settings) -> (engine, session_factory) for a
+    SQLite database in tmp_path. Keyword arguments are DatabaseSettings
+    aliases (e.g. DB_COMPACT_SCHEMA=True); each call re-initializes the
+    settings singleton, so a test can reconnect with other settings.
+    """
+    from src.config import settings as settings_module
+    from src.database import session as session_module
+    from src.database.compact import form_type_registry
+
+    # Process-wide caches must not leak ids from another test's database
+    monkeypatch.setattr(form_type_registry, "_ids", {})
+    monkeypatch.setattr(form_type_registry, "_codes", {})
+    engines = []
+
+    def connect(**database):
+        database = {"DB_BACKEND": "sqlite",
+                    "DB_PATH": tmp_path / "finlens.sqlite",
+                    **database}
+        settings = settings_module.AppSettings(
+            database=settings_module.DatabaseSettings(**database),
+            pipeline=settings_module.PipelineSettings(
+                DATA_STORAGE_PATH=tmp_path / "data"))
+        monkeypatch.setattr(settings_module, "_settings", settings)
+        engine, session_factory = session_module.initialize_database(settings.database)
+        engines.append(engine)
+        return engine, session_factory
+
+    yield connect
+    for engine in engines:
+        engine.dispose()
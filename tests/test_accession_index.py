@@ -0,0 +1,101 @@
+# tests/test_accession_index.py
+"""
+Accession index snapshots: a saved index is reused only while it matches
+the filings table; after the database is recreated, restored or pruned it
+must be rebuilt instead of filtering out filings the table doesn't have.
+Filings moved to archive tables stay in the index.
+Run with: python -m pytest tests/test_accession_index.py
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from src.database.accession_index import AccessionIndex
+from src.database.repositories.company import CompanyRepository
+from src.database.repositories.filing import FilingRepository
+
+
+def _filings(*numbers):
+    return [{"cik": "0000000001", "form_type": "10-K",
+             "filing_date": date(2024, 1, 2),
+             "accession_number": f"0000000001-24-{n:06d}",
+             "primary_document_filename": f"doc{n}.htm"} for n in numbers]
+
+
+@pytest.fixture(params=[False, True], ids=["classic", "compact"])
+def connect(request, sqlite_db, tmp_path):
+    """connect(**settings) -> (engine, FilingRepository, table name), company 1 present."""
+
+    def _connect(**database):
+        engine, session_factory = sqlite_db(DB_COMPACT_SCHEMA=request.param, **database)
+        CompanyRepository(session_factory).bulk_upsert([{"cik": "0000000001", "name": "A"}])
+        table = "compact_filings" if request.param else "filings"
+        return engine, FilingRepository(session_factory), table
+
+    _connect.db_file = tmp_path / "finlens.sqlite"
+    return _connect
+
+
+def _count(engine, table):
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+def _save_snapshot(connect, *numbers):
+    engine, repo, _ = connect()
+    assert repo.bulk_insert_ignore(_filings(*numbers)) == len(numbers)
+    repo.save_accession_index()
+    engine.dispose()
+    return repo._accession_index_path()
+
+
+def test_snapshot_is_reused_when_it_matches(connect):
+    path = _save_snapshot(connect, 1, 2)
+    assert AccessionIndex.load(path).rows == 2
+    engine, repo, table = connect()
+    assert repo.bulk_insert_ignore(_filings(1, 2, 3)) == 1
+    assert _count(engine, table) == 3
+    assert repo._accession_index.rows == 3
+
+
+def test_recreated_database_discards_snapshot(connect):
+    _save_snapshot(connect, 1)
+    connect.db_file.unlink()
+    engine, repo, table = connect()
+    assert repo.bulk_insert_ignore(_filings(1)) == 1
+    assert _count(engine, table) == 1
+
+
+def test_recreated_database_with_as_many_rows_discards_snapshot(connect):
+    _save_snapshot(connect, 1, 2)
+    connect.db_file.unlink()
+    # Same ids and row count, other accession numbers (written without the index)
+    engine, repo, _ = connect(DB_ACCESSION_INDEX=False)
+    assert repo.bulk_insert_ignore(_filings(5, 6)) == 2
+    engine.dispose()
+
+    engine, repo, table = connect()
+    assert repo.bulk_insert_ignore(_filings(1, 2)) == 2
+    assert _count(engine, table) == 4
+
+
+def test_pruned_table_discards_snapshot(connect):
+    _save_snapshot(connect, 1, 2)
+    engine, repo, table = connect()
+    with engine.begin() as connection:
+        connection.execute(text(f"DELETE FROM {table} WHERE id = 1"))
+    assert repo.bulk_insert_ignore(_filings(1)) == 1
+    assert _count(engine, table) == 2
+
+
+def test_archived_filings_are_not_reinserted(connect):
+    _save_snapshot(connect, 1, 2)
+    engine, repo, table = connect()
+    # What partitioning.archive_year leaves behind (MySQL only, emulated here)
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE TABLE {table}_archive_2024 AS SELECT * FROM {table}"))
+        connection.execute(text(f"DELETE FROM {table}"))
+    assert repo.bulk_insert_ignore(_filings(1, 2, 3)) == 1
+    assert _count(engine, table) == 1
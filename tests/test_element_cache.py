@@ -0,0 +1,109 @@
+# tests/test_element_cache.py
+"""
+sec-parser element cache: elements loaded from the cache must match the
+parser's own output (types, text, levels, section types, logs, source code
+and table markdown), and bad or foreign entries must read as misses.
+Run with: python -m pytest tests/test_element_cache.py
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+sec_parser = pytest.importorskip("sec_parser")
+
+from src.phase2_parsing.parsers.element_cache import CachedHtmlTag, SemanticElementCache
+from src.phase2_parsing.parsers.html_document import FilingDocument
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def _state(element):
+    return (type(element), element.text, getattr(element, "level", None),
+            getattr(element, "section_type", None), getattr(element, "style", None),
+            element.processing_log.get_items(), element.html_tag.get_source_code(),
+            element.html_tag.name)
+
+
+@pytest.fixture(scope="module")
+def parsed():
+    document = FilingDocument.from_path(FIXTURES / "aapl-20240928.htm")
+    parser = sec_parser.Edgar10QParser()
+    return document, parser, document.parse_semantic_elements(parser)
+
+
+def test_round_trip_matches_parser_output(parsed, tmp_path):
+    document, parser, elements = parsed
+    cache = SemanticElementCache(tmp_path)
+    path = cache.path_for(document.raw_bytes, parser)
+    assert cache.load(path) is None
+    assert cache.store(path, elements)
+
+    loaded = cache.load(path)
+    assert [_state(e) for e in loaded] == [_state(e) for e in elements]
+    assert all(isinstance(e.html_tag, CachedHtmlTag) for e in loaded)
+    # No bs4 tree is built until something needs it
+    assert all(e.html_tag._lazy_tag is None for e in loaded)
+
+    tables = [(a, b) for a, b in zip(elements, loaded)
+              if isinstance(a, sec_parser.TableElement)]
+    assert tables
+    for original, restored in tables[:5]:
+        assert restored.table_to_markdown() == original.table_to_markdown()
+
+
+def test_keys_depend_on_content_and_parser(tmp_path):
+    class OtherParser(sec_parser.Edgar10QParser):
+        pass
+
+    cache = SemanticElementCache(tmp_path)
+    parser = sec_parser.Edgar10QParser()
+    path = cache.path_for(b"<p>a</p>", parser)
+    assert path != cache.path_for(b"<p>b</p>", parser)
+    assert path != cache.path_for(b"<p>a</p>", OtherParser())
+    assert cache.version in path.parent.name
+
+
+def test_unreadable_or_foreign_entries_are_misses(parsed, tmp_path):
+    document, parser, elements = parsed
+    cache = SemanticElementCache(tmp_path)
+    path = cache.path_for(document.raw_bytes, parser)
+    path.parent.mkdir(parents=True)
+
+    path.write_bytes(b"not gzip")
+    assert cache.load(path) is None
+
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"format": 1, "elements": [
+            {"type": "os:system", "html": "<p>x</p>", "text": "x", "log": [], "state": {}}
+        ]}, f)
+    assert cache.load(path) is None
+
+
+@pytest.mark.parametrize("value", [
+    {"exception": "builtins:eval", "message": "open({marker!r}, 'w').close()"},
+    {"exception": "builtins:dict", "message": "x"},
+    {"exception": "sec_parser.semantic_elements.semantic_elements:TextElement",
+     "message": "x"},
+    {"dataclass": "builtins:dict", "fields": {"a": 1}},
+    {"dataclass": "builtins:ValueError", "fields": {}},
+    {"dataclass": "sec_parser.processing_engine.processing_log:ProcessingLog",
+     "fields": {}},
+])
+def test_crafted_entries_are_misses(parsed, tmp_path, value):
+    document, parser, _ = parsed
+    marker = tmp_path / "executed"
+    if "message" in value:
+        value = dict(value, message=value["message"].format(marker=str(marker)))
+    cache = SemanticElementCache(tmp_path)
+    path = cache.path_for(document.raw_bytes, parser)
+    path.parent.mkdir(parents=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"format": 1, "elements": [{
+            "type": "sec_parser.semantic_elements.semantic_elements:TextElement",
+            "html": "<p>x</p>", "text": "x", "log": [], "state": {"payload": value},
+        }]}, f)
+    assert cache.load(path) is None
+    assert not marker.exists()
@@ -0,0 +1,72 @@
+# tests/test_import_time.py
+"""
+Startup budget for the CLI: importing main.py and the pipeline service must
+not pull in the heavy dependencies, and a mode only imports what it uses.
+
+Each check runs in a fresh interpreter (sys.modules is process-wide).
+Run with: python -m pytest tests/test_import_time.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Seconds allowed for `import main` (measured inside the subprocess)
+MAIN_IMPORT_BUDGET = 0.5
+
+HEAVY_MODULES = ("sqlalchemy", "bs4", "requests", "multiprocessing.pool",
+                 "msgspec", "orjson")
+
+
+def _run(code: str, tmp_path: Path) -> dict:
+    """Runs code in a fresh interpreter from the repo root; it prints a JSON result."""
+    env = dict(os.environ,
+               SEC_USER_AGENT="FinLens Tests tests@example.com",
+               DB_BACKEND="sqlite",
+               DB_PATH=str(tmp_path / "finlens.sqlite"),
+               DATA_STORAGE_PATH=str(tmp_path / "data"))
+    (tmp_path / "logs").mkdir(exist_ok=True)
+    result = subprocess.run([sys.executable, "-c", code],
+                            cwd=tmp_path,
+                            env=dict(env, PYTHONPATH=str(REPO_ROOT)),
+                            capture_output=True,
+                            text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_main_import_is_light(tmp_path):
+    result = _run(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n", tmp_path)
+    assert result["heavy"] == []
+    assert result["elapsed"] < MAIN_IMPORT_BUDGET, result
+
+
+def test_pipeline_service_builds_components_lazily(tmp_path):
+    result = _run(
+        "import json, sys\n"
+        "from src.phase1_extraction.services.pipeline_service import PipelineService\n"
+        "pipeline = PipelineService()\n"
+        "after_init = sorted(m for m in ('sqlalchemy', 'bs4', 'requests') if m in sys.modules)\n"
+        "# What an incremental run touches\n"
+        "pipeline.index_downloader, pipeline.index_parser, pipeline.filing_repo\n"
+        "after_incremental = sorted(m for m in ('bs4', 'multiprocessing.pool',\n"
+        "    'src.phase1_extraction.parsers.html',\n"
+        "    'src.phase1_extraction.parsers.json',\n"
+        "    'src.phase1_extraction.services.bulk_writer') if m in sys.modules)\n"
+        "pipeline.close()\n"
+        "print(json.dumps({'after_init': after_init,\n"
+        "                  'after_incremental': after_incremental}))\n",
+        tmp_path)
+    assert result["after_init"] == []
+    assert result["after_incremental"] == []
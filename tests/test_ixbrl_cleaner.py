@@ -0,0 +1,109 @@
+# tests/test_ixbrl_cleaner.py
+"""
+Inline XBRL pre-clean: what the cleaner drops and keeps, the facts it
+collects, and the sha256-keyed clean copy cache.
+Run with: python -m pytest tests/test_ixbrl_cleaner.py
+"""
+
+import json
+
+from src.phase2_parsing.parsers.ixbrl_cleaner import CleanHTMLCache, IXBRLCleaner
+
+FILING = """<?xml version="1.0" encoding="utf-8"?>
+<html xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"><head>
+<meta charset="utf-8"><title>10-K</title>
+<style>p { color: red }</style><script>var x = 1;</script>
+</head><body>
+<div style="display:none"><ix:header><ix:hidden>
+<ix:nonNumeric name="dei:DocumentType" contextRef="c-1">10-K</ix:nonNumeric>
+</ix:hidden></ix:header></div>
+<!-- generated -->
+<p class="x" style="font-family:Arial; font-weight:700 ;color:#000" data-foo="1">Item&#160;1.
+<ix:nonNumeric name="dei:EntityRegistrantName" contextRef="c-1">Example
+  Corp</ix:nonNumeric></p>
+<div style="DISPLAY: none">hidden <b>text</b></div>
+<table><tr><td style="display:none"></td><td>Revenue</td>
+<td><ix:nonFraction name="us-gaap:Revenues" contextRef="c-2" unitRef="usd"
+ decimals="-6" scale="6">1,234<ix:exclude> (excluded)</ix:exclude></ix:nonFraction></td></tr></table>
+<img src="data:image/png;base64,AAAA" alt="logo"><img src="chart.png">
+<span>&nbsp;</span>
+</body></html>
+"""
+
+
+def _clean(source):
+    out = []
+    cleaner = IXBRLCleaner(out.append)
+    cleaner.feed(source)
+    cleaner.close()
+    return ''.join(out), cleaner
+
+
+def test_drops_payload_and_keeps_content():
+    html, _ = _clean(FILING)
+    for dropped in ("ix:header", "<script", "<style", "<meta", "generated",
+                    "hidden <b>", "class=", "data-foo", "font-family", "color",
+                    "base64", "<?xml"):
+        assert dropped not in html
+    assert '<p style="font-weight:700">Item\xa01.' in html
+    assert "Example\n  Corp</ix:nonnumeric>" in html
+    assert '<img alt="logo">' in html and '<img src="chart.png">' in html
+    assert "<span>\xa0</span>" in html  # nbsp is content, not collapsible whitespace
+
+
+def test_keeps_hidden_table_cells():
+    html, _ = _clean(FILING)
+    assert '<tr><td></td><td>Revenue</td>' in html
+
+
+def test_collects_facts():
+    _, cleaner = _clean(FILING)
+    facts = {fact["name"]: fact for fact in cleaner.facts}
+    assert facts["dei:DocumentType"] == {
+        "name": "dei:DocumentType", "context": "c-1", "hidden": True, "value": "10-K"}
+    assert facts["dei:EntityRegistrantName"]["value"] == "Example Corp"
+    assert facts["us-gaap:Revenues"] == {
+        "name": "us-gaap:Revenues", "context": "c-2", "unit": "usd",
+        "decimals": "-6", "scale": "6", "value": "1,234"}
+    assert cleaner.dei_facts() == {"DocumentType": "10-K",
+                                   "EntityRegistrantName": "Example Corp"}
+
+
+def test_cache_reuses_and_replaces_clean_copies(tmp_path):
+    source = tmp_path / "filing.htm"
+    source.write_text(FILING, encoding="utf-8")
+    cache = CleanHTMLCache(tmp_path / "clean")
+
+    first = cache.get(source)
+    assert first.parent == tmp_path / "clean"
+    facts_path = first.with_name(first.name.replace(".clean1.htm", ".facts1.json"))
+    facts_doc = json.loads(facts_path.read_text(encoding="utf-8"))
+    assert facts_doc["dei"]["DocumentType"] == "10-K"
+    modified = first.stat().st_mtime_ns
+    assert cache.get(source) == first and first.stat().st_mtime_ns == modified
+
+    source.write_text(FILING.replace("Example", "Other"), encoding="utf-8")
+    second = cache.get(source)
+    assert second != first
+    assert sorted(p.name for p in (tmp_path / "clean").iterdir()) == sorted(
+        [second.name, second.name.replace(".clean1.htm", ".facts1.json")])
+
+
+def test_cache_keeps_copies_of_same_named_filings(tmp_path):
+    sources = []
+    for name, text in (("a", FILING), ("b", FILING.replace("Example", "Second"))):
+        (tmp_path / name).mkdir()
+        sources.append(tmp_path / name / "filing.htm")
+        sources[-1].write_text(text, encoding="utf-8")
+    cache = CleanHTMLCache(tmp_path / "clean")
+
+    first, second = (cache.get(source) for source in sources)
+    assert first != second
+    sources[0].write_text(FILING.replace("Example", "Other"), encoding="utf-8")
+    third = cache.get(sources[0])
+
+    assert not first.exists()
+    assert cache.get(sources[1]) == second and second.exists()
+    assert len(list((tmp_path / "clean").iterdir())) == 4
+    assert "Second\n  Corp" in second.read_text(encoding="utf-8")
+    assert "Other\n  Corp" in third.read_text(encoding="utf-8")
@@ -0,0 +1,70 @@
+# tests/test_json_parser.py
+"""
+Submission JSON parsing: every decoder backend (msgspec, orjson, json) maps
+the same document to the same company and filings, including documents with
+missing, null or unexpectedly typed sections.
+Run with: python -m pytest tests/test_json_parser.py
+"""
+
+import json
+
+import pytest
+
+from src.config.settings import get_settings
+from src.phase1_extraction.parsers.json import (JSONParser, MSGSPEC_AVAILABLE,
+                                                ORJSON_AVAILABLE)
+
+BACKENDS = ["json"] + ["orjson"] * ORJSON_AVAILABLE + ["msgspec"] * MSGSPEC_AVAILABLE
+
+RECENT = {"form": ["10-K", "8-K", None], "filingDate": ["2024-01-02", "2024-13-01", "2024-01-04"],
+          "accessionNumber": ["0000000001-24-000001", "0000000001-24-000002",
+                              "0000000001-24-000003"],
+          "primaryDocument": ["a.htm", "b.htm", "c.htm"], "reportDate": ["", "", ""]}
+
+ADDRESS = {"street1": "1 Main St", "city": "Springfield", "stateOrCountry": "IL",
+           "zipCode": "62701", "isForeignLocation": 0}
+
+SUBMISSIONS = {
+    "full": {"entityName": "A Corp ", "sic": "1000", "entityType": "operating",
+             "insiderTransactionForOwnerExists": 1, "insiderTransactionForIssuerExists": 0,
+             "phone": "555", "addresses": {"business": ADDRESS, "mailing": ADDRESS},
+             "filings": {"recent": RECENT, "files": []}},
+    "no_addresses": {"entityName": "A", "filings": {"recent": RECENT}},
+    "null_addresses": {"entityName": "A", "addresses": None},
+    "no_business_address": {"name": "A", "addresses": {"mailing": ADDRESS}},
+    "null_business_address": {"entityName": "A", "addresses": {"business": None}},
+    "partial_business_address": {"entityName": "A", "addresses": {"business": {"city": "X"}}},
+    "no_name": {"insiderTransactionForOwnerExists": 2},
+    "null_recent": {"entityName": "A", "filings": {"recent": None}},
+    "missing_column": {"entityName": "A",
+                       "filings": {"recent": {k: v for k, v in RECENT.items() if k != "form"}}},
+    # Doesn't fit the msgspec schema: decoded generically
+    "numeric_sic": {"entityName": "A", "sic": 1000, "addresses": {"business": ADDRESS}},
+}
+
+
+def _parse(backend, document, tmp_path):
+    parser = JSONParser(get_settings())
+    parser.backend = backend
+    path = tmp_path / "CIK0000000001.json"
+    path.write_text(json.dumps(document))
+    company, filings, errors = parser.parse(path)
+    return company, list(filings.iter_rows()), errors
+
+
+@pytest.mark.parametrize("name", SUBMISSIONS)
+def test_backends_agree(name, tmp_path):
+    results = {backend: _parse(backend, SUBMISSIONS[name], tmp_path) for backend in BACKENDS}
+    expected = results["json"]
+    assert expected[0] is not None
+    for backend, result in results.items():
+        assert result == expected, backend
+
+
+def test_full_submission(tmp_path):
+    company, filings, errors = _parse(BACKENDS[-1], SUBMISSIONS["full"], tmp_path)
+    assert (company["name"], company["business_city"], company["business_zip"],
+            company["insider_trade_owner"], company["insider_trade_issuer"]) == (
+                "A Corp", "Springfield", "62701", True, False)
+    assert [row[3] for row in filings] == ["0000000001-24-000001"]
+    assert errors == 2
@@ -0,0 +1,102 @@
+# tests/test_migrations.py
+"""
+Versioned schema migrations on SQLite: a fresh upgrade, upgrading a
+database created before versioning (version 0) and the startup fast check.
+Run with: python -m pytest tests/test_migrations.py
+"""
+
+import logging
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import DateTime, create_engine, inspect, text
+from sqlalchemy.dialects import postgresql
+
+from src.database import migrations, models
+from src.database.dialects import get_backend
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'finlens.sqlite'}")
+    yield engine
+    engine.dispose()
+
+
+def _columns(engine, table):
+    return {c["name"] for c in inspect(engine).get_columns(table)}
+
+
+@pytest.mark.parametrize("compact_schema", [False, True])
+def test_fresh_upgrade(engine, compact_schema):
+    versions = migrations.upgrade(engine, compact_schema)
+
+    assert versions == migrations.required_versions(compact_schema)
+    assert migrations.current_versions(engine) == versions
+    assert {"content_hash"} <= _columns(engine, "companies")
+    assert {"download_status", "downloaded_at"} <= _columns(engine, "filings")
+    assert inspect(engine).has_table("compact_filings") == compact_schema
+    # Nothing left to do
+    assert migrations.upgrade(engine, compact_schema) == versions
+
+
+def test_upgrades_unversioned_database(engine):
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX idx_download_status"))
+        for column in ("download_status", "local_path", "downloaded_at", "byte_size"):
+            connection.execute(text(f"ALTER TABLE filings DROP COLUMN {column}"))
+        connection.execute(text("ALTER TABLE companies DROP COLUMN content_hash"))
+        connection.execute(text("INSERT INTO companies (cik, name) VALUES ('0000000001', 'A')"))
+        connection.execute(text(
+            "INSERT INTO filings (cik, form_type, filing_date, accession_number) "
+            "VALUES ('0000000001', '10-K', '2024-01-02', '0000000001-24-000001')"))
+    assert not migrations.is_schema_current(engine)
+
+    versions = migrations.upgrade(engine)
+
+    assert versions == migrations.required_versions(False)
+    assert "content_hash" in _columns(engine, "companies")
+    assert {"download_status", "local_path", "downloaded_at",
+            "byte_size"} <= _columns(engine, "filings")
+    assert "idx_download_status" in {i["name"] for i in inspect(engine).get_indexes("filings")}
+    with engine.connect() as connection:
+        assert connection.execute(
+            text("SELECT download_status FROM filings")).scalar() == "pending"
+    assert migrations.is_schema_current(engine)
+
+
+def test_is_schema_current(engine, tmp_path):
+    assert not (tmp_path / "finlens.sqlite").exists()
+    assert not migrations.is_schema_current(engine)
+
+    migrations.upgrade(engine)
+    assert migrations.is_schema_current(engine)
+    assert not migrations.is_schema_current(engine, compact_schema=True)
+
+    migrations.upgrade(engine, compact_schema=True)
+    assert migrations.is_schema_current(engine, compact_schema=True)
+
+
+def test_versions_are_read_under_the_migration_lock(engine, monkeypatch, caplog):
+    waited = []
+
+    @contextmanager
+    def migration_lock(locked_engine):
+        if not waited:
+            waited.append(True)
+            # Another process migrates while this one waits for the lock
+            migrations.upgrade(locked_engine)
+        yield
+
+    monkeypatch.setattr(get_backend("sqlite"), "migration_lock", migration_lock)
+    with caplog.at_level(logging.INFO, logger=migrations.__name__):
+        assert migrations.upgrade(engine) == migrations.required_versions(False)
+    assert waited
+    applied = [r for r in caplog.records if r.getMessage().startswith("Applying")]
+    assert len(applied) == len(migrations.CORE_MIGRATIONS)
+
+
+def test_added_column_types_follow_the_dialect():
+    assert migrations._column_ddl(
+        postgresql.dialect(), DateTime()) == "TIMESTAMP WITHOUT TIME ZONE NULL"
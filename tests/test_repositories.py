@@ -0,0 +1,139 @@
+# tests/test_repositories.py
+"""
+Company and filing repositories on SQLite, on the classic and the compact
+schema: every read and write answers with the same string-keyed values.
+Run with: python -m pytest tests/test_repositories.py
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from src.database.repositories.company import CompanyRepository
+from src.database.repositories.filing import FilingRepository
+
+
+def _filing(n, cik="0000000001", form_type="10-K", day=2):
+    return {"cik": cik, "form_type": form_type, "filing_date": date(2024, 1, day),
+            "accession_number": f"{cik}-24-{n:06d}",
+            "primary_document_filename": f"doc{n}.htm"}
+
+
+@pytest.fixture(params=[False, True], ids=["classic", "compact"])
+def repositories(request, sqlite_db):
+    _, session_factory = sqlite_db(DB_COMPACT_SCHEMA=request.param)
+    companies = CompanyRepository(session_factory)
+    filings = FilingRepository(session_factory)
+    companies.bulk_upsert([{"cik": "0000000001", "name": "A", "sic": "1000"},
+                           {"cik": "0000000002", "name": "B", "sic": "6189"}])
+    filings.bulk_insert_ignore([
+        _filing(1), _filing(2, form_type="8-K", day=3), _filing(3, day=4),
+        _filing(4, cik="0000000002")
+    ])
+    return companies, filings
+
+
+def test_company_reads(repositories):
+    companies, _ = repositories
+    company = companies.get_by_cik("0000000001")
+    assert (company.cik, company.name, company.sic) == ("0000000001", "A", "1000")
+    assert companies.get_by_cik("0000000009") is None
+    assert sorted(companies.get_many_by_cik(["0000000002", "0000000009", "x"])) == [
+        "0000000002"]
+    assert companies.get_existing_ciks(["0000000001", "0000000009", "x"]) == {
+        "0000000001"}
+
+
+def test_filing_reads(repositories):
+    _, filings = repositories
+    filing = filings.get_by_accession_number("0000000001-24-000002")
+    assert (filing.cik, filing.form_type, filing.filing_date,
+            filing.download_status) == ("0000000001", "8-K", date(2024, 1, 3), "pending")
+    assert filings.get_by_accession_number("0000000001-24-000009") is None
+    assert sorted(filings.get_many_by_accession_numbers(
+        ["0000000001-24-000001", "0000000001-24-000009", "bad"])) == [
+            "0000000001-24-000001"]
+
+    rows = filings.get_filings_by_accessions(
+        ["0000000001-24-000003", "bad"], columns=["cik", "form_type", "accession_number"])
+    assert [tuple(r) for r in rows] == [("0000000001", "10-K", "0000000001-24-000003")]
+    rows = filings.get_filings_for_ciks(["0000000001"], columns=["accession_number"],
+                                        form_types=["10-K"])
+    assert sorted(r.accession_number for r in rows) == [
+        "0000000001-24-000001", "0000000001-24-000003"]
+    assert [r.accession_number for r in filings.iter_filings(
+        form_types=["10-K"], date_range=(None, date(2024, 1, 3)),
+        columns=["accession_number"], page_size=1)] == [
+            "0000000001-24-000001", "0000000002-24-000004"]
+    assert filings.load_filing_columns(form_types=["8-K"], columns=["cik"]) == {
+        "cik": ["0000000001"]}
+
+
+def test_download_queue(repositories, monkeypatch):
+    from src.config import settings as settings_module
+    _, filings = repositories
+    monkeypatch.setattr(settings_module._settings.filing_filter,
+                        "excluded_sic_codes", ["6189"])
+
+    assert list(filings.iter_filings_for_download(["10-K"], page_size=1)) == [
+        {"cik": "0000000001", "accession_number": "0000000001-24-000001",
+         "filing_date": date(2024, 1, 2)},
+        {"cik": "0000000001", "accession_number": "0000000001-24-000003",
+         "filing_date": date(2024, 1, 4)},
+    ]
+    assert filings.find_filings_for_download(["20-F"]) == []
+
+    assert filings.mark_download_results([
+        {"accession_number": "0000000001-24-000001", "download_status": "downloaded",
+         "local_path": "a.htm", "downloaded_at": datetime(2024, 2, 1), "byte_size": 5},
+        {"accession_number": "0000000001-24-000003", "download_status": "failed",
+         "filing_date": date(2024, 1, 4)},
+        {"accession_number": "bad", "download_status": "downloaded"},
+    ]) == 2
+    assert [f["accession_number"] for f in filings.iter_filings_for_download(
+        ["10-K"], pending_only=True)] == ["0000000001-24-000003"]
+    filing = filings.get_by_accession_number("0000000001-24-000001")
+    assert (filing.download_status, filing.local_path, filing.byte_size) == (
+        "downloaded", "a.htm", 5)
+
+
+def test_known_form_types_are_not_reinserted(sqlite_db):
+    from sqlalchemy import event
+    from src.database.compact import FormTypeRegistry
+
+    engine, session_factory = sqlite_db(DB_COMPACT_SCHEMA=True)
+    first = FormTypeRegistry()
+    with session_factory() as session:
+        ids = first.ids_for(session, {"10-K", "8-K"})
+        session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, sql, *args: statements.append(sql))
+    # Another process: nothing cached, every code already in form_types
+    with session_factory() as session:
+        assert FormTypeRegistry().ids_for(session, {"10-K", "8-K"}) == ids
+        assert FormTypeRegistry().ids_for(session, {"10-K", "20-F"}, create=False) == {
+            "10-K": ids["10-K"]}
+        assert set(FormTypeRegistry().ids_for(session, {"8-K", "20-F"})) == {"8-K", "20-F"}
+    inserts = [sql for sql in statements if sql.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["classic", "compact"])
+def test_small_upserts_load_only_their_hashes(sqlite_db, compact):
+    _, session_factory = sqlite_db(DB_COMPACT_SCHEMA=compact, DB_WRITE_BATCH_SIZE=3)
+    CompanyRepository(session_factory).bulk_upsert(
+        [{"cik": f"000000000{n}", "name": f"C{n}"} for n in range(1, 5)])
+
+    companies = CompanyRepository(session_factory)
+    assert companies.bulk_upsert([{"cik": "0000000001", "name": "C1"}]) == 0
+    assert (companies._hash_cache_complete, list(companies._hash_cache)) == (False, [1])
+    assert companies.bulk_upsert([{"cik": "0000000002", "name": "B"}]) > 0
+    assert sorted(companies._hash_cache) == [1, 2]
+
+    # A write batch or more: every hash at once
+    assert companies.bulk_upsert([{"cik": f"000000000{n}", "name": f"C{n}"}
+                                  for n in (1, 3, 4)]) == 0
+    assert (companies._hash_cache_complete, sorted(companies._hash_cache)) == (
+        True, [1, 2, 3, 4])
@@ -0,0 +1,89 @@
+# tests/test_sgml_splitter.py
+"""
+SGMLDocumentSplitter: splitting an EDGAR full-submission text file fed in
+arbitrary chunks. Run with: python -m pytest tests/test_sgml_splitter.py
+"""
+
+import binascii
+
+import pytest
+
+from src.core.exceptions import SGMLParsingError
+from src.phase1_extraction.parsers.sgml import SGMLDocumentSplitter
+
+PRIMARY_HTML = (b"<html><body><p>Annual report</p>\n"
+                b"<p>" + b"x" * 500 + b"</p></body></html>")
+IMAGE_BYTES = bytes(range(256)) * 3
+
+
+def _uuencode(data: bytes) -> bytes:
+    lines = [binascii.b2a_uu(data[i:i + 45]) for i in range(0, len(data), 45)]
+    return b"begin 644 logo.jpg\n" + b"".join(lines) + b"`\nend\n"
+
+
+SUBMISSION = (
+    b"<SEC-DOCUMENT>0000320193-24-000123.txt : 20241101\n"
+    b"<SEC-HEADER>0000320193-24-000123.hdr.sgml : 20241101\n"
+    b"ACCESSION NUMBER:\t\t0000320193-24-000123\n"
+    b"</SEC-HEADER>\n"
+    b"<DOCUMENT>\n<TYPE>10-K\n<SEQUENCE>1\n<FILENAME>aapl-20240928.htm\n"
+    b"<DESCRIPTION>10-K\n<TEXT>\n<XBRL>\n" + PRIMARY_HTML + b"\n</XBRL>\n</TEXT>\n"
+    b"</DOCUMENT>\n"
+    b"<DOCUMENT>\n<TYPE>EX-21.1\n<SEQUENCE>2\n<FILENAME>a10-kexhibit211.htm\n"
+    b"<TEXT>\n<html>Subsidiaries</html>\n</TEXT>\n</DOCUMENT>\n"
+    b"<DOCUMENT>\n<TYPE>GRAPHIC\n<SEQUENCE>3\n<FILENAME>../logo.jpg\n"
+    b"<TEXT>\n" + _uuencode(IMAGE_BYTES) + b"</TEXT>\n</DOCUMENT>\n"
+    b"</SEC-DOCUMENT>\n")
+
+
+def _feed(splitter: SGMLDocumentSplitter, data: bytes, chunk_size: int):
+    return splitter.split(data[i:i + chunk_size]
+                          for i in range(0, len(data), chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_splits_all_documents(tmp_path, chunk_size):
+    documents = _feed(SGMLDocumentSplitter(tmp_path), SUBMISSION, chunk_size)
+
+    assert [(d.type, d.sequence, d.filename) for d in documents] == [
+        ("10-K", 1, "aapl-20240928.htm"),
+        ("EX-21.1", 2, "a10-kexhibit211.htm"),
+        ("GRAPHIC", 3, "logo.jpg"),  # Directory part dropped
+    ]
+    # <XBRL> wrapper removed, content intact
+    assert (tmp_path / "aapl-20240928.htm").read_bytes() == PRIMARY_HTML + b"\n"
+    assert (tmp_path / "a10-kexhibit211.htm").read_bytes() == b"<html>Subsidiaries</html>\n"
+    # Uuencoded binary decoded
+    assert (tmp_path / "logo.jpg").read_bytes() == IMAGE_BYTES
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_filters_by_document_type(tmp_path):
+    documents = _feed(SGMLDocumentSplitter(tmp_path, {"ex-21"}), SUBMISSION, 100)
+
+    assert [d.filename for d in documents] == ["a10-kexhibit211.htm"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a10-kexhibit211.htm"]
+
+
+def test_truncated_submission_raises_and_cleans_up(tmp_path):
+    truncated = SUBMISSION[:SUBMISSION.index(b"Subsidiaries")]
+    splitter = SGMLDocumentSplitter(tmp_path)
+
+    with pytest.raises(SGMLParsingError):
+        _feed(splitter, truncated, 50)
+    assert [d.filename for d in splitter.documents] == ["aapl-20240928.htm"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["aapl-20240928.htm"]
+
+
+def test_prefixes_written_file_names(tmp_path):
+    no_filename = SUBMISSION.replace(b"<FILENAME>a10-kexhibit211.htm\n", b"")
+    splitter = SGMLDocumentSplitter(tmp_path, {"10-K", "EX-21"},
+                                    filename_prefix="320193_000032019324000123_")
+    documents = _feed(splitter, no_filename, 64)
+
+    assert [d.filename for d in documents] == ["aapl-20240928.htm", "2_EX-21.1.txt"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "320193_000032019324000123_2_EX-21.1.txt",
+        "320193_000032019324000123_aapl-20240928.htm",
+    ]
+    assert documents[0].path == tmp_path / "320193_000032019324000123_aapl-20240928.htm"
@@ -0,0 +1,151 @@
+# tests/test_staging.py
+"""
+Staged bulk loads on SQLite: both merge modes through the repositories
+(with DB_BULK_LOAD_THRESHOLD=1, classic and compact schema), the fallback
+to batched writes when the loader is unavailable, the retry of a refused
+MySQL LOAD DATA LOCAL INFILE, and the statements of the PostgreSQL path.
+Run with: python -m pytest tests/test_staging.py
+"""
+
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.core.exceptions import BulkLoadUnavailableError
+from src.database import staging
+from src.database.repositories.company import CompanyRepository
+from src.database.repositories.filing import FilingRepository
+
+
+def _filings(*numbers):
+    return [{"cik": "0000000001", "form_type": "10-K",
+             "filing_date": date(2024, 1, 2),
+             "accession_number": f"0000000001-24-{n:06d}",
+             "primary_document_filename": f"doc{n}.htm"} for n in numbers]
+
+
+@pytest.fixture(params=[False, True], ids=["classic", "compact"])
+def repositories(request, sqlite_db, monkeypatch):
+    """(engine, CompanyRepository, FilingRepository, merges) with staging on for every write."""
+    engine, session_factory = sqlite_db(DB_COMPACT_SCHEMA=request.param,
+                                        DB_BULK_LOAD_THRESHOLD=1,
+                                        DB_ACCESSION_INDEX=False)
+    merges = []
+    staged_merge = staging.staged_merge
+
+    def _recording_merge(session, table, columns, rows, mode, key_columns=()):
+        merges.append((table.name, mode))
+        return staged_merge(session, table, columns, rows, mode, key_columns)
+
+    monkeypatch.setattr(staging, "staged_merge", _recording_merge)
+    return (engine, CompanyRepository(session_factory),
+            FilingRepository(session_factory), merges)
+
+
+def _rows(engine, sql):
+    with engine.connect() as connection:
+        return [tuple(row) for row in connection.execute(text(sql))]
+
+
+def test_staged_upsert_and_insert_ignore(repositories):
+    engine, companies, filings, merges = repositories
+    companies.bulk_upsert([{"cik": "0000000001", "name": "A"},
+                           {"cik": "0000000002", "name": "B"}])
+    companies.bulk_upsert([{"cik": "0000000001", "name": "A2"}])
+    assert filings.bulk_insert_ignore(_filings(1, 2)) == 2
+    assert filings.bulk_insert_ignore(_filings(2, 3)) == 1
+
+    company_table = companies._model.__table__.name
+    filing_table = "compact_filings" if companies.compact else "filings"
+    assert merges == [(company_table, staging.MERGE_UPSERT)] * 2 + [
+        (filing_table, staging.MERGE_IGNORE)] * 2
+    assert _rows(engine, f"SELECT name FROM {company_table} ORDER BY cik") == [
+        ("A2", ), ("B", )]
+    assert _rows(engine, f"SELECT COUNT(*) FROM {filing_table}") == [(3, )]
+
+
+def test_unavailable_loader_falls_back_to_batched_writes(repositories, monkeypatch):
+    engine, companies, filings, merges = repositories
+
+    def _refused(*args, **kwargs):
+        merges.append("refused")
+        raise BulkLoadUnavailableError("LOAD DATA LOCAL INFILE failed")
+
+    monkeypatch.setattr(staging, "staged_merge", _refused)
+    companies.bulk_upsert([{"cik": "0000000001", "name": "A"}])
+    companies.bulk_upsert([{"cik": "0000000001", "name": "A2"}])
+    assert filings.bulk_insert_ignore(_filings(1, 2)) == 2
+    assert filings.bulk_insert_ignore(_filings(2)) == 0
+
+    assert merges == ["refused"] * 4
+    company_table = companies._model.__table__.name
+    filing_table = "compact_filings" if companies.compact else "filings"
+    assert _rows(engine, f"SELECT name FROM {company_table}") == [("A2", )]
+    assert _rows(engine, f"SELECT COUNT(*) FROM {filing_table}") == [(2, )]
+
+
+def test_refused_local_infile_is_retried_later(monkeypatch):
+    assert staging.is_available("mysql")
+    monkeypatch.setattr(staging, "_local_infile_refused_at", time.monotonic())
+    assert not staging.is_available("mysql")
+    assert staging.is_available("sqlite")
+
+    monkeypatch.setattr(staging, "_local_infile_refused_at",
+                        time.monotonic() - staging.LOCAL_INFILE_RETRY_SECONDS)
+    assert staging.is_available("mysql")
+
+
+class _Session:
+    """Records statements; raises `error` for LOAD DATA."""
+
+    def __init__(self, dialect_name, error=None):
+        self.dialect_name = dialect_name
+        self.error = error
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name=self.dialect_name))
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        if self.error and str(statement).startswith("LOAD DATA"):
+            raise self.error
+        return SimpleNamespace(rowcount=0)
+
+    def connection(self):
+        # A DBAPI cursor without copy_expert: rows go through executemany
+        cursor = SimpleNamespace(executemany=lambda sql, rows: None, close=lambda: None)
+        return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+
+
+def _mysql_error(errno):
+    return OperationalError("LOAD DATA", {}, SimpleNamespace(errno=errno, args=(errno, "")))
+
+
+def test_only_disabled_local_infile_counts_as_refused(monkeypatch):
+    monkeypatch.setattr(staging, "_local_infile_refused_at", None)
+    table = SimpleNamespace(name="filings")
+
+    with pytest.raises(OperationalError):  # Lock wait timeout: a regular error
+        staging.staged_merge(_Session("mysql", _mysql_error(1205)), table,
+                             ["accession_number"], [("a", )], staging.MERGE_IGNORE)
+    assert staging.is_available("mysql")
+
+    with pytest.raises(BulkLoadUnavailableError):
+        staging.staged_merge(_Session("mysql", _mysql_error(3948)), table,
+                             ["accession_number"], [("a", )], staging.MERGE_IGNORE)
+    assert not staging.is_available("mysql")
+
+
+def test_postgresql_upsert_keeps_the_last_row_of_a_key():
+    session = _Session("postgresql")
+    staging.staged_merge(session, SimpleNamespace(name="companies"), ["cik", "name"],
+                         [("1", "A"), ("1", "A2")], staging.MERGE_UPSERT, ["cik"])
+    merge_sql = next(s for s in session.statements if s.startswith("INSERT INTO companies"))
+    assert "SELECT DISTINCT ON (cik) cik, name FROM stg_companies ORDER BY cik, stg_seq DESC" in merge_sql
+    assert [s for s in session.statements if s.startswith("DROP")] == [
+        "DROP TABLE IF EXISTS pg_temp.stg_companies"] * 2
@@ -0,0 +1,67 @@
+# tests/test_submission_download.py
+"""
+Full-submission downloads (DOWNLOAD_FULL_SUBMISSION) with the HTTP response
+stubbed: a submission without a document of the wanted types is a skip,
+not a failure to retry; transport and split errors stay failures.
+Run with: python -m pytest tests/test_submission_download.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.config.settings import get_settings
+from src.core.rate_limiting import RateLimiter
+from src.database.models import DOWNLOAD_SKIPPED
+from src.phase1_extraction.downloaders.document import DocumentDownloader
+from src.phase1_extraction.services.pipeline_service import PipelineService
+from tests.test_sgml_splitter import SUBMISSION
+
+ACCESSION = "0000320193-24-000123"
+
+
+class _Response:
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        return (self.body[i:i + chunk_size] for i in range(0, len(self.body), chunk_size))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def download(tmp_path, monkeypatch):
+    """download(body, document_types) -> PipelineService._download_submission's result."""
+    downloader = DocumentDownloader(get_settings(), RateLimiter(0.001))
+
+    def _download(body, document_types):
+        monkeypatch.setattr(downloader, "_make_request",
+                            lambda url, **kwargs: _Response(body))
+        service = SimpleNamespace(
+            document_downloader=downloader,
+            settings=SimpleNamespace(pipeline=SimpleNamespace(
+                submission_document_types=document_types)))
+        return PipelineService._download_submission(
+            service, "0000320193", ACCESSION, tmp_path / "0000320193_000032019324000123")
+
+    return _download
+
+
+def test_matching_documents_are_kept(download, tmp_path):
+    path = download(SUBMISSION, {"10-K"})
+    assert path.name == "0000320193_000032019324000123_aapl-20240928.htm"
+    assert path.exists()
+
+
+def test_no_matching_document_is_a_skip(download, tmp_path):
+    # e.g. a 10-K/A bundle with SUBMISSION_DOC_TYPES=10-K
+    assert download(SUBMISSION, {"10-Q"}) == DOWNLOAD_SKIPPED
+    assert not (tmp_path / "0000320193_000032019324000123").exists()
+
+
+def test_broken_submission_is_a_failure(download):
+    truncated = SUBMISSION[:SUBMISSION.index(b"Subsidiaries")]
+    assert download(truncated, {"10-K"}) is None
@@ -0,0 +1,67 @@
+# tests/test_toc_engine.py
+"""
+ToC extraction: the single-pass engine must reproduce the entries the
+original two-scan extractor produced on the fixture filings
+(tests/fixtures/toc_expected.json), and the heading tokenizer must agree
+with ToCExtractor.ITEM_LINE_RE without its backtracking blow-up.
+Run with: python -m pytest tests/test_toc_engine.py
+"""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.phase2_parsing.extractors.toc_engine import match_heading
+from src.phase2_parsing.extractors.toc_extractor import ToCExtractor
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+EXPECTED = json.loads((FIXTURES / "toc_expected.json").read_text(encoding="utf-8"))
+
+
+def _expected(name):
+    return [tuple(entry) for entry in EXPECTED[name]]
+
+
+def _html(name):
+    return (FIXTURES / name).read_text(encoding="utf-8", errors="replace")
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_matches_expected_toc(name):
+    assert ToCExtractor().extract_from_html(_html(name)) == _expected(name)
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_matches_expected_toc_on_lxml_tree(name):
+    pytest.importorskip("lxml")
+    soup = BeautifulSoup(_html(name), "lxml")
+    assert ToCExtractor().extract(soup) == _expected(name)
+
+
+@pytest.mark.parametrize("text", [
+    "ITEM 1A. Risk Factors",
+    "Item 7.  Management Discussion  .......  45",
+    "PART II",  # Backtracks to identifier "PART I", title "I"
+    "Item 10",  # Backtracks to identifier "Item 1", title "0"
+    "ITEM 2 — Properties — 12",
+    "  \n\nItem 3:\nLegal Proceedings\n",
+    "Item 5. Market for Registrant’s Common Equity",  # ’ isn't a title character
+    "Part IV\n  Item 15 - Exhibits, Financial Statement Schedules",
+    "Items 1 and 2. Business and Properties",
+    "",
+])
+def test_tokenizer_agrees_with_regex(text):
+    match = ToCExtractor.ITEM_LINE_RE.search(text)
+    expected = (match.group(1), match.group("title")) if match else None
+    assert match_heading(text) == expected
+
+
+def test_tokenizer_is_linear_on_whitespace_runs():
+    # ITEM_LINE_RE backtracks polynomially on these (minutes at 100 spaces)
+    started = time.monotonic()
+    assert match_heading("ITEM 1 a" + "\xa0" * 5000 + "x!") is None
+    assert match_heading("ITEM 1 a" + " " * 5000 + "b" + " " * 5000 + "12") is not None
+    assert time.monotonic() - started < 1.0
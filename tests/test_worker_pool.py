@@ -0,0 +1,95 @@
+# tests/test_worker_pool.py
+"""
+Supervised worker pool: a task that times out, crashes its worker or raises
+is reported with the matching failure reason while the other tasks finish,
+killed or dead workers are replaced, and workers are recycled after
+max_tasks_per_worker tasks. Quarantined filings are skipped on the next run.
+Run with: python -m pytest tests/test_worker_pool.py
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.phase2_parsing.services.worker_pool import (FAILURE_CRASH, FAILURE_ERROR,
+                                                     FAILURE_TIMEOUT, SupervisedWorkerPool,
+                                                     TaskFailure)
+
+
+# Handlers run in the worker processes, so they live at module level
+def _handle(task):
+    if task == "sleep":
+        time.sleep(30)
+    elif task == "exit":
+        os._exit(1)
+    elif task == "raise":
+        raise ValueError("bad filing")
+    return task, os.getpid()
+
+
+def _run(tasks, **options):
+    """Runs tasks on one worker -> ({task: (result, failure)}, workers started)."""
+    with SupervisedWorkerPool(1, _handle, poll_interval=0.05, **options) as pool:
+        outcomes = {task: (result, failure)
+                    for task, result, failure in pool.imap_unordered(tasks)}
+        return outcomes, pool.workers_started
+
+
+def test_timeout_kills_and_replaces_the_worker():
+    outcomes, started = _run(["sleep", "next"], timeout=0.5)
+    result, failure = outcomes["sleep"]
+    assert result is None and failure.reason == FAILURE_TIMEOUT
+    assert outcomes["next"][0][0] == "next"
+    assert started == 2
+
+
+def test_crashed_worker_is_reported_and_replaced():
+    outcomes, started = _run(["exit", "next"])
+    result, failure = outcomes["exit"]
+    assert result is None
+    assert (failure.reason, failure.exit_code) == (FAILURE_CRASH, 1)
+    assert outcomes["next"][0][0] == "next"
+    assert started == 2
+
+
+def test_handler_error_keeps_the_worker():
+    outcomes, started = _run(["raise", "next"])
+    result, failure = outcomes["raise"]
+    assert result is None and failure.reason == FAILURE_ERROR
+    assert "ValueError: bad filing" in failure.details
+    assert outcomes["next"][0][1] == failure.pid
+    assert started == 1
+
+
+def test_workers_are_recycled_after_max_tasks():
+    outcomes, started = _run(list(range(5)), max_tasks_per_worker=2)
+    assert sorted(result[0] for result, _ in outcomes.values()) == [0, 1, 2, 3, 4]
+    assert len({result[1] for result, _ in outcomes.values()}) == 3
+    assert started == 3
+
+
+def test_quarantined_filing_is_skipped_on_the_next_run(tmp_path, monkeypatch):
+    try:
+        from src.phase2_parsing.services.processor_service import ProcessorService
+    except SystemExit:  # The module exits when sec-parser's SecParser is missing
+        pytest.skip("sec-parser (SecParser) is not installed")
+
+    service = ProcessorService.__new__(ProcessorService)
+    service.quarantine_path = tmp_path / "quarantine"
+    service.output_nodes_path = tmp_path / "nodes_json"
+    service.settings = SimpleNamespace(pipeline=SimpleNamespace(processing_workers=1))
+    html_path = tmp_path / "0000320193_2024-11-01_10-K_0000320193-24-000123.htm"
+    html_path.write_text("<html></html>")
+    task_info = {"filename_base": html_path.stem, "html_path": html_path,
+                 "file_size": html_path.stat().st_size}
+    service._quarantine(task_info, TaskFailure(reason=FAILURE_TIMEOUT,
+                                               details="Exceeded the 1s timeout",
+                                               elapsed_seconds=1.2))
+
+    ran = []
+    monkeypatch.setattr(service, "_iter_results",
+                        lambda tasks, num_workers: ran.extend(tasks) or iter(()))
+    service.run_processing([html_path])
+    assert ran == []